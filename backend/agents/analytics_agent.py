@@ -2,63 +2,590 @@
 Analytics Agent - Analyzes quiz results and provides insights
 
 This agent processes quiz results data and generates analytics.
+Statistics are computed by the vectorized engine in engines/analytics_engine.py.
+Cross-quiz trend and cohort queries read the columnar history in
+storage/results_store.py instead of re-fetching sheets.
 """
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional, Sequence
 
+import numpy as np
 
-def analyze_quiz_results(results: List[Dict]) -> Dict:
+from engines.analytics_engine import (
+    QuizAggregate,
+    ResponseMatrix,
+    analyze_matrix,
+    grouped_statistics,
+    score_statistics,
+    topic_mastery_many,
+)
+from engines.curriculum_engine import topic_key
+from engines.grading_engine import AnswerKey, encode_submissions, grade_submissions
+from engines.mastery_engine import knowledge_tracing
+from schemas.batches import ResultBatch
+from storage.results_store import ResultsStore, to_epoch
+from utils.offload import cpu_bound
+
+
+# Topics below this share of available points are reported as weak
+WEAK_TOPIC_THRESHOLD = 0.6
+
+# Calendar buckets for score_trends(); custom windows (e.g. terms) are also accepted
+TREND_PERIODS = ("week", "month", "quarter", "year")
+
+
+def analyze_quiz_results(
+    results: List[Dict],
+    responses: Optional[ResponseMatrix] = None,
+    question_topics: Optional[Sequence[Optional[str]]] = None,
+    aggregate: Optional[QuizAggregate] = None
+) -> Dict:
     """
     Analyze quiz results and provide insights.
-    
+
     Args:
         results: List of student results with score/total fields
-        
+            (optionally with per-question credit under "responses")
+        responses: Optional students x questions ResponseMatrix; enables
+            item analysis (difficulty, discrimination, reliability)
+        question_topics: Optional key topic of each question (see
+            QuizStore.question_topics); enables per-topic mastery
+        aggregate: Optional running QuizAggregate for this quiz (see
+            AggregateStore). When it covers the given results, it answers
+            in O(1) and the full recompute is skipped.
+
     Returns:
         Analytics with weak topics, suggestions, statistics
     """
-    # MVP: Basic analytics
-    # Future: Advanced ML-based analysis
-    
-    if not results:
+    if aggregate is not None and _aggregate_covers(aggregate, results):
+        return summarize_aggregate(aggregate, question_topics)
+
+    if responses is None and results:
+        responses = ResponseMatrix.from_results(results)
+
+    if not results and responses is None:
         return {
             "error": "No results to analyze"
         }
-    
+
     # Calculate statistics
-    scores = [r.get("score", 0) for r in results]
-    total_questions = results[0].get("total", 100) if results else 100
-    
-    avg_score = sum(scores) / len(scores) if scores else 0
-    max_score = max(scores) if scores else 0
-    min_score = min(scores) if scores else 0
-    
+    analysis = None
+    if responses is not None:
+        analysis = analyze_matrix(responses)
+        scores = analysis["scores"]
+        total_questions = responses.shape[1]
+    else:
+        scores = np.fromiter((r.get("score", 0) for r in results), dtype=np.float64, count=len(results))
+        total_questions = results[0].get("total", 100)
+
+    if scores.size == 0:
+        return {
+            "error": "No results to analyze"
+        }
+
+    avg_score = float(scores.mean())
+    max_score = float(scores.max())
+    min_score = float(scores.min())
+
+    performance_level, suggestions = _performance_insights(avg_score)
+
+    # Weak topics from per-topic mastery; without a topic mapping, fall back to the hardest questions
+    topic_mastery = []
+    weak_topics = []
+    if analysis and question_topics is not None and len(question_topics) == total_questions:
+        grouped = topic_mastery_many([(None, responses, question_topics)])
+        topic_mastery = _topic_rows(grouped, 0)
+        weak_topics = _weak_topic_messages(topic_mastery)
+    elif analysis:
+        hardest = sorted(analysis["item_analysis"], key=lambda item: item["difficulty"])
+        weak_topics = [
+            f"{item['question']} answered correctly by {round(item['difficulty'] * 100)}% of students"
+            for item in hardest[:3] if item["difficulty"] < WEAK_TOPIC_THRESHOLD
+        ]
+
+    output = {
+        "statistics": {
+            "average_score": round(avg_score, 2),
+            "max_score": round(max_score, 2),
+            "min_score": round(min_score, 2),
+            "total_students": int(scores.size),
+            "total_questions": total_questions
+        },
+        "distribution": analysis["distribution"] if analysis else score_statistics(scores),
+        "performance_level": performance_level,
+        "weak_topics": weak_topics,
+        "suggestions": suggestions
+    }
+    if analysis:
+        output["item_analysis"] = analysis["item_analysis"]
+        output["reliability"] = analysis["reliability"]
+    if topic_mastery:
+        output["topic_mastery"] = topic_mastery
+    return output
+
+
+@cpu_bound("thread")
+def analyze_quiz_batches(
+    batches: Iterable[ResultBatch],
+    aggregate: Optional[QuizAggregate] = None,
+    answer_key: Optional[AnswerKey] = None,
+    question_topics: Optional[Sequence[Optional[str]]] = None
+) -> Dict:
+    """
+    Analyze quiz results streamed as columnar batches.
+
+    Batches (e.g. from SheetsService.iter_result_batches) are folded into a
+    QuizAggregate as they arrive, so memory stays flat however large the
+    response sheet is. Passing a persisted aggregate makes the call
+    incremental: only the new batches are processed and the aggregate
+    (including its watermark, the reader cursor of the last batch) is
+    updated in place.
+
+    Args:
+        batches: ResultBatch iterable
+        aggregate: Running aggregate to update (default: a fresh one)
+        answer_key: AnswerKey of the quiz; ungraded batches whose answer
+            columns match it are graded locally (weights, partial credit) instead of
+            trusting the sheet's Score column, and get per-question stats
+        question_topics: Optional topic of each question
+
+    Returns:
+        Same shape as analyze_quiz_results
+    """
+    aggregate = aggregate if aggregate is not None else QuizAggregate()
+    for batch in batches:
+        if batch.credit is not None:
+            aggregate.update(batch.scores, batch.credit, batch.question_columns)
+        elif answer_key is not None and batch.answers.shape[1] == answer_key.n_questions:
+            graded = grade_submissions(answer_key, encode_submissions(answer_key, batch.answers))
+            aggregate.update(graded["percent"], graded["matrix"].credit, batch.question_columns)
+        else:
+            aggregate.update(batch.scores, None, batch.question_columns)
+        if batch.cursor is not None:
+            aggregate.watermark = batch.cursor
+    return summarize_aggregate(aggregate, question_topics)
+
+
+@cpu_bound("thread")
+def grade_quiz(
+    questions: Sequence,
+    answers,
+    student_ids: Optional[List[str]] = None
+) -> Dict:
+    """
+    Grade submissions locally against the quiz's answer key and analyze them.
+
+    Args:
+        questions: QuizQuestion models or stored question dicts (with
+            correct_answer and optional points / partial_credit / topic)
+        answers: Submissions x questions answer text (option text or letter)
+        student_ids: Optional student ID per submission
+
+    Returns:
+        {"students": per-student points/percent, "questions": per-question
+        correct rate and option counts, "analytics": analyze_quiz_results output}
+    """
+    key = AnswerKey.from_questions(questions)
+    graded = grade_submissions(key, encode_submissions(key, answers), student_ids)
+    matrix = graded["matrix"]
+    student_ids = student_ids or [f"Student {i + 1}" for i in range(matrix.shape[0])]
+    stored = [q.model_dump() if hasattr(q, "model_dump") else dict(q) for q in questions]
+
+    students = [
+        {"student": student, "points": round(float(points), 2), "score": round(float(percent), 2)}
+        for student, points, percent in zip(student_ids, graded["points"], graded["percent"])
+    ]
+    with np.errstate(invalid="ignore"):
+        correct_rate = np.nan_to_num(matrix.credit, nan=0.0).mean(axis=0) if matrix.shape[0] else np.zeros(key.n_questions)
+    question_rows = [
+        {
+            "question": key.question_ids[q],
+            "topic": stored[q].get("topic"),
+            "correct_rate": round(float(correct_rate[q]), 4),
+            "option_counts": {
+                option: int(graded["option_counts"][q, i]) for i, option in enumerate(key.options[q])
+            },
+            "unanswered": int(graded["unanswered"][q]),
+            "invalid": int(graded["invalid"][q])
+        }
+        for q in range(key.n_questions)
+    ]
+    results = [{"student": s["student"], "score": s["score"], "total": 100} for s in students]
+    topics = [q.get("topic") for q in stored]
+    return {
+        "students": students,
+        "questions": question_rows,
+        "analytics": analyze_quiz_results(results, responses=matrix, question_topics=topics)
+    }
+
+
+def summarize_aggregate(
+    aggregate: QuizAggregate,
+    question_topics: Optional[Sequence[Optional[str]]] = None
+) -> Dict:
+    """
+    Analytics from a running aggregate (O(questions), independent of responses).
+
+    Returns:
+        Same shape as analyze_quiz_results (item statistics come from the
+        aggregate's running sums, see QuizAggregate.item_statistics)
+    """
+    scores = aggregate.scores
+    if scores.count == 0:
+        return {
+            "error": "No results to analyze"
+        }
+
+    performance_level, suggestions = _performance_insights(scores.mean)
+
+    topic_mastery = []
+    weak_topics = []
+    n_questions = len(aggregate.question_ids)
+    if aggregate.responses and question_topics is not None and len(question_topics) == n_questions:
+        grouped = topic_mastery_many([(None, aggregate, question_topics)])
+        topic_mastery = _topic_rows(grouped, 0)
+        weak_topics = _weak_topic_messages(topic_mastery)
+    elif aggregate.responses:
+        difficulty = aggregate.difficulty()
+        weak_topics = [
+            f"{aggregate.question_ids[k]} answered correctly by {round(difficulty[k] * 100)}% of students"
+            for k in np.argsort(difficulty, kind="stable")[:3] if difficulty[k] < WEAK_TOPIC_THRESHOLD
+        ]
+
+    output = {
+        "statistics": {
+            "average_score": round(scores.mean, 2),
+            "max_score": round(scores.max, 2),
+            "min_score": round(scores.min, 2),
+            "total_students": scores.count,
+            "total_questions": n_questions or None
+        },
+        "distribution": scores.statistics(),
+        "performance_level": performance_level,
+        "weak_topics": weak_topics,
+        "suggestions": suggestions
+    }
+    if aggregate.responses:
+        analysis = aggregate.item_statistics()
+        output["item_analysis"] = analysis["items"]
+        output["reliability"] = {"cronbach_alpha": analysis["cronbach_alpha"]}
+    if topic_mastery:
+        output["topic_mastery"] = topic_mastery
+    return output
+
+
+def _aggregate_covers(aggregate: QuizAggregate, results: List[Dict]) -> bool:
+    """True if the aggregate is populated and accounts for exactly these results."""
+    if aggregate.scores.count == 0:
+        return False
+    return not results or aggregate.scores.count == len(results)
+
+
+def _performance_insights(avg_score: float):
+    """Performance level and suggestions for an average percentage score."""
     # Determine performance level
     performance_level = "excellent" if avg_score >= 90 else \
                        "good" if avg_score >= 75 else \
                        "fair" if avg_score >= 60 else "needs_improvement"
-    
-    # Mock weak topics (would be calculated from actual question analysis)
-    weak_topics = [
-        "Topic A needs more practice",
-        "Topic B requires additional review"
-    ] if avg_score < 80 else []
-    
+
     suggestions = []
     if avg_score < 75:
         suggestions.append("Consider additional practice sessions")
         suggestions.append("Review foundational concepts")
     elif avg_score >= 90:
         suggestions.append("Excellent performance! Consider advanced topics")
-    
-    return {
-        "statistics": {
-            "average_score": round(avg_score, 2),
-            "max_score": max_score,
-            "min_score": min_score,
-            "total_students": len(results),
-            "total_questions": total_questions
-        },
-        "performance_level": performance_level,
-        "weak_topics": weak_topics,
-        "suggestions": suggestions
-    }
+    return performance_level, suggestions
+
+
+def analyze_topic_mastery(blocks: Sequence) -> Dict:
+    """
+    Per-topic mastery for many quizzes and cohorts in one call.
+
+    Args:
+        blocks: Iterable of (cohort, ResponseMatrix, question_topics), e.g.
+            one block per (class, quiz)
+
+    Returns:
+        {cohort: {"topic_mastery": [...], "weak_topics": [...]}}
+    """
+    grouped = topic_mastery_many(blocks)
+    report = {}
+    for i, cohort in enumerate(grouped["cohorts"]):
+        rows = _topic_rows(grouped, i)
+        report[cohort] = {"topic_mastery": rows, "weak_topics": _weak_topic_messages(rows)}
+    return report
+
+
+def _topic_rows(grouped: Dict, cohort_index: int) -> List[Dict]:
+    """Topic mastery rows for one cohort, weakest first."""
+    rows = []
+    for j, topic in enumerate(grouped["topics"]):
+        if grouped["questions"][cohort_index, j] == 0:
+            continue
+        rows.append({
+            "topic": topic,
+            "mastery": round(float(grouped["mastery"][cohort_index, j]), 4),
+            "questions": int(grouped["questions"][cohort_index, j])
+        })
+    return sorted(rows, key=lambda row: row["mastery"])
+
+
+def _weak_topic_messages(rows: List[Dict]) -> List[str]:
+    return [
+        f"{row['topic']} needs more practice ({round(row['mastery'] * 100)}% mastery)"
+        for row in rows if row["mastery"] < WEAK_TOPIC_THRESHOLD
+    ]
+
+
+@cpu_bound("thread")
+def score_trends(
+    store: ResultsStore,
+    subject: Optional[str] = None,
+    chapter: Optional[str] = None,
+    class_names: Optional[Sequence[str]] = None,
+    start=None,
+    end=None,
+    period="month"
+) -> Dict:
+    """
+    Score trend per class and period from the historical results store.
+
+    Args:
+        store: ResultsStore to query
+        subject: Subject filter (e.g. "Physics")
+        chapter: Chapter filter (e.g. "Chapter 5")
+        class_names: Restrict to these classes
+        start: Inclusive start (date, datetime or ISO string)
+        end: Exclusive end
+        period: "week", "month", "quarter", "year", None (one bucket), or a
+            list of (label, start, end) windows such as school terms
+
+    Returns:
+        {"periods": [labels], "classes": {class: [{"period", "count", "mean",
+        "std", "p25", "p50", "p75"}, ...]}}
+    """
+    partitions = store.partitions(subject, chapter, class_names, start, end)
+    columns = store.scan(partitions, start, end)
+    if columns["scores"].size == 0:
+        return {"periods": [], "classes": {}}
+
+    labels, period_idx, keep = _period_index(columns["timestamps"], period)
+    class_vocab, class_of_partition = np.unique(
+        [p.class_name or "Unassigned" for p in partitions], return_inverse=True
+    )
+    class_idx = class_of_partition[columns["partition"][keep]]
+    n_periods = len(labels)
+    stats = grouped_statistics(
+        columns["scores"][keep], class_idx * n_periods + period_idx, len(class_vocab) * n_periods
+    )
+
+    classes = {}
+    for c, class_name in enumerate(class_vocab):
+        rows = []
+        for k, label in enumerate(labels):
+            g = c * n_periods + k
+            if stats["count"][g] == 0:
+                continue
+            rows.append({"period": label, "count": int(stats["count"][g]),
+                         **{name: round(float(stats[name][g]), 2) for name in ("mean", "std", "p25", "p50", "p75")}})
+        if rows:
+            classes[str(class_name)] = rows
+    return {"periods": labels, "classes": classes}
+
+
+@cpu_bound("thread")
+def compare_cohorts(
+    store: ResultsStore,
+    subject: Optional[str] = None,
+    chapter: Optional[str] = None,
+    start=None,
+    end=None,
+    question_topics: Optional[Dict[str, Sequence[Optional[str]]]] = None
+) -> Dict:
+    """
+    Side-by-side class statistics over a window, optionally with topic mastery.
+
+    Args:
+        store: ResultsStore to query
+        subject: Subject filter
+        chapter: Chapter filter
+        start: Inclusive start
+        end: Exclusive end
+        question_topics: {quiz_id: topic per question} (see
+            QuizStore.question_topics_many); enables per-class topic mastery
+            for partitions that stored per-question credit
+
+    Returns:
+        {class: {"count", "mean", "std", "p25", "p50", "p75"[, "topic_mastery", "weak_topics"]}}
+    """
+    trends = score_trends(store, subject, chapter, start=start, end=end, period=None)
+    report = {name: {k: v for k, v in rows[0].items() if k != "period"} for name, rows in trends["classes"].items()}
+    if not question_topics:
+        return report
+
+    blocks = []
+    for partition in store.partitions(subject, chapter, start=start, end=end):
+        topics = question_topics.get(partition.quiz_id)
+        if topics is None or not partition.has_column("credit"):
+            continue
+        credit = partition.column("credit")
+        if credit.shape[1] != len(topics):
+            continue
+        mask = partition.date_mask(start, end)
+        if mask.any():
+            blocks.append((partition.class_name or "Unassigned", ResponseMatrix(credit[mask]), topics))
+    for class_name, mastery in analyze_topic_mastery(blocks).items():
+        report.setdefault(class_name, {}).update(mastery)
+    return report
+
+
+@cpu_bound("thread")
+def student_topic_mastery(
+    store: ResultsStore,
+    question_topics: Dict[str, Sequence[Optional[str]]],
+    class_names: Optional[Sequence[str]] = None
+) -> Dict:
+    """
+    Per-student, per-topic mastery from every graded response in the store.
+
+    All partitions with per-question credit are laid side by side as one
+    students x questions matrix (oldest quiz first; a student's latest
+    attempt wins within a quiz) and traced with vectorized BKT.
+
+    Args:
+        store: ResultsStore to read
+        question_topics: {quiz_id: topic per question}; other quizzes are skipped
+        class_names: Restrict to these classes
+
+    Returns:
+        {"students": [ids], "topics": [names], "mastery": students x topics
+        (NaN = no evidence), "evidence": answered question counts}
+    """
+    blocks = []
+    for partition in store.partitions(class_names=class_names):
+        topics = question_topics.get(partition.quiz_id)
+        if topics is None or not partition.has_column("credit") or not partition.has_column("students"):
+            continue
+        credit = partition.column("credit")
+        if credit.shape[1] == len(topics):
+            blocks.append((partition, np.asarray(partition.column("students")), credit, topics))
+    if not blocks:
+        return {"students": [], "topics": [], "mastery": np.zeros((0, 0)), "evidence": np.zeros((0, 0))}
+
+    students = np.unique(np.concatenate([b[1] for b in blocks]))
+    # Topic names differing only in case/punctuation are one topic (first spelling kept)
+    spellings: Dict[str, str] = {}
+    for _, _, _, topics in blocks:
+        for topic in topics:
+            if topic:
+                spellings.setdefault(topic_key(topic), topic)
+    topic_vocab = sorted(spellings.values())
+    topic_index = {topic_key(t): i for i, t in enumerate(topic_vocab)}
+
+    # One column block per quiz, in order of the quiz's first partition
+    quiz_order = list(dict.fromkeys(b[0].quiz_id for b in blocks))
+    offsets, width = {}, 0
+    for quiz_id in quiz_order:
+        offsets[quiz_id] = width
+        width += len(question_topics[quiz_id])
+    credit = np.full((len(students), width), np.nan)
+    for partition, ids, block, _ in blocks:
+        start = offsets[partition.quiz_id]
+        credit[np.searchsorted(students, ids), start:start + block.shape[1]] = block
+    column_topics = [
+        topic_index[topic_key(t)] if t else -1
+        for quiz_id in quiz_order for t in question_topics[quiz_id]
+    ]
+
+    traced = knowledge_tracing(credit, column_topics, len(topic_vocab))
+    return {"students": students.tolist(), "topics": topic_vocab, **traced}
+
+
+def _period_index(timestamps: np.ndarray, period):
+    """
+    Bucket epoch-second timestamps into periods.
+
+    Returns:
+        (labels, period index per kept row, keep mask)
+    """
+    if period is None:
+        return ["all"], np.zeros(timestamps.size, dtype=np.int64), np.ones(timestamps.size, dtype=bool)
+
+    if not isinstance(period, str):
+        # Explicit windows, e.g. [("Term 1", "2024-01-08", "2024-04-01"), ...]
+        index = np.full(timestamps.size, -1, dtype=np.int64)
+        for k, (_, window_start, window_end) in enumerate(period):
+            inside = (index < 0) & (timestamps >= to_epoch(window_start)) & (timestamps < to_epoch(window_end))
+            index[inside] = k
+        keep = index >= 0
+        return [str(label) for label, _, _ in period], index[keep], keep
+
+    if period not in TREND_PERIODS:
+        raise ValueError(f"period must be one of {TREND_PERIODS}, None or a list of windows")
+    days = timestamps // 86400
+    months = timestamps.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+    if period == "week":
+        # Epoch day 0 was a Thursday; shift to the Monday starting each week
+        keys = days - (days + 3) % 7
+        labels = [str(np.datetime64(int(k), "D")) for k in np.unique(keys)]
+    elif period == "month":
+        keys = months
+        labels = [str(np.datetime64(int(k), "M")) for k in np.unique(keys)]
+    elif period == "quarter":
+        keys = months // 3
+        labels = [f"{1970 + k // 4}-Q{k % 4 + 1}" for k in np.unique(keys).tolist()]
+    else:
+        keys = months // 12
+        labels = [str(1970 + k) for k in np.unique(keys).tolist()]
+    index = np.unique(keys, return_inverse=True)[1]
+    return labels, index, np.ones(timestamps.size, dtype=bool)
+
+
+def analytics_delta(previous: Optional[Dict], current: Dict) -> Dict:
+    """
+    What changed between two analytics results (summarize_aggregate shape).
+
+    Returns:
+        {"statistics": {field: new value}, "questions": {id: {"difficulty",
+        "change"}}, "topics": {topic: {"mastery", "change"}}, "weak_topics":
+        {"added", "removed", "current"}} with unchanged sections omitted;
+        {} if nothing changed
+    """
+    previous = previous or {}
+    delta: Dict = {}
+
+    old_stats = previous.get("statistics", {})
+    stats = {k: v for k, v in current.get("statistics", {}).items() if old_stats.get(k) != v}
+    if stats:
+        delta["statistics"] = stats
+    if current.get("performance_level") != previous.get("performance_level"):
+        delta["performance_level"] = current.get("performance_level")
+
+    for section, key, field, name in (
+        ("item_analysis", "question", "difficulty", "questions"),
+        ("topic_mastery", "topic", "mastery", "topics"),
+    ):
+        old = {row[key]: row[field] for row in previous.get(section, [])}
+        changed = {
+            row[key]: {field: row[field], "change": round(row[field] - old[row[key]], 4) if row[key] in old else None}
+            for row in current.get(section, [])
+            if old.get(row[key]) != row[field]
+        }
+        if changed:
+            delta[name] = changed
+
+    # Compare weak topics by name; the messages embed percentages that move on every update
+    old_weak, new_weak = _weak_names(previous), _weak_names(current)
+    if old_weak != new_weak:
+        delta["weak_topics"] = {
+            "added": sorted(new_weak - old_weak),
+            "removed": sorted(old_weak - new_weak),
+            "current": current.get("weak_topics", [])
+        }
+    return delta
+
+
+def _weak_names(result: Dict) -> set:
+    """Weak topic names (or question IDs when there is no topic mapping)."""
+    if result.get("topic_mastery"):
+        return {row["topic"] for row in result["topic_mastery"] if row["mastery"] < WEAK_TOPIC_THRESHOLD}
+    return {row["question"] for row in result.get("item_analysis", []) if row["difficulty"] < WEAK_TOPIC_THRESHOLD}
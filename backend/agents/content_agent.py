@@ -4,9 +4,12 @@ Content Agent - Extracts key academic concepts from chapter notes
 This agent uses Gemini service to identify important topics
 and prepare structured data for the Quiz Agent.
 """
-import json
 from typing import Dict, List, Optional
 from services.gemini_service import GeminiService
+from services.prompts import CONTENT_ANALYSIS, CONTENT_SUMMARY
+from utils.json_repair import loads_lenient
+from utils.metrics import metrics
+from utils.offload import io_bound
 
 
 class ContentOutput:
@@ -22,6 +25,7 @@ class ContentOutput:
         }
 
 
+@io_bound()
 def extract_content(
     subject: str,
     chapter: str,
@@ -44,57 +48,33 @@ def extract_content(
     if not notes or len(notes.strip()) < 20:
         notes = _generate_mock_notes(subject, chapter)
     
-    # Build prompt for Gemini
-    prompt = f"""You are an academic content analyzer for education.
-
-Analyze the following {subject} notes from {chapter} and extract:
-1. The most important key topics (3-7 topics)
-2. A brief academic summary (1-2 sentences)
-
-NOTES:
-{notes}
-
-Respond with ONLY valid JSON in this exact format (no markdown, no explanation):
-{{
-    "key_topics": ["Topic 1", "Topic 2", "Topic 3"],
-    "summary": "Brief academic summary of the chapter content."
-}}
-
-Rules:
-- Extract only the most important concepts
-- Use academic tone
-- Keep summary under 50 words
-- JSON only, no extra text"""
+    # Build prompt for Gemini (long notes are condensed to the stage budget)
+    prompt = CONTENT_ANALYSIS.build(subject=subject, chapter=chapter, notes=notes)
 
     try:
         # Call Gemini
-        response = gemini_service.generate_content(prompt)
+        response = gemini_service.generate_content(prompt, stage=CONTENT_ANALYSIS.name)
         
-        # Clean response
-        response = response.strip()
-        if response.startswith("```json"):
-            response = response[7:]
-        if response.startswith("```"):
-            response = response[3:]
-        if response.endswith("```"):
-            response = response[:-3]
-        response = response.strip()
+        # Parse JSON (fences, prose, trailing commas and truncation tolerated)
+        data = loads_lenient(response)
+        if not isinstance(data, dict):
+            raise ValueError("expected a JSON object")
         
-        # Parse JSON
-        data = json.loads(response)
-        
-        key_topics = data.get("key_topics", [])
+        key_topics = [str(t) for t in data.get("key_topics") or [] if t]
         summary = data.get("summary", "")
         
         # Validate
         if not key_topics:
             key_topics = _fallback_topics(subject, chapter)
+        if not summary:
+            # Usually a reply cut off after the topics: ask for the summary alone
+            summary = _request_summary(subject, chapter, notes, gemini_service)
         if not summary:
             summary = f"Key concepts from {subject} - {chapter}"
         
         return ContentOutput(key_topics=key_topics, summary=summary)
         
-    except (json.JSONDecodeError, Exception) as e:
+    except Exception as e:
         print(f"Content Agent error: {e}")
         # Return fallback
         return ContentOutput(
@@ -103,6 +83,13 @@ Rules:
         )
 
 
+def _request_summary(subject: str, chapter: str, notes: str, gemini_service: GeminiService) -> str:
+    """One- or two-sentence summary of the notes as plain text ("" if none)."""
+    metrics.incr("content.summary_requested")
+    prompt = CONTENT_SUMMARY.build(subject=subject, chapter=chapter, notes=notes)
+    return (gemini_service.generate_content(prompt, stage=CONTENT_SUMMARY.name) or "").strip().strip('"')
+
+
 def _generate_mock_notes(subject: str, chapter: str) -> str:
     """Generate mock notes for demo purposes."""
     mock_notes = {
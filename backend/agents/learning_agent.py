@@ -2,10 +2,51 @@
 Learning Agent - Generates personalized learning paths
 
 This agent creates structured learning plans from syllabus/content.
+The syllabus is turned into a topic prerequisite graph once (LLM
+extraction, with a heuristic fallback), persisted under its content hash,
+and plans are computed from the graph by topological ordering - so repeat
+requests for the same syllabus never reach the LLM.
+
+Class-wide plans reuse the same graph: each student's topic mastery
+(engines/mastery_engine.py) decides which topics they learn, review or
+skip, so a whole cohort costs at most one LLM call per syllabus (for
+topic-level study guidance), not one per student.
 """
-from typing import List, Dict, Optional
+import json
+import re
+from typing import Any, List, Dict, Optional, Sequence, Tuple
+
+import numpy as np
 from pydantic import BaseModel
 
+from engines.curriculum_engine import LEVELS, TopicGraph, build_plan, hours_text, syllabus_hash, topic_key
+from engines.mastery_engine import LEARN, MASTERED, REVIEW, mastery_status
+from services.gemini_service import GeminiService
+from services.prompts import TOPIC_GRAPH, TOPIC_GUIDANCE
+from storage.curriculum_store import CurriculumStore
+from utils.cache import TTLCache
+from utils.json_repair import loads_lenient
+from utils.metrics import metrics
+from utils.offload import io_bound
+
+
+MAX_TOPICS = 30
+MEMO_TTL = 24 * 3600
+# Heuristic graphs expire sooner so an LLM that becomes available can replace them
+HEURISTIC_TTL = 300
+
+# Weakest topics listed as a student's focus, and review time relative to learning
+FOCUS_TOPICS = 3
+REVIEW_PACE = 0.5
+# Token overlap for matching a quiz topic to a syllabus topic with a different name
+TOPIC_MATCH_THRESHOLD = 0.5
+
+# syllabus hash -> (TopicGraph, ttl), and (hash, level) -> plan; single-flight per syllabus
+_graphs = TTLCache(maxsize=512, default_ttl=MEMO_TTL)
+_plans = TTLCache(maxsize=2048, default_ttl=MEMO_TTL)
+# syllabus hash -> {topic name: {"learn": tip, "review": tip}}
+_guidance = TTLCache(maxsize=512, default_ttl=MEMO_TTL)
+
 
 class LearningTopic(BaseModel):
     """Single topic in a learning path (defined for future use)"""
@@ -21,46 +62,277 @@ class LearningPlan(BaseModel):
     total_estimated_time: str
 
 
+@io_bound()
 def generate_learning_plan(
     syllabus: str,
-    student_level: Optional[str] = None
+    student_level: Optional[str] = None,
+    gemini_service: Optional[GeminiService] = None,
+    store: Optional[CurriculumStore] = None
 ) -> Dict:
     """
     Generate personalized learning path from syllabus.
-    
+
     Args:
         syllabus: Syllabus or curriculum content
         student_level: Optional student level (beginner/intermediate/advanced)
-        
+        gemini_service: LLM used to extract the topic graph (heuristic
+            extraction without one)
+        store: Persistent topic graph store (in-process memo only without one)
+
     Returns:
         Dictionary with learning plan structure
     """
-    # MVP: Return structured mock plan
-    # Future: Use Gemini to analyze syllabus and create plan
-    
+    digest = syllabus_hash(syllabus)
+    key = (digest, student_level)
+    plan = _plans.get(key)
+    if plan is not None:
+        metrics.incr("learning_plan.memo_hit")
+        return {**plan, "cached": True}
+
+    def load():
+        entry = _load_or_extract(digest, syllabus, gemini_service, store)
+        return entry, entry[1]
+
+    graph, ttl = _graphs.get_or_load(digest, load)
+    plan = build_plan(graph, student_level)
+    plan["syllabus_hash"] = digest
+    _plans.set(key, plan, ttl)
+    return {**plan, "cached": False}
+
+
+@io_bound()
+def generate_class_plans(
+    syllabus: str,
+    mastery: Dict[str, Any],
+    gemini_service: Optional[GeminiService] = None,
+    store: Optional[CurriculumStore] = None
+) -> Dict:
+    """
+    Personalized plans for every student of a cohort at once.
+
+    Args:
+        syllabus: Syllabus or curriculum content
+        mastery: analytics_agent.student_topic_mastery() output
+        gemini_service: LLM used for the topic graph and topic guidance
+        store: Persistent topic graph store
+
+    Returns:
+        {"students", "topics": class-level topic summary, "plans": one per
+        student with their weakest topics and the topics to learn or
+        review in prerequisite order, "unmapped_topics"}
+    """
+    digest = syllabus_hash(syllabus)
+
+    def load():
+        entry = _load_or_extract(digest, syllabus, gemini_service, store)
+        return entry, entry[1]
+
+    graph, ttl = _graphs.get_or_load(digest, load)
+    layers, _ = graph.topological_layers()
+    levels = graph.difficulty_levels(layers)
+    order = [i for layer in layers for i in sorted(layer, key=lambda i: (levels[i], i))]
+    guidance = _guidance.get_or_load(digest, lambda: (_topic_guidance(graph, gemini_service), ttl))
+
+    # students x graph topics; several quiz topics mapping to one graph topic are averaged
+    students = list(mastery["students"])
+    columns = _match_topics(mastery["topics"], [t["name"] for t in graph.topics])
+    scores = np.full((len(students), len(graph.topics)), np.nan)
+    observed = np.asarray(mastery["mastery"], dtype=np.float64).reshape(len(students), len(mastery["topics"]))
+    for g in set(c for c in columns if c is not None):
+        block = observed[:, [j for j, c in enumerate(columns) if c == g]]
+        scores[:, g] = _nan_mean(block, axis=1)
+    status = mastery_status(scores)
+
+    hours = np.array([t["hours"] for t in graph.topics])
+    study = np.where(status == LEARN, hours, np.where(status == REVIEW, hours * REVIEW_PACE, 0.0))
+    study = np.round(study * 2) / 2
+    # Weakest topics first; untested topics rank as 0 mastery
+    weakest = np.argsort(np.nan_to_num(scores, nan=0.0), axis=1, kind="stable")[:, :FOCUS_TOPICS]
+    actions = np.where(status == LEARN, "learn", "review")
+
+    plans = []
+    for s, student in enumerate(students):
+        topics = [
+            {
+                "topic": graph.topics[i]["name"],
+                "action": str(actions[s, i]),
+                "difficulty": LEVELS[levels[i]],
+                "mastery": _rounded(scores[s, i]),
+                "resources": graph.topics[i]["resources"],
+                "guidance": guidance.get(graph.topics[i]["name"], {}).get(actions[s, i]),
+                "estimated_time": hours_text(study[s, i] or 0.5)
+            }
+            for i in order if status[s, i] != MASTERED
+        ]
+        plans.append({
+            "student": student,
+            "focus": [graph.topics[i]["name"] for i in weakest[s] if status[s, i] != MASTERED],
+            "mastered": int((status[s] == MASTERED).sum()),
+            "topics": topics,
+            "total_estimated_time": hours_text(float(study[s].sum()))
+        })
+
+    class_mastery = _nan_mean(scores, axis=0)
+    return {
+        "syllabus_hash": digest,
+        "students": len(students),
+        "topics": [
+            {
+                "topic": graph.topics[i]["name"],
+                "class_mastery": _rounded(class_mastery[i]),
+                "students_to_learn": int((status[:, i] == LEARN).sum()),
+                "students_to_review": int((status[:, i] == REVIEW).sum())
+            }
+            for i in order
+        ],
+        "plans": plans,
+        "unmapped_topics": [t for t, c in zip(mastery["topics"], columns) if c is None]
+    }
+
+
+def _match_topics(names: Sequence[str], graph_names: Sequence[str]) -> List[Optional[int]]:
+    """Graph topic index per quiz topic: same normalized name, else best token overlap."""
+    exact = {topic_key(name): i for i, name in enumerate(graph_names)}
+    tokens = [set(topic_key(name).split()) for name in graph_names]
+    result = []
+    for name in names:
+        index = exact.get(topic_key(name))
+        if index is None:
+            words = set(topic_key(name).split())
+            overlap = [len(words & t) / len(words | t) if words | t else 0.0 for t in tokens]
+            best = int(np.argmax(overlap)) if overlap else -1
+            index = best if best >= 0 and overlap[best] >= TOPIC_MATCH_THRESHOLD else None
+        result.append(index)
+    return result
+
+
+def _nan_mean(values: np.ndarray, axis: int) -> np.ndarray:
+    """Mean ignoring NaN; NaN where a row/column has no values (without warnings)."""
+    counts = (~np.isnan(values)).sum(axis=axis)
+    return np.where(counts > 0, np.nansum(values, axis=axis) / np.maximum(counts, 1), np.nan)
+
+
+def _rounded(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 3)
+
+
+def _topic_guidance(graph: TopicGraph, gemini_service: Optional[GeminiService]) -> Dict[str, Dict[str, str]]:
+    """
+    One study tip per topic for students learning it and for those
+    reviewing it - from the LLM when available, else from the resources.
+    """
+    names = [t["name"] for t in graph.topics]
+    fallback = {
+        t["name"]: {
+            "learn": f"Work through {t['resources'][0] if t['resources'] else 'the notes'} and practice examples of {t['name']}.",
+            "review": f"Revisit your mistakes on {t['name']} and retry similar questions."
+        }
+        for t in graph.topics
+    }
+    if gemini_service is None or not names:
+        return fallback
+
+    prompt = TOPIC_GUIDANCE.build(topics=json.dumps(names))
+    with metrics.timed("learning_plan.llm_guidance"):
+        data = _json_response(gemini_service.generate_content(prompt, stage=TOPIC_GUIDANCE.name))
+    if data is None:
+        return fallback
+    by_key = {topic_key(name): name for name in names}
+    for item in data.get("topics") or []:
+        if isinstance(item, dict) and topic_key(str(item.get("name", ""))) in by_key:
+            name = by_key[topic_key(str(item["name"]))]
+            fallback[name] = {
+                "learn": str(item.get("learn") or fallback[name]["learn"]),
+                "review": str(item.get("review") or fallback[name]["review"])
+            }
+    return fallback
+
+
+def _json_response(response: Optional[str]) -> Optional[Dict]:
+    """Parse an LLM JSON reply (see utils/json_repair.py); None if unusable."""
+    if not response:
+        return None
+    try:
+        data = loads_lenient(response)
+    except ValueError as e:
+        print(f"Learning Agent error: {e}")
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _load_or_extract(
+    digest: str,
+    syllabus: str,
+    gemini_service: Optional[GeminiService],
+    store: Optional[CurriculumStore]
+) -> Tuple[TopicGraph, float]:
+    """
+    Stored graph for the syllabus, else extract it.
+
+    Returns:
+        (graph, memo TTL) - LLM graphs are persisted; heuristic ones are
+        only memoized briefly
+    """
+    if store is not None:
+        graph = store.load(digest)
+        if graph is not None:
+            metrics.incr("learning_plan.graph_loaded")
+            return graph, MEMO_TTL
+
+    graph = _extract_with_llm(syllabus, gemini_service) if gemini_service is not None else None
+    if graph is None:
+        return _extract_heuristic(syllabus), HEURISTIC_TTL
+    if store is not None:
+        store.save(digest, graph)
+    return graph, MEMO_TTL
+
+
+def _extract_with_llm(syllabus: str, gemini_service: GeminiService) -> Optional[TopicGraph]:
+    """Ask the LLM for topics and prerequisites; None if it gives nothing usable."""
+    prompt = TOPIC_GRAPH.build(max_topics=MAX_TOPICS, syllabus=syllabus)
+    with metrics.timed("learning_plan.llm_extract"):
+        data = _json_response(gemini_service.generate_content(prompt, stage=TOPIC_GRAPH.name))
+    if data is None:
+        return None
+
     topics = [
         {
-            "topic": "Introduction to Core Concepts",
-            "difficulty": "beginner",
-            "resources": ["Textbook Chapter 1", "Video Lecture 1"],
-            "estimated_time": "2 hours"
-        },
-        {
-            "topic": "Intermediate Applications",
-            "difficulty": "intermediate",
-            "resources": ["Textbook Chapter 2", "Practice Problems Set 1"],
-            "estimated_time": "3 hours"
-        },
-        {
-            "topic": "Advanced Topics",
-            "difficulty": "advanced",
-            "resources": ["Textbook Chapter 3", "Case Studies"],
-            "estimated_time": "4 hours"
+            "name": t.get("name"),
+            "difficulty": t.get("difficulty"),
+            "hours": t.get("estimated_hours"),
+            "resources": t.get("resources"),
+            "prerequisites": t.get("prerequisites"),
         }
+        for t in (data.get("topics") or [])[:MAX_TOPICS]
+        if isinstance(t, dict) and t.get("name")
     ]
-    
-    return {
-        "topics": topics,
-        "total_estimated_time": "9 hours",
-        "student_level": student_level or "intermediate"
-    }
+    return TopicGraph.from_prerequisites(topics) if topics else None
+
+
+_ITEM_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)]|[A-Za-z][.)]|(?:unit|chapter|week|module)\s*\d+\s*[:.-]?)\s*", re.I)
+
+
+def _extract_heuristic(syllabus: str) -> TopicGraph:
+    """
+    Topics from list items (or sentences) of the syllabus, each building on
+    the previous one, with difficulty left to the graph depth.
+    """
+    items: List[Tuple[str, bool]] = []
+    for line in syllabus.splitlines():
+        text = line.strip()
+        if not text:
+            continue
+        stripped = _ITEM_RE.sub("", text)
+        items.append((stripped, stripped != text))
+    listed = [text for text, is_item in items if is_item]
+    if len(listed) < 2:
+        listed = [s.strip() for s in re.split(r"[.;\n]+", syllabus) if len(s.strip().split()) >= 2]
+    names = [text.rstrip(":.").strip()[:80] for text in listed if text.strip()][:MAX_TOPICS]
+    if not names:
+        names = ["Introduction to Core Concepts", "Intermediate Applications", "Advanced Topics"]
+
+    topics = [
+        {"name": name, "resources": [f"Study notes: {name}"], "prerequisites": [names[i - 1]] if i else []}
+        for i, name in enumerate(names)
+    ]
+    return TopicGraph.from_prerequisites(topics)
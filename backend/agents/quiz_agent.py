@@ -2,15 +2,41 @@
 Quiz Agent - Generates structured quiz questions from educational content
 
 This agent uses Gemini service for content generation.
-It does NOT call Google APIs directly.
+It does NOT call Google APIs directly. With a question bank, stored
+questions are used first and Gemini only writes the missing ones.
+Near-duplicate questions (MinHash/LSH, engines/dedup_engine.py) are
+rejected and only those are regenerated. Only model output is banked;
+when the model is unavailable the quiz is padded with placeholders.
 """
-import json
-from typing import List
+import re
+from typing import List, Optional
 from schemas.models import QuizQuestion, QuizOutput
+from engines.dedup_engine import NearDuplicateDetector
 from services.gemini_service import GeminiService
+from services.prompts import max_questions_per_call
+from storage.question_bank import QuestionBank
+from utils.json_repair import loads_lenient, salvage_items
+from utils.metrics import metrics
+from utils.offload import io_bound
 
 
-def generate_quiz(content: str, num_questions: int, gemini_service: GeminiService) -> QuizOutput:
+# Extra model calls for questions rejected as near-duplicates or lost to malformed output
+MAX_REGENERATION_ROUNDS = 2
+MAX_AVOID_LISTED = 30
+
+
+@io_bound()
+def generate_quiz(
+    content: str,
+    num_questions: int,
+    gemini_service: GeminiService,
+    key_topics: Optional[List[str]] = None,
+    bank: Optional[QuestionBank] = None,
+    subject: Optional[str] = None,
+    chapter: Optional[str] = None,
+    class_name: Optional[str] = None,
+    difficulty: Optional[str] = None
+) -> QuizOutput:
     """
     Generate quiz questions from educational content.
     
@@ -18,6 +44,14 @@ def generate_quiz(content: str, num_questions: int, gemini_service: GeminiServic
         content: Educational text/content (from Classroom, Docs, or manual input)
         num_questions: Number of questions to generate
         gemini_service: GeminiService instance for text generation
+        key_topics: Key topics from the Content Agent; each question is
+            tagged with the one it tests
+        bank: Question bank to serve questions from first; newly generated
+            questions are added to it
+        subject: Subject the bank is searched and filled under
+        chapter: Chapter the bank is searched and filled under
+        class_name: Class the quiz is for (recently used questions are skipped)
+        difficulty: Optional difficulty label for bank lookups
         
     Returns:
         QuizOutput with structured questions
@@ -28,69 +62,194 @@ def generate_quiz(content: str, num_questions: int, gemini_service: GeminiServic
     
     if num_questions > 50:
         num_questions = 50  # Cap at 50
-    
+
+    use_bank = bank is not None and bool(subject)
+    detector = NearDuplicateDetector()
+    questions: List[QuizQuestion] = []
+    if use_bank:
+        for q in bank.select(subject, chapter, num_questions, key_topics, difficulty, class_name):
+            if detector.add_if_new(q["question"]):
+                questions.append(QuizQuestion(**{**q, "topic": match_topic(q.get("topic"), q["question"], key_topics)}))
+        metrics.incr("question_bank.served", len(questions))
+
+    # Only the remainder reaches the model; near-duplicates (within the quiz
+    # or of banked questions) and questions lost from a malformed reply are
+    # asked for again, up to MAX_REGENERATION_ROUNDS
+    generated: List[QuizQuestion] = []
+    bank_clashes: List[QuizQuestion] = []  # New to this quiz, but close to a banked question
+    prompt_content = content
+    for attempt in range(MAX_REGENERATION_ROUNDS + 1):
+        missing = num_questions - len(questions) - len(generated)
+        if missing <= 0:
+            break
+        batch = _generate_questions(prompt_content, missing, gemini_service, key_topics)
+        if batch is None:
+            break
+        if attempt:
+            metrics.incr("quiz.regenerated", len(batch))
+        in_bank = bank.find_similar([q.question for q in batch], subject, chapter) if use_bank else [None] * len(batch)
+        duplicates = 0
+        for question, match in zip(batch, in_bank):
+            if match is not None:
+                bank_clashes.append(question)
+            elif detector.add_if_new(question.question):
+                generated.append(question)
+                continue
+            duplicates += 1
+        if not duplicates:
+            continue
+        metrics.incr("quiz.near_duplicates", duplicates)
+        if attempt and duplicates == len(batch):
+            # The model keeps repeating itself; more rounds would only waste calls
+            break
+        prompt_content = _avoid_repeats(content, [q.question for q in questions + generated])
+
+    if use_bank and generated:
+        bank.add([q.model_dump() for q in generated], subject, chapter, difficulty)
+        metrics.incr("question_bank.generated", len(generated))
+    questions = (questions + generated)[:num_questions]
+
+    # Still short: questions the class saw recently, then rejects that only
+    # clashed with the bank (never ones repeating this quiz), then placeholders
+    if use_bank and len(questions) < num_questions:
+        reused = 0
+        for q in bank.select(subject, chapter, num_questions, key_topics, difficulty, class_name, recent_days=0):
+            if len(questions) == num_questions:
+                break
+            if detector.add_if_new(q["question"]):
+                questions.append(QuizQuestion(**{**q, "topic": match_topic(q.get("topic"), q["question"], key_topics)}))
+                reused += 1
+        metrics.incr("question_bank.reused_recent", reused)
+    for question in bank_clashes:
+        if len(questions) == num_questions:
+            break
+        if detector.add_if_new(question.question):
+            questions.append(question)
+            metrics.incr("quiz.bank_clashes_served")
+
+    if use_bank and questions:
+        bank.mark_used([q.model_dump() for q in questions], subject, chapter, class_name)
+    missing = num_questions - len(questions)
+    if missing:
+        metrics.incr("quiz.placeholders", missing)
+        questions.extend(_fallback_questions(len(questions), missing, key_topics))
+    return QuizOutput(questions=questions)
+
+
+def _avoid_repeats(content: str, questions: List[str]) -> str:
+    """Content with a note listing questions the model must not repeat or paraphrase."""
+    listed = "\n".join(f"- {q}" for q in questions[-MAX_AVOID_LISTED:])
+    return f"{content}\n\nDo not repeat or paraphrase any of these existing questions:\n{listed}\n"
+
+
+def _generate_questions(
+    content: str,
+    num_questions: int,
+    gemini_service: GeminiService,
+    key_topics: Optional[List[str]]
+) -> Optional[List[QuizQuestion]]:
+    """
+    Ask the model for questions; the valid ones it returned, or None if
+    nothing could be recovered from the reply.
+
+    Malformed replies (prose, fences, trailing commas, a truncated array)
+    keep every complete question; generate_quiz() then asks only for the
+    remainder.
+    """
+    # Large quizzes are split so each reply fits the output token budget
+    per_call = max_questions_per_call()
+    questions: Optional[List[QuizQuestion]] = None
+    for start in range(0, num_questions, per_call):
+        batch = _request_questions(content, min(per_call, num_questions - start), gemini_service, key_topics)
+        if batch is not None:
+            questions = (questions or []) + batch
+    return questions
+
+
+def _request_questions(
+    content: str,
+    num_questions: int,
+    gemini_service: GeminiService,
+    key_topics: Optional[List[str]]
+) -> Optional[List[QuizQuestion]]:
+    """One generation call for at most max_questions_per_call() questions."""
     # Call Gemini service to generate questions
-    quiz_json_str = gemini_service.generate_quiz_questions(content, num_questions)
+    quiz_json_str = gemini_service.generate_quiz_questions(content, num_questions, key_topics)
+    if quiz_json_str is None:
+        # No model answered; generate_quiz() pads with placeholders
+        metrics.incr("quiz.model_unavailable")
+        return None
     
     # Parse JSON response
     try:
-        # Clean response (remove markdown code blocks if present)
-        quiz_json_str = quiz_json_str.strip()
-        if quiz_json_str.startswith("```json"):
-            quiz_json_str = quiz_json_str[7:]
-        if quiz_json_str.startswith("```"):
-            quiz_json_str = quiz_json_str[3:]
-        if quiz_json_str.endswith("```"):
-            quiz_json_str = quiz_json_str[:-3]
-        quiz_json_str = quiz_json_str.strip()
-        
-        quiz_data = json.loads(quiz_json_str)
-        
-        # Convert to QuizQuestion objects
-        questions = []
-        for item in quiz_data:
-            # Validate structure
-            if "question" in item and "options" in item and "correct_answer" in item:
-                # Ensure 4 options
-                options = item["options"]
-                if len(options) != 4:
-                    # Pad or trim to 4
-                    while len(options) < 4:
-                        options.append(f"Option {chr(68 + len(options) - 3)}")
-                    options = options[:4]
-                
-                questions.append(QuizQuestion(
-                    question=item["question"],
-                    options=options,
-                    correct_answer=item["correct_answer"]
-                ))
+        quiz_data = loads_lenient(quiz_json_str, truncated=False)
+    except ValueError:
+        quiz_data = None
+    if isinstance(quiz_data, dict):
+        # {"questions": [...]} instead of a bare array
+        quiz_data = next((v for v in quiz_data.values() if isinstance(v, list)), None)
+    if not isinstance(quiz_data, list) or not any(isinstance(item, dict) and "question" in item for item in quiz_data):
+        # Unparseable, or the first array was prose like "Here are [2] questions: [...]"
+        quiz_data = salvage_items(quiz_json_str)
+        if not quiz_data:
+            print("Error parsing quiz JSON: nothing recoverable")
+            print(f"Raw response: {quiz_json_str[:200]}")
+            return None
+        metrics.incr("quiz.json_salvaged", len(quiz_data))
         
-        # Ensure we have the requested number
-        while len(questions) < num_questions:
+    # Convert to QuizQuestion objects
+    questions = []
+    for item in quiz_data:
+        # Validate structure
+        if isinstance(item, dict) and "question" in item and isinstance(item.get("options"), list) and "correct_answer" in item:
+            # Ensure 4 options
+            options = item["options"]
+            if len(options) != 4:
+                # Pad or trim to 4
+                while len(options) < 4:
+                    options.append(f"Option {chr(68 + len(options) - 3)}")
+                options = options[:4]
+            
             questions.append(QuizQuestion(
-                question=f"Additional question {len(questions) + 1}?",
-                options=["Option A", "Option B", "Option C", "Option D"],
-                correct_answer="Option A"
+                question=item["question"],
+                options=options,
+                correct_answer=item["correct_answer"],
+                topic=match_topic(item.get("topic"), item["question"], key_topics)
             ))
-        
-        questions = questions[:num_questions]
-        
-        return QuizOutput(questions=questions)
-        
-    except json.JSONDecodeError as e:
-        print(f"Error parsing quiz JSON: {e}")
-        print(f"Raw response: {quiz_json_str[:200]}")
-        # Return mock questions as fallback
-        return _generate_fallback_quiz(num_questions)
+    return questions[:num_questions]
 
 
-def _generate_fallback_quiz(num_questions: int) -> QuizOutput:
-    """Generate fallback quiz if parsing fails"""
+def match_topic(raw_topic: Optional[str], question: str, key_topics: Optional[List[str]]) -> Optional[str]:
+    """
+    Map a question onto one of the key topics.
+
+    Uses the topic label returned by the model when it matches a key topic
+    (case-insensitively), otherwise the key topic sharing the most words
+    with the label and question text. Without key topics, the raw label is kept.
+    """
+    if not key_topics:
+        return raw_topic or None
+    by_lower = {t.lower(): t for t in key_topics}
+    if raw_topic and raw_topic.strip().lower() in by_lower:
+        return by_lower[raw_topic.strip().lower()]
+
+    words = set(re.findall(r"[a-z0-9']+", f"{raw_topic or ''} {question}".lower()))
+    best, best_overlap = None, 0
+    for topic in key_topics:
+        overlap = len(words & set(re.findall(r"[a-z0-9']+", topic.lower())))
+        if overlap > best_overlap:
+            best, best_overlap = topic, overlap
+    return best
+
+
+def _fallback_questions(start: int, count: int, key_topics: Optional[List[str]] = None) -> List[QuizQuestion]:
+    """Placeholder questions for quiz positions start+1 .. start+count (never banked)"""
     questions = []
-    for i in range(num_questions):
+    for i in range(start, start + count):
         questions.append(QuizQuestion(
             question=f"Sample question {i+1}?",
             options=["Option A", "Option B", "Option C", "Option D"],
-            correct_answer="Option A"
+            correct_answer="Option A",
+            topic=key_topics[i % len(key_topics)] if key_topics else None
         ))
-    return QuizOutput(questions=questions)
+    return questions
@@ -2,53 +2,115 @@
 Workflow / Wellbeing Agent - Optimizes schedules and balances workloads
 
 This agent creates optimized schedules considering deadlines and wellbeing.
+Tasks are placed into concrete time blocks by the scheduling engine
+(earliest deadline first, priority as tie-breaker) within working hours,
+around breaks and already busy calendar slots.
 """
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 
+from engines.scheduling_engine import (
+    WorkingHours,
+    parse_due,
+    parse_duration,
+    schedule_tasks,
+)
+from utils.offload import cpu_bound
 
-def optimize_schedule(tasks: List[Dict], deadlines: List[Dict]) -> Dict:
+
+# Gap left after each task so the day does not become back-to-back work
+DEFAULT_BUFFER_MINUTES = 10
+
+
+@cpu_bound("process")
+def optimize_schedule(
+    tasks: List[Dict],
+    deadlines: List[Dict],
+    start: Optional[datetime] = None,
+    working_hours: Optional[Dict] = None,
+    busy: Optional[List[Dict]] = None,
+    buffer_minutes: int = DEFAULT_BUFFER_MINUTES
+) -> Dict:
     """
     Generate optimized schedule balancing deadlines and wellbeing.
-    
+
     Args:
-        tasks: List of tasks with name, duration, priority
+        tasks: List of tasks with name, duration, priority (and optionally
+            due_date / not_before)
         deadlines: List of deadlines with task_name, due_date
-        
+        start: Earliest start (default: now, rounded up to 15 minutes)
+        working_hours: {"start", "end", "breaks", "workdays"} (default
+            Mon-Fri 09:00-17:00 with a 12:00-13:00 break)
+        busy: Already busy slots as {"start", "end"} datetimes / ISO strings
+        buffer_minutes: Break left after each task
+
     Returns:
         Optimized schedule with time blocks
     """
-    # MVP: Simple scheduling algorithm
-    # Future: Advanced optimization with ML
-    
-    # Sort tasks by priority and deadline
-    task_dict = {t["name"]: t for t in tasks}
-    deadline_dict = {d["task_name"]: d["due_date"] for d in deadlines}
-    
-    # Combine and sort
-    scheduled_tasks = []
-    for task_name, task in task_dict.items():
-        due_date = deadline_dict.get(task_name)
-        scheduled_tasks.append({
-            "task": task_name,
+    hours = WorkingHours.from_dict(working_hours)
+    start = parse_due(start) or _next_quarter_hour(datetime.now())
+    deadline_dict = {d["task_name"]: d.get("due_date") for d in deadlines}
+
+    prepared = []
+    for task in tasks:
+        name = task.get("name", "Task")
+        due_date = deadline_dict.get(name) or task.get("due_date")
+        prepared.append({
+            "task": name,
             "duration": task.get("duration", "1 hour"),
+            "duration_minutes": parse_duration(task.get("duration")),
             "priority": task.get("priority", "medium"),
             "due_date": due_date,
-            "suggested_slot": "Morning" if task.get("priority") == "high" else "Afternoon"
+            "due": parse_due(due_date),
+            "not_before": parse_due(task.get("not_before"))
         })
-    
-    # Sort by priority and deadline
-    scheduled_tasks.sort(key=lambda x: (
-        {"high": 0, "medium": 1, "low": 2}.get(x["priority"], 1),
-        x["due_date"] or datetime.max
-    ))
-    
+
+    busy_slots = [
+        (parse_due(slot.get("start")), parse_due(slot.get("end")))
+        for slot in busy or []
+    ]
+    placed = schedule_tasks(
+        prepared, start, hours,
+        busy=[(s, e) for s, e in busy_slots if s is not None and e is not None],
+        buffer_minutes=buffer_minutes
+    )
+
+    scheduled_tasks = []
+    late = []
+    for task in placed:
+        if task["late"]:
+            late.append(task["task"])
+        scheduled_tasks.append({
+            "task": task["task"],
+            "duration": task["duration"],
+            "duration_minutes": task["duration_minutes"],
+            "priority": task["priority"],
+            "due_date": task["due"].isoformat() if task["due"] else None,
+            "start": task["start"].isoformat(),
+            "end": task["end"].isoformat(),
+            "blocks": [{"start": s.isoformat(), "end": e.isoformat()} for s, e in task["blocks"]],
+            "late": task["late"],
+            "suggested_slot": "Morning" if task["start"].hour < 12 else "Afternoon"
+        })
+
+    recommendations = [
+        "Schedule high-priority tasks in the morning",
+        "Include breaks between tasks",
+        "Allocate buffer time for unexpected work"
+    ]
+    if late:
+        recommendations.insert(0, f"{len(late)} task(s) cannot meet their deadline: {', '.join(late[:5])}"
+                                  + (" ..." if len(late) > 5 else ""))
+
     return {
         "schedule": scheduled_tasks,
         "total_tasks": len(scheduled_tasks),
-        "recommendations": [
-            "Schedule high-priority tasks in the morning",
-            "Include breaks between tasks",
-            "Allocate buffer time for unexpected work"
-        ]
+        "late_tasks": len(late),
+        "ends_at": scheduled_tasks[-1]["end"] if scheduled_tasks else None,
+        "recommendations": recommendations
     }
+
+
+def _next_quarter_hour(moment: datetime) -> datetime:
+    moment = moment.replace(second=0, microsecond=0)
+    return moment + timedelta(minutes=-moment.minute % 15)
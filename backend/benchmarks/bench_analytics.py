@@ -0,0 +1,74 @@
+"""
+Analytics engine benchmark
+
+Times engines/analytics_engine.py on a synthetic students x questions
+response matrix (default 2,000 x 50 = 100k responses) against the previous
+pure-Python score loop.
+
+Run from backend/:
+
+    python -m benchmarks.bench_analytics
+    python -m benchmarks.bench_analytics --students 20000 --questions 50 --repeat 5
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from agents.analytics_agent import analyze_quiz_results
+from engines.analytics_engine import ResponseMatrix, analyze_matrix
+
+
+def synthetic_matrix(students: int, questions: int, seed: int = 0) -> ResponseMatrix:
+    """Responses from a 1-parameter logistic (Rasch) model, so item stats are realistic."""
+    rng = np.random.default_rng(seed)
+    ability = rng.normal(0.0, 1.0, size=(students, 1))
+    difficulty = rng.normal(0.0, 1.0, size=(1, questions))
+    p_correct = 1.0 / (1.0 + np.exp(-(ability - difficulty)))
+    credit = (rng.random((students, questions)) < p_correct).astype(np.float64)
+    credit[rng.random((students, questions)) < 0.01] = np.nan  # a few skipped answers
+    return ResponseMatrix(credit)
+
+
+def _python_baseline(results):
+    scores = [r.get("score", 0) for r in results]
+    return sum(scores) / len(scores), max(scores), min(scores)
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analytics engine")
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    matrix = synthetic_matrix(args.students, args.questions)
+    results = [{"student": f"s{i}", "score": float(s), "total": 100} for i, s in enumerate(matrix.percent_scores())]
+
+    report = {
+        "students": args.students,
+        "questions": args.questions,
+        "responses": args.students * args.questions,
+        "engine_full_analysis_s": round(_best_of(lambda: analyze_matrix(matrix), args.repeat), 6),
+        "agent_with_item_analysis_s": round(
+            _best_of(lambda: analyze_quiz_results(results, responses=matrix), args.repeat), 6
+        ),
+        "agent_scores_only_s": round(_best_of(lambda: analyze_quiz_results(results), args.repeat), 6),
+        "python_mean_max_min_s": round(_best_of(lambda: _python_baseline(results), args.repeat), 6),
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+End-to-end benchmark for the orchestrator
+
+Drives /orchestrate and /orchestrate/stream with a configurable prompt mix
+and concurrency against the fake LLM (fakes/llm_server.py) and, optionally,
+the fake Workspace server (fakes/workspace_server.py). Reports throughput,
+latency percentiles per endpoint and intent, per-agent stage breakdown and
+peak RSS as JSON for regression tracking.
+
+Run from backend/:
+
+    python -m benchmarks.e2e --requests 200 --concurrency 16 --output bench.json
+    python -m benchmarks.e2e --mode uvicorn --workspace fake --mix quiz=0.5,analytics=0.3,scheduling=0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from utils.metrics import summarize
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROMPTS = {
+    "quiz": [
+        "Create a 10 question quiz on physics chapter 5",
+        "Generate 20 MCQ test questions for chemistry chapter 3",
+        "Make a 5 question quiz from my biology chapter 2 notes",
+        "Create a 30 question exam for mathematics chapter 7",
+    ],
+    "analytics": [
+        "Analyze the quiz results and performance stats for physics",
+        "Show statistics and analysis of the last test results",
+    ],
+    "scheduling": [
+        "Schedule my grading deadlines on the calendar",
+        "Put the lesson timeline and deadlines in my calendar",
+    ],
+    "learning_plan": [
+        "Build a study plan from the biology syllabus",
+        "Create a learning path for the physics curriculum",
+    ],
+}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse "quiz=0.6,analytics=0.4" into normalized weights."""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name:
+            weights[name] = float(weight) if weight else 1.0
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError(f"Empty mix: {spec!r}")
+    return {k: v / total for k, v in weights.items()}
+
+
+def build_workload(n: int, intent_mix: Dict[str, float], endpoint_mix: Dict[str, float], seed: int) -> List[Tuple[str, str, str]]:
+    """Deterministic list of (endpoint, intent, prompt)."""
+    rng = random.Random(seed)
+    intents, intent_w = zip(*intent_mix.items())
+    endpoints, endpoint_w = zip(*endpoint_mix.items())
+    workload = []
+    for _ in range(n):
+        intent = rng.choices(intents, intent_w)[0]
+        endpoint = rng.choices(endpoints, endpoint_w)[0]
+        workload.append((endpoint, intent, rng.choice(PROMPTS[intent])))
+    return workload
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_workspace(latency_ms: float, error_rate: float) -> str:
+    """Run the fake Workspace server on a background thread; return its base URL."""
+    import uvicorn
+    from fakes.workspace_server import FakeWorkspaceConfig, create_app
+
+    port = _free_port()
+    app = create_app(FakeWorkspaceConfig(latency_ms=latency_ms, jitter_ms=latency_ms / 4, error_rate=error_rate))
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.02)
+    return f"http://127.0.0.1:{port}"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Request drivers
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def _call_orchestrate(client: httpx.AsyncClient, prompt: str) -> Dict:
+    start = time.perf_counter()
+    resp = await client.post("/orchestrate", json={"prompt": prompt})
+    return {"latency": time.perf_counter() - start, "ok": resp.status_code == 200, "status": resp.status_code}
+
+
+async def _call_stream(client: httpx.AsyncClient, prompt: str) -> Dict:
+    start = time.perf_counter()
+    ttfb = None
+    stages: Dict[str, float] = {}
+    ok = False
+    event = None
+    async with client.stream("POST", "/orchestrate/stream", json={"prompt": prompt}) as resp:
+        async for line in resp.aiter_lines():
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[5:])
+                if event == "agent_complete":
+                    stages[data["agent"]] = float(data.get("duration", 0))
+                elif event == "complete":
+                    ok = bool(data.get("success"))
+        status = resp.status_code
+    return {"latency": time.perf_counter() - start, "ttfb": ttfb or 0.0, "ok": ok, "status": status, "stages": stages}
+
+
+async def run_workload(client: httpx.AsyncClient, workload: List[Tuple[str, str, str]], concurrency: int) -> Tuple[List[Dict], float]:
+    """Run the workload with a fixed number of concurrent workers."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in workload:
+        queue.put_nowait(item)
+    results: List[Dict] = []
+
+    async def worker():
+        while True:
+            try:
+                endpoint, intent, prompt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                call = _call_stream if endpoint == "stream" else _call_orchestrate
+                result = await call(client, prompt)
+            except Exception as e:
+                result = {"latency": 0.0, "ok": False, "status": None, "error": str(e)}
+            result.update({"endpoint": endpoint, "intent": intent})
+            results.append(result)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+def build_report(results: List[Dict], elapsed: float, server_metrics: Dict, peak_rss_kb: int, config: Dict) -> Dict:
+    """Aggregate raw results into the JSON report."""
+    def group(key: str) -> Dict[str, Dict]:
+        out: Dict[str, Dict] = {}
+        for name in sorted({r[key] for r in results}):
+            rows = [r for r in results if r[key] == name]
+            summary = summarize([r["latency"] for r in rows if r["ok"]])
+            summary["errors"] = sum(1 for r in rows if not r["ok"])
+            if name == "stream" and key == "endpoint":
+                summary["ttfb"] = summarize([r["ttfb"] for r in rows if r["ok"]])
+            out[name] = summary
+        return out
+
+    client_stages: Dict[str, List[float]] = {}
+    for r in results:
+        for agent, duration in r.get("stages", {}).items():
+            client_stages.setdefault(agent, []).append(duration)
+
+    return {
+        "config": config,
+        "summary": {
+            "requests": len(results),
+            "errors": sum(1 for r in results if not r["ok"]),
+            "duration_s": round(elapsed, 3),
+            "throughput_rps": round(len(results) / elapsed, 3) if elapsed else 0.0,
+            "latency": summarize([r["latency"] for r in results if r["ok"]]),
+        },
+        "endpoints": group("endpoint"),
+        "intents": group("intent"),
+        "stages": server_metrics.get("timers", {}),
+        "stream_stages": {k: summarize(v) for k, v in client_stages.items()},
+        "counters": server_metrics.get("counters", {}),
+        "peak_rss_mb": round(peak_rss_kb / 1024.0, 1),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Modes
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def _bench_inprocess(workload, concurrency: int):
+    # Imported here so the environment configured in main() is in effect
+    import main as orchestrator
+
+    transport = httpx.ASGITransport(app=orchestrator.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        await client.get("/metrics", params={"reset": True})
+        results, elapsed = await run_workload(client, workload, concurrency)
+        server_metrics = (await client.get("/metrics")).json()
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return results, elapsed, server_metrics, peak_rss_kb
+
+
+async def _bench_uvicorn(workload, concurrency: int, env: Dict[str, str]):
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+            for _ in range(200):
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            await client.get("/metrics", params={"reset": True})
+            results, elapsed = await run_workload(client, workload, concurrency)
+            server_metrics = (await client.get("/metrics")).json()
+        peak_rss_kb = _proc_peak_rss_kb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return results, elapsed, server_metrics, peak_rss_kb
+
+
+def _proc_peak_rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="End-to-end orchestrator benchmark")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default="quiz=0.5,analytics=0.2,scheduling=0.2,learning_plan=0.1",
+                        help="Intent mix, e.g. quiz=0.6,analytics=0.4")
+    parser.add_argument("--endpoints", default="orchestrate=0.5,stream=0.5",
+                        help="Endpoint mix, e.g. orchestrate=1 or orchestrate=0.7,stream=0.3")
+    parser.add_argument("--workspace", choices=["mock", "fake"], default="mock",
+                        help="Google Workspace backend: service mocks or the fake HTTP server")
+    parser.add_argument("--workspace-latency-ms", type=float, default=50.0)
+    parser.add_argument("--workspace-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-ttft-ms", type=float, default=250.0)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_TTFT_MS": str(args.llm_ttft_ms),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.llm_tokens_per_second),
+        "FAKE_LLM_ERROR_RATE": str(args.llm_error_rate),
+        "FAKE_LLM_SEED": str(args.seed),
+    })
+    os.environ.pop("GEMINI_API_KEY", None)
+    if args.workspace == "fake":
+        os.environ["GOOGLE_API_ENDPOINT"] = start_fake_workspace(args.workspace_latency_ms, args.workspace_error_rate)
+
+    workload = build_workload(args.requests, parse_mix(args.mix), parse_mix(args.endpoints), args.seed)
+    if args.mode == "uvicorn":
+        outcome = asyncio.run(_bench_uvicorn(workload, args.concurrency, dict(os.environ)))
+    else:
+        outcome = asyncio.run(_bench_inprocess(workload, args.concurrency))
+
+    report = build_report(*outcome, config=vars(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Engines package
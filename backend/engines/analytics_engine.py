@@ -0,0 +1,579 @@
+"""
+Analytics Engine - vectorized quiz statistics over a response matrix
+
+Works on a students x questions matrix of earned credit (0..1 per question,
+NaN = unanswered) and computes score distribution statistics and classical
+item analysis in a few NumPy passes:
+- mean, standard deviation, percentiles, histogram
+- per-question difficulty (p-value) and upper/lower 27% discrimination index
+- corrected point-biserial correlation (item vs. rest-of-test score)
+- Cronbach's alpha
+- per-topic mastery (group-by of question columns by their key topic),
+  per student or per cohort across many quizzes
+- running, persistable aggregates (ScoreAccumulator, QuizAggregate) that
+  absorb new responses in O(batch) and answer queries in O(1)
+- grouped (cohort x period) statistics for trend queries
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+PERCENTILES = (10, 25, 50, 75, 90)
+# Classical test theory: compare the top and bottom 27% of students
+DISCRIMINATION_GROUP = 0.27
+
+
+class ResponseMatrix:
+    """Students x questions matrix of earned credit with optional per-question weights."""
+
+    def __init__(
+        self,
+        credit,
+        weights: Optional[Sequence[float]] = None,
+        student_ids: Optional[List[str]] = None,
+        question_ids: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            credit: 2-D array-like, credit in [0, 1] per answer (NaN = unanswered)
+            weights: Points per question (default 1 each)
+            student_ids: Optional row labels
+            question_ids: Optional column labels
+        """
+        self.credit = np.asarray(credit, dtype=np.float64)
+        if self.credit.ndim != 2:
+            raise ValueError("Response matrix must be 2-D (students x questions)")
+        n_questions = self.credit.shape[1]
+        self.weights = np.ones(n_questions) if weights is None else np.asarray(weights, dtype=np.float64)
+        if self.weights.shape != (n_questions,):
+            raise ValueError("weights must have one entry per question")
+        self.student_ids = student_ids
+        self.question_ids = question_ids or [f"Q{i + 1}" for i in range(n_questions)]
+
+    @property
+    def shape(self):
+        return self.credit.shape
+
+    @classmethod
+    def from_results(cls, results: List[Dict]) -> Optional["ResponseMatrix"]:
+        """
+        Build a matrix from result dicts that carry per-question credit
+        under "responses" (list of 0..1 or None). Returns None if absent.
+        """
+        rows = [r.get("responses") for r in results]
+        if not rows or any(row is None for row in rows):
+            return None
+        width = max(len(row) for row in rows)
+        credit = np.full((len(rows), width), np.nan)
+        for i, row in enumerate(rows):
+            credit[i, :len(row)] = [np.nan if v is None else v for v in row]
+        return cls(credit, student_ids=[r.get("student") for r in results])
+
+    def points(self) -> np.ndarray:
+        """Points earned per answer (unanswered = 0)."""
+        return np.nan_to_num(self.credit, nan=0.0) * self.weights
+
+    def column_totals(self):
+        """(earned, possible) points per question, summed over students."""
+        return self.points().sum(axis=0), self.weights * self.shape[0]
+
+    def percent_scores(self) -> np.ndarray:
+        """Total score per student as a percentage of the maximum."""
+        total = self.weights.sum()
+        return self.points().sum(axis=1) * 100.0 / total if total > 0 else np.zeros(self.shape[0])
+
+
+def _round(value, digits: int = 4):
+    """Round a NumPy scalar to a JSON-friendly float (None for NaN)."""
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
+
+
+def score_statistics(scores, bins: int = 10, score_range=(0.0, 100.0)) -> Dict:
+    """
+    Distribution statistics of a 1-D array of percentage scores.
+
+    Returns:
+        mean/std/min/max, percentiles and a fixed-range histogram
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.size == 0:
+        return {}
+    counts, edges = np.histogram(scores, bins=bins, range=score_range)
+    pct_values = np.percentile(scores, PERCENTILES)
+    return {
+        "mean": _round(scores.mean(), 2),
+        "std": _round(scores.std(ddof=1) if scores.size > 1 else 0.0, 2),
+        "min": _round(scores.min(), 2),
+        "max": _round(scores.max(), 2),
+        "percentiles": {f"p{p}": _round(v, 2) for p, v in zip(PERCENTILES, pct_values)},
+        "histogram": {"edges": [_round(e, 2) for e in edges], "counts": counts.tolist()}
+    }
+
+
+def item_analysis(matrix: ResponseMatrix) -> Dict:
+    """
+    Per-question difficulty, discrimination and point-biserial, plus Cronbach's alpha.
+
+    All statistics are computed column-wise in single vectorized passes.
+    """
+    credit = np.nan_to_num(matrix.credit, nan=0.0)
+    n_students, n_questions = credit.shape
+    points = credit * matrix.weights
+    totals = points.sum(axis=1)
+
+    # Difficulty: mean credit per question (higher = easier)
+    difficulty = credit.mean(axis=0)
+
+    # Discrimination: mean credit of the top 27% minus the bottom 27% by total score
+    group = max(1, int(np.ceil(DISCRIMINATION_GROUP * n_students)))
+    order = np.argsort(totals, kind="stable")
+    discrimination = credit[order[-group:]].mean(axis=0) - credit[order[:group]].mean(axis=0)
+
+    # Corrected point-biserial: correlate each item with the total excluding that item
+    rest = totals[:, None] - points
+    item_c = credit - difficulty
+    rest_c = rest - rest.mean(axis=0)
+    denom = np.sqrt((item_c ** 2).sum(axis=0) * (rest_c ** 2).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        point_biserial = np.where(denom > 0, (item_c * rest_c).sum(axis=0) / denom, np.nan)
+
+    # Cronbach's alpha from item and total variances
+    alpha = np.nan
+    if n_questions > 1 and n_students > 1:
+        item_var = points.var(axis=0, ddof=1).sum()
+        total_var = totals.var(ddof=1)
+        if total_var > 0:
+            alpha = n_questions / (n_questions - 1) * (1.0 - item_var / total_var)
+
+    items = [
+        {
+            "question": matrix.question_ids[j],
+            "difficulty": _round(difficulty[j]),
+            "discrimination": _round(discrimination[j]),
+            "point_biserial": _round(point_biserial[j])
+        }
+        for j in range(n_questions)
+    ]
+    return {"items": items, "cronbach_alpha": _round(alpha)}
+
+
+def analyze_matrix(matrix: ResponseMatrix, bins: int = 10) -> Dict:
+    """Full analysis of a response matrix: score distribution + item analysis."""
+    scores = matrix.percent_scores()
+    analysis = item_analysis(matrix)
+    return {
+        "distribution": score_statistics(scores, bins=bins),
+        "item_analysis": analysis["items"],
+        "reliability": {"cronbach_alpha": analysis["cronbach_alpha"]},
+        "scores": scores
+    }
+
+
+def _topic_index(question_topics: Sequence[Optional[str]], vocabulary: Dict[str, int]) -> np.ndarray:
+    """Map per-question topics to vocabulary indices (-1 for untagged), growing the vocabulary."""
+    return np.fromiter(
+        (vocabulary.setdefault(t, len(vocabulary)) if t else -1 for t in question_topics),
+        dtype=np.int64,
+        count=len(question_topics)
+    )
+
+
+def student_topic_mastery(matrix: ResponseMatrix, question_topics: Sequence[Optional[str]]):
+    """
+    Per-student, per-topic mastery (share of available points earned).
+
+    The group-by is a single matrix product with a questions x topics
+    one-hot indicator.
+
+    Returns:
+        (topics, mastery) where mastery is a students x topics array
+    """
+    if len(question_topics) != matrix.shape[1]:
+        raise ValueError("question_topics must have one entry per question")
+    vocabulary: Dict[str, int] = {}
+    index = _topic_index(question_topics, vocabulary)
+    onehot = np.zeros((matrix.shape[1], len(vocabulary)))
+    tagged = index >= 0
+    onehot[np.flatnonzero(tagged), index[tagged]] = 1.0
+    earned = matrix.points() @ onehot
+    possible = matrix.weights @ onehot
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mastery = np.where(possible > 0, earned / possible, np.nan)
+    return list(vocabulary), mastery
+
+
+def topic_mastery_many(blocks: Sequence) -> Dict:
+    """
+    Per-cohort, per-topic mastery across many quizzes in one pass.
+
+    Args:
+        blocks: Iterable of (cohort, ResponseMatrix or QuizAggregate,
+            question_topics). A cohort (e.g. class name) may appear in
+            several blocks (quizzes).
+
+    Returns:
+        Dict with "cohorts", "topics" and cohorts x topics arrays
+        "mastery", "earned", "possible" and "questions"
+    """
+    cohorts: Dict = {}
+    topics: Dict[str, int] = {}
+    cohort_parts, topic_parts, earned_parts, possible_parts = [], [], [], []
+    for cohort, matrix, question_topics in blocks:
+        if len(question_topics) != matrix.shape[1]:
+            raise ValueError("question_topics must have one entry per question")
+        cohort_idx = cohorts.setdefault(cohort, len(cohorts))
+        topic_idx = _topic_index(question_topics, topics)
+        cohort_parts.append(np.full(topic_idx.shape, cohort_idx))
+        topic_parts.append(topic_idx)
+        # Column sums reduce each quiz to one value per question before the group-by
+        earned, possible = matrix.column_totals()
+        earned_parts.append(earned)
+        possible_parts.append(possible)
+
+    n_cohorts, n_topics = len(cohorts), len(topics)
+    shape = (n_cohorts, n_topics)
+    if not cohort_parts or n_topics == 0:
+        empty = np.zeros(shape)
+        return {"cohorts": list(cohorts), "topics": list(topics), "mastery": empty,
+                "earned": empty, "possible": empty, "questions": empty}
+
+    topic_all = np.concatenate(topic_parts)
+    tagged = topic_all >= 0
+    flat = (np.concatenate(cohort_parts) * n_topics + topic_all)[tagged]
+    size = n_cohorts * n_topics
+    earned = np.bincount(flat, weights=np.concatenate(earned_parts)[tagged], minlength=size).reshape(shape)
+    possible = np.bincount(flat, weights=np.concatenate(possible_parts)[tagged], minlength=size).reshape(shape)
+    questions = np.bincount(flat, minlength=size).reshape(shape)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mastery = np.where(possible > 0, earned / possible, np.nan)
+    return {"cohorts": list(cohorts), "topics": list(topics), "mastery": mastery,
+            "earned": earned, "possible": possible, "questions": questions}
+
+
+class ScoreAccumulator:
+    """
+    Constant-memory, mergeable statistics over batches of percentage scores.
+
+    Mean and variance use Welford's update (Chan et al. for merging a whole
+    batch at once), which stays numerically stable over millions of rows.
+    Quantiles come from a fixed-range histogram sketch with 0.1-point bins
+    over 0..100 (out-of-range scores fall in the edge bins), so the sketch
+    error is bounded by the bin width and merging two sketches is a vector
+    add. Mean, variance, min and max use the scores as given.
+    """
+
+    FINE_BINS = 1000
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+        self.hist = np.zeros(self.FINE_BINS, dtype=np.int64)
+
+    def update(self, scores) -> None:
+        """Fold a batch of scores (NaNs are ignored) into the running state."""
+        scores = np.asarray(scores, dtype=np.float64)
+        scores = scores[~np.isnan(scores)]
+        if scores.size == 0:
+            return
+        n = scores.size
+        batch_mean = float(scores.mean())
+        batch_m2 = float(np.square(scores - batch_mean).sum())
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(scores.min()))
+        self.max = max(self.max, float(scores.max()))
+        # np.histogram drops values outside the range; bonus points (> 100) or
+        # penalties (< 0) go to the edge bins so the sketch still sums to count
+        self.hist += np.histogram(np.clip(scores, 0.0, 100.0), bins=self.FINE_BINS, range=(0.0, 100.0))[0]
+
+    def std(self) -> float:
+        """Sample standard deviation."""
+        if self.count < 2:
+            return 0.0
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+    def percentile(self, pct: float) -> float:
+        """Percentile from the histogram sketch (bin midpoint)."""
+        if self.count == 0:
+            return 0.0
+        cumulative = np.cumsum(self.hist)
+        index = int(np.searchsorted(cumulative, np.ceil(pct / 100.0 * self.count)))
+        width = 100.0 / self.FINE_BINS
+        return float(np.clip((index + 0.5) * width, self.min, self.max))
+
+    def statistics(self, bins: int = 10) -> Dict:
+        """Same shape as score_statistics(), computed from the running state."""
+        if self.count == 0:
+            return {}
+        # Re-bin the fine histogram by fine-bin midpoints
+        midpoints = (np.arange(self.FINE_BINS) + 0.5) * (100.0 / self.FINE_BINS)
+        coarse = np.histogram(midpoints, bins=bins, range=(0.0, 100.0), weights=self.hist)[0]
+        return {
+            "mean": _round(self.mean, 2),
+            "std": _round(self.std(), 2),
+            "min": _round(self.min, 2),
+            "max": _round(self.max, 2),
+            "percentiles": {f"p{p}": _round(self.percentile(p), 2) for p in PERCENTILES},
+            "histogram": {
+                "edges": [_round(e, 2) for e in np.linspace(0.0, 100.0, bins + 1)],
+                "counts": [int(c) for c in coarse]
+            }
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "hist": self.hist.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScoreAccumulator":
+        acc = cls()
+        hist = np.asarray(data["hist"], dtype=np.int64)
+        if hist.shape != (cls.FINE_BINS,) or int(hist.sum()) != int(data["count"]):
+            raise ValueError("Score sketch does not match its count")
+        acc.count = int(data["count"])
+        acc.mean = float(data["mean"])
+        acc.m2 = float(data["m2"])
+        acc.min = np.inf if data["min"] is None else float(data["min"])
+        acc.max = -np.inf if data["max"] is None else float(data["max"])
+        acc.hist = hist
+        return acc
+
+
+class QuizAggregate:
+    """
+    Running aggregate state for one quiz.
+
+    Holds the score accumulator, per-question earned credit and answer
+    counts, the sums of squares, cross products and score bands behind
+    item_statistics(), and an opaque ingestion watermark (e.g. the next sheet row to
+    read). update() is O(batch); every query is O(questions) or better and
+    independent of how many responses have been folded in.
+    """
+
+    VERSION = 2
+    # 1-point bands of the credit total, for the upper/lower group discrimination index
+    SCORE_BANDS = 100
+
+    def __init__(self, question_ids: Optional[List[str]] = None):
+        self.scores = ScoreAccumulator()
+        self.responses = 0  # Rows that contributed per-question credit
+        self.total_sum = 0.0  # Row credit totals (unanswered = 0), summed
+        self.total_sq = 0.0  # ... and their squares
+        self.band_rows = np.zeros(self.SCORE_BANDS, dtype=np.int64)  # Rows per total band
+        self._set_questions(question_ids or [])
+        self.watermark = None
+
+    def _set_questions(self, question_ids: List[str]) -> None:
+        self.question_ids = list(question_ids)
+        n = len(self.question_ids)
+        self.earned = np.zeros(n)  # Credit summed over responses
+        self.answered = np.zeros(n, dtype=np.int64)  # Non-blank answers
+        self.earned_sq = np.zeros(n)  # Squared credit, summed
+        self.earned_total = np.zeros(n)  # Credit x row total, summed
+        self.band_earned = np.zeros((self.SCORE_BANDS, n))  # Credit per total band
+
+    def update(self, scores, credit=None, question_ids: Optional[List[str]] = None) -> None:
+        """
+        Fold a batch of responses into the aggregate.
+
+        Args:
+            scores: Percentage score per row (NaN rows are skipped)
+            credit: Optional rows x questions credit in [0, 1] (NaN = unanswered)
+            question_ids: Column labels of credit (defaults to the known ones)
+        """
+        self.scores.update(scores)
+        if not self.question_ids and question_ids:
+            self._set_questions(question_ids)
+        if credit is None:
+            return
+        credit = np.asarray(credit, dtype=np.float64)
+        if credit.ndim != 2 or credit.shape[0] == 0:
+            return
+        if not self.question_ids:
+            self._set_questions(question_ids or [f"Q{i + 1}" for i in range(credit.shape[1])])
+        if credit.shape[1] != len(self.question_ids):
+            raise ValueError("credit must have one column per aggregated question")
+        self.answered += (~np.isnan(credit)).sum(axis=0)
+        credit = np.nan_to_num(credit, nan=0.0)
+        totals = credit.sum(axis=1)
+        self.earned += credit.sum(axis=0)
+        self.earned_sq += np.square(credit).sum(axis=0)
+        self.earned_total += totals @ credit
+        self.total_sum += float(totals.sum())
+        self.total_sq += float(np.square(totals).sum())
+        bands = np.clip(
+            (totals * self.SCORE_BANDS / credit.shape[1]).astype(np.int64), 0, self.SCORE_BANDS - 1
+        )
+        self.band_rows += np.bincount(bands, minlength=self.SCORE_BANDS)
+        np.add.at(self.band_earned, bands, credit)
+        self.responses += credit.shape[0]
+
+    def difficulty(self) -> np.ndarray:
+        """Per-question p-value (mean credit, unanswered counted as 0)."""
+        if self.responses == 0:
+            return np.full(len(self.question_ids), np.nan)
+        return self.earned / self.responses
+
+    def item_statistics(self) -> Dict:
+        """
+        Item analysis from the running sums, same shape as item_analysis().
+
+        Point-biserial and alpha are exact for unweighted credit. The upper
+        and lower 27% groups are cut from the 1-point total bands (the band
+        straddling a cut counts pro rata), so discrimination can differ
+        slightly from the full-matrix value.
+        """
+        n, n_questions = self.responses, len(self.question_ids)
+        difficulty = self.difficulty()
+        discrimination = point_biserial = np.full(n_questions, np.nan)
+        alpha = np.nan
+        if n > 0:
+            group = max(1, int(np.ceil(DISCRIMINATION_GROUP * n)))
+            discrimination = self._group_credit(group, top=True) - self._group_credit(group, top=False)
+
+            # Centered sums of squares / cross products; the rest score is total - item
+            sxx = np.maximum(self.earned_sq - np.square(self.earned) / n, 0.0)
+            stt = max(self.total_sq - self.total_sum ** 2 / n, 0.0)
+            sxt = self.earned_total - self.earned * self.total_sum / n
+            srr = np.maximum(stt - 2 * sxt + sxx, 0.0)
+            denom = np.sqrt(sxx * srr)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                point_biserial = np.where(denom > 0, (sxt - sxx) / denom, np.nan)
+            if n_questions > 1 and n > 1 and stt > 0:
+                alpha = n_questions / (n_questions - 1) * (1.0 - sxx.sum() / stt)
+
+        items = [
+            {
+                "question": qid,
+                "difficulty": _round(difficulty[j]),
+                "discrimination": _round(discrimination[j]),
+                "point_biserial": _round(point_biserial[j])
+            }
+            for j, qid in enumerate(self.question_ids)
+        ]
+        return {"items": items, "cronbach_alpha": _round(alpha)}
+
+    def _group_credit(self, size: int, top: bool) -> np.ndarray:
+        """Mean credit per question of the size highest (or lowest) scoring rows."""
+        earned = np.zeros(len(self.question_ids))
+        remaining = size
+        bands = range(self.SCORE_BANDS - 1, -1, -1) if top else range(self.SCORE_BANDS)
+        for band in bands:
+            rows = int(self.band_rows[band])
+            if rows == 0:
+                continue
+            take = min(rows, remaining)
+            earned += self.band_earned[band] * (take / rows)
+            remaining -= take
+            if remaining == 0:
+                break
+        return earned / size
+
+    def column_totals(self):
+        """(earned, possible) per question, as used by topic_mastery_many()."""
+        return self.earned, np.full(len(self.question_ids), float(self.responses))
+
+    @property
+    def shape(self):
+        return self.responses, len(self.question_ids)
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.VERSION,
+            "scores": self.scores.to_dict(),
+            "question_ids": self.question_ids,
+            "earned": self.earned.tolist(),
+            "answered": self.answered.tolist(),
+            "earned_sq": self.earned_sq.tolist(),
+            "earned_total": self.earned_total.tolist(),
+            "responses": self.responses,
+            "total_sum": self.total_sum,
+            "total_sq": self.total_sq,
+            "band_rows": self.band_rows.tolist(),
+            "band_earned": self.band_earned.tolist(),
+            "watermark": self.watermark
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuizAggregate":
+        """Restore a persisted aggregate; raises ValueError if it is stale or inconsistent."""
+        try:
+            if data.get("version") != cls.VERSION:
+                raise ValueError(f"Unsupported aggregate version {data.get('version')}")
+            aggregate = cls(data["question_ids"])
+            aggregate.scores = ScoreAccumulator.from_dict(data["scores"])
+            aggregate.earned = np.asarray(data["earned"], dtype=np.float64)
+            aggregate.answered = np.asarray(data["answered"], dtype=np.int64)
+            aggregate.earned_sq = np.asarray(data["earned_sq"], dtype=np.float64)
+            aggregate.earned_total = np.asarray(data["earned_total"], dtype=np.float64)
+            aggregate.responses = int(data["responses"])
+            aggregate.total_sum = float(data["total_sum"])
+            aggregate.total_sq = float(data["total_sq"])
+            aggregate.band_rows = np.asarray(data["band_rows"], dtype=np.int64)
+            aggregate.band_earned = np.asarray(data["band_earned"], dtype=np.float64)
+            aggregate.watermark = data.get("watermark")
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed aggregate: {e}")
+        n = len(aggregate.question_ids)
+        if any(a.shape != (n,) for a in (aggregate.earned, aggregate.answered, aggregate.earned_sq, aggregate.earned_total)):
+            raise ValueError("Per-question counts do not match the question list")
+        if aggregate.band_rows.shape != (cls.SCORE_BANDS,) or int(aggregate.band_rows.sum()) != aggregate.responses:
+            raise ValueError("Score bands do not match the response count")
+        if aggregate.band_earned.shape != (cls.SCORE_BANDS, n):
+            raise ValueError("Per-band credit does not match the question list")
+        return aggregate
+
+
+def grouped_statistics(scores, groups, n_groups: int) -> Dict:
+    """
+    Count, mean, std and quartiles of scores per group in a few array passes.
+
+    Args:
+        scores: 1-D scores
+        groups: Group index per score (0..n_groups-1)
+        n_groups: Number of groups
+
+    Returns:
+        Dict of length-n_groups arrays: count, mean, std, p25, p50, p75
+        (NaN for empty groups)
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    groups = np.asarray(groups, dtype=np.int64)
+    count = np.bincount(groups, minlength=n_groups)
+    total = np.bincount(groups, weights=scores, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        deviation = scores - mean[groups]
+        m2 = np.bincount(groups, weights=deviation * deviation, minlength=n_groups)
+        std = np.where(count > 1, np.sqrt(m2 / (count - 1)), 0.0)
+    std[count == 0] = np.nan
+
+    # Sort once by (group, score); each group's quantiles are then offsets into its run
+    order = np.lexsort((scores, groups))
+    ordered = scores[order]
+    starts = np.concatenate(([0], np.cumsum(count)[:-1]))
+    quantiles = {}
+    for name, q in (("p25", 0.25), ("p50", 0.5), ("p75", 0.75)):
+        position = starts + q * np.maximum(count - 1, 0)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        valid = count > 0
+        values = np.full(n_groups, np.nan)
+        frac = position[valid] - low[valid]
+        values[valid] = ordered[low[valid]] * (1 - frac) + ordered[high[valid]] * frac
+        quantiles[name] = values
+    return {"count": count, "mean": mean, "std": std, **quantiles}
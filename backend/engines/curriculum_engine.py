@@ -0,0 +1,217 @@
+"""
+Curriculum Engine - topic prerequisite graph and learning-plan ordering
+
+A syllabus is reduced once to a TopicGraph (topics plus "A is a
+prerequisite of B" edges); plans are then pure graph computations:
+- topological_layers(): Kahn's algorithm grouping topics by depth (every
+  prerequisite sits in an earlier layer); cycles from inconsistent
+  extraction are broken deterministically instead of failing
+- difficulty layering: a topic is never rated easier than any of its
+  prerequisites, and unrated topics get a level from their depth
+- syllabus_hash(): content hash used to persist and memoize graphs
+"""
+import hashlib
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+GRAPH_VERSION = 1
+LEVELS = ("beginner", "intermediate", "advanced")
+DEFAULT_TOPIC_HOURS = 2.0
+# Study-time multiplier per student level
+LEVEL_PACE = {"beginner": 1.25, "intermediate": 1.0, "advanced": 0.75}
+
+
+def syllabus_hash(syllabus: str) -> str:
+    """Content hash of a syllabus, insensitive to whitespace and case."""
+    normalized = " ".join(syllabus.split()).casefold()
+    return hashlib.sha256(f"v{GRAPH_VERSION}:{normalized}".encode("utf-8")).hexdigest()
+
+
+def _level(value) -> Optional[int]:
+    """Difficulty as 0..2 from a label or a 1..3 number (None if unknown)."""
+    if isinstance(value, (int, float)):
+        return min(2, max(0, int(value) - 1))
+    if isinstance(value, str):
+        text = value.strip().casefold()
+        if text in LEVELS:
+            return LEVELS.index(text)
+        if text.isdigit():
+            return _level(int(text))
+    return None
+
+
+def topic_key(name: str) -> str:
+    """Case- and punctuation-insensitive form of a topic name."""
+    return re.sub(r"\W+", " ", name).strip().casefold()
+
+
+class TopicGraph:
+    """Topics with prerequisite edges, stored as index lists."""
+
+    def __init__(
+        self,
+        topics: Sequence[Dict],
+        edges: Sequence[Tuple[int, int]] = ()
+    ):
+        """
+        Args:
+            topics: Dicts with "name" and optional "difficulty" (label or
+                1-3), "hours" and "resources"
+            edges: (prerequisite index, topic index) pairs
+        """
+        self.topics = [
+            {
+                "name": str(t["name"]).strip(),
+                "difficulty": _level(t.get("difficulty")),
+                "hours": float(t.get("hours") or DEFAULT_TOPIC_HOURS),
+                "resources": list(t.get("resources") or []),
+            }
+            for t in topics
+        ]
+        n = len(self.topics)
+        self.edges = sorted({(a, b) for a, b in edges if 0 <= a < n and 0 <= b < n and a != b})
+
+    @classmethod
+    def from_prerequisites(cls, topics: Sequence[Dict]) -> "TopicGraph":
+        """
+        Build from topics that name their prerequisites.
+
+        Each topic dict may carry "prerequisites": [topic names]. Names are
+        matched case- and punctuation-insensitively; unknown names and
+        duplicate topics are dropped.
+        """
+        unique, index = [], {}
+        for topic in topics:
+            name = str(topic.get("name") or "").strip()
+            if name and topic_key(name) not in index:
+                index[topic_key(name)] = len(unique)
+                unique.append(topic)
+        edges = [
+            (index[topic_key(str(prereq))], i)
+            for i, topic in enumerate(unique)
+            for prereq in topic.get("prerequisites") or []
+            if topic_key(str(prereq)) in index
+        ]
+        return cls(unique, edges)
+
+    def to_dict(self) -> Dict:
+        return {"version": GRAPH_VERSION, "topics": self.topics, "edges": [list(e) for e in self.edges]}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "TopicGraph":
+        """Restore a graph saved with to_dict(); raises ValueError on a version mismatch."""
+        if state.get("version") != GRAPH_VERSION:
+            raise ValueError(f"unsupported topic graph version {state.get('version')}")
+        topics = [
+            {**t, "difficulty": t["difficulty"] + 1 if t.get("difficulty") is not None else None}
+            for t in state["topics"]
+        ]
+        return cls(topics, [tuple(e) for e in state["edges"]])
+
+    def prerequisites(self) -> List[List[int]]:
+        result: List[List[int]] = [[] for _ in self.topics]
+        for a, b in self.edges:
+            result[b].append(a)
+        return result
+
+    def topological_layers(self) -> Tuple[List[List[int]], int]:
+        """
+        Group topics into layers so every prerequisite is in an earlier layer.
+
+        Returns:
+            (layers of topic indices in syllabus order, number of edges
+            ignored to break cycles)
+        """
+        n = len(self.topics)
+        successors: List[List[int]] = [[] for _ in range(n)]
+        indegree = [0] * n
+        for a, b in self.edges:
+            successors[a].append(b)
+            indegree[b] += 1
+
+        depth = [0] * n
+        done = [False] * n
+        layers: Dict[int, List[int]] = {}
+        ready = [i for i in range(n) if indegree[i] == 0]
+        remaining, broken = n, 0
+        while remaining:
+            if not ready:
+                # Cycle: release the earliest topic still waiting, ignoring its open prerequisites
+                stuck = min((i for i in range(n) if not done[i]), key=lambda i: (indegree[i], i))
+                broken += indegree[stuck]
+                indegree[stuck] = 0
+                ready = [stuck]
+            next_ready = []
+            for node in ready:
+                done[node] = True
+                remaining -= 1
+                layers.setdefault(depth[node], []).append(node)
+                for succ in successors[node]:
+                    if done[succ]:
+                        continue
+                    depth[succ] = max(depth[succ], depth[node] + 1)
+                    indegree[succ] -= 1
+                    if indegree[succ] == 0:
+                        next_ready.append(succ)
+            ready = next_ready
+        return [sorted(layers[d]) for d in sorted(layers)], broken
+
+    def difficulty_levels(self, layers: List[List[int]]) -> List[int]:
+        """
+        Difficulty (0..2) per topic: the stated one, else from the topic's
+        depth, and never below any prerequisite's.
+        """
+        depth_count = max(1, len(layers))
+        levels = [0] * len(self.topics)
+        prereqs = self.prerequisites()
+        for depth, layer in enumerate(layers):
+            derived = min(2, depth * 3 // depth_count)
+            for i in layer:
+                stated = self.topics[i]["difficulty"]
+                level = derived if stated is None else stated
+                levels[i] = max([level] + [levels[p] for p in prereqs[i]])
+        return levels
+
+
+def build_plan(graph: TopicGraph, student_level: Optional[str] = None) -> Dict:
+    """
+    Learning plan from a topic graph: topics in layer order with levels and times.
+
+    Returns:
+        {"topics": [{topic, difficulty, resources, estimated_time,
+        prerequisites, layer}], "layers", "total_estimated_time",
+        "student_level", "cycles_broken"}
+    """
+    level = student_level if student_level in LEVEL_PACE else "intermediate"
+    pace = LEVEL_PACE[level]
+    layers, broken = graph.topological_layers()
+    levels = graph.difficulty_levels(layers)
+    prereqs = graph.prerequisites()
+
+    topics, total_hours = [], 0.0
+    for depth, layer in enumerate(layers):
+        for i in sorted(layer, key=lambda i: (levels[i], i)):
+            topic = graph.topics[i]
+            hours = round(topic["hours"] * pace * 2) / 2 or 0.5
+            total_hours += hours
+            topics.append({
+                "topic": topic["name"],
+                "difficulty": LEVELS[levels[i]],
+                "resources": topic["resources"],
+                "estimated_time": hours_text(hours),
+                "prerequisites": [graph.topics[p]["name"] for p in prereqs[i]],
+                "layer": depth
+            })
+    return {
+        "topics": topics,
+        "layers": [[graph.topics[i]["name"] for i in layer] for layer in layers],
+        "total_estimated_time": hours_text(total_hours),
+        "student_level": level,
+        "cycles_broken": broken
+    }
+
+
+def hours_text(hours: float) -> str:
+    value = int(hours) if float(hours).is_integer() else hours
+    return f"{value} hour" if value == 1 else f"{value} hours"
@@ -0,0 +1,190 @@
+"""
+Dedup Engine - near-duplicate text detection with MinHash and LSH
+
+Texts are reduced to their content terms (function words and generic
+question wording dropped, light stemming), so a rewording that keeps the
+subject matter scores high while a question from the same template about
+another topic does not. MinHash signatures estimate the Jaccard similarity
+of two term sets as the share of equal signature slots, and banding the
+signatures (LSH) turns "find similar" into a few bucket lookups. Texts that
+are one template filled with different numbers ("A 2 kg mass ..." / "A 5 kg
+mass ...") are never duplicates (same_template):
+- MinHasher: vectorized signatures, all permutations in one NumPy step
+- LSHIndex: band buckets for sublinear candidate lookup, verified against
+  the estimated similarity
+- NearDuplicateDetector: streaming dedupe of a set in linear time
+"""
+import hashlib
+import re
+import zlib
+from typing import Dict, Hashable, Iterable, List, Sequence, Set
+
+import numpy as np
+
+
+NUM_PERM = 128
+# 32 bands x 4 rows: pairs above ~0.4 similarity become candidates
+BANDS = 32
+# Calibrated on reworded and distinct question pairs (tests/test_dedup_engine.py):
+# rewordings that keep the subject matter score 0.8-1.0 on content terms;
+# distinct questions sharing a template differ in a content term and stay
+# at or below ~0.7. Rewordings with synonyms for content words
+# ("speed and velocity" / "velocity from speed") are not caught.
+DUPLICATE_THRESHOLD = 0.75
+# Bump when term extraction or hashing changes (stored signatures are recomputed)
+SIGNATURE_VERSION = 3
+
+_PRIME = (1 << 31) - 1
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_NUMBER_WORDS = {
+    word: str(value) for value, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve".split()
+    )
+}
+# Function words plus the wording questions share whatever they ask about
+_STOP_WORDS = frozenset("""
+a an the of in on at to for by with from into onto about as and or nor but if than then so
+is are was were be been being am do does did has have had can could will would shall should may might must
+what which who whom whose where when why how that this these those it its they them their there here
+following best most main primary correct true false statement statements describe describes described
+explain explains example examples role function purpose process quantity cause causes effect effects
+state states happen happens happened occur occurs play plays known called term termed refer refers
+s not no all any each some other another such only also very much many more less either neither
+""".split())
+
+
+def _words(text: str) -> List[str]:
+    """Lowercased words with number words written as digits."""
+    return [_NUMBER_WORDS.get(w, w) for w in _WORD_RE.findall(text.casefold())]
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ing", "ed", "es", "s", "e"):
+        if len(word) > 4 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def shingles(text: str) -> Set[str]:
+    """
+    Content terms of the text: case, punctuation, number words and common
+    suffixes normalized, function words and generic question wording
+    dropped. A text with no content terms keeps all its words.
+    """
+    words = _words(text)
+    return {_stem(w) for w in words if w not in _STOP_WORDS} or {_stem(w) for w in words} or {""}
+
+
+def same_template(a: str, b: str) -> bool:
+    """True if the texts are word for word the same except for different numbers."""
+    words_a, words_b = _words(a), _words(b)
+    if len(words_a) != len(words_b):
+        return False
+    numbers_differ = False
+    for x, y in zip(words_a, words_b):
+        if x == y:
+            continue
+        if not (x.isdigit() and y.isdigit()):
+            return False
+        numbers_differ = True
+    return numbers_differ
+
+
+class MinHasher:
+    """MinHash signatures from NUM_PERM universal hash permutations."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, text: str) -> np.ndarray:
+        """uint64 signature of length num_perm."""
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingles(text)),
+            dtype=np.uint64
+        )
+        # (a*x + b) mod p stays below 2^62, so uint64 never overflows
+        return ((self._a * hashes[None, :] + self._b) % _PRIME).min(axis=1)
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        return np.array([self.signature(t) for t in texts], dtype=np.uint64).reshape(-1, self.num_perm)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+def band_keys(signature: np.ndarray, bands: int = BANDS) -> List[str]:
+    """One bucket key per band ("<band>:<digest>"), usable as a database key."""
+    rows = len(signature) // bands
+    return [
+        f"{i}:{hashlib.blake2b(signature[i * rows:(i + 1) * rows].tobytes(), digest_size=8).hexdigest()}"
+        for i in range(bands)
+    ]
+
+
+class LSHIndex:
+    """In-memory LSH index of signatures."""
+
+    def __init__(self, bands: int = BANDS, threshold: float = DUPLICATE_THRESHOLD):
+        self.bands = bands
+        self.threshold = threshold
+        self._buckets: Dict[str, List[int]] = {}
+        self._keys: List[Hashable] = []
+        # Row i holds the signature of _keys[i]; grown by doubling
+        self._matrix = np.zeros((0, 0), dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Hashable, signature: np.ndarray) -> None:
+        row = len(self._keys)
+        if row == len(self._matrix):
+            grown = np.zeros((max(16, 2 * row), len(signature)), dtype=np.uint64)
+            if row:
+                grown[:row] = self._matrix
+            self._matrix = grown
+        self._matrix[row] = signature
+        self._keys.append(key)
+        for bucket in band_keys(signature, self.bands):
+            self._buckets.setdefault(bucket, []).append(row)
+
+    def _similar_rows(self, signature: np.ndarray) -> np.ndarray:
+        """Rows sharing a band with the signature and reaching the threshold."""
+        candidates = {row for bucket in band_keys(signature, self.bands) for row in self._buckets.get(bucket, ())}
+        if not candidates:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        scores = (self._matrix[rows] == signature).mean(axis=1)
+        return rows[scores >= self.threshold]
+
+    def query(self, signature: np.ndarray) -> List[Hashable]:
+        """Keys whose estimated similarity to the signature reaches the threshold."""
+        return [self._keys[row] for row in self._similar_rows(signature)]
+
+
+class NearDuplicateDetector:
+    """Streaming near-duplicate filter: each text is checked against those kept before it."""
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD, hasher: MinHasher = None):
+        self.hasher = hasher or MinHasher()
+        self.index = LSHIndex(threshold=threshold)
+        self._texts: List[str] = []
+
+    def add_if_new(self, text: str) -> bool:
+        """Keep the text unless it nearly duplicates a kept one; True if kept."""
+        signature = self.hasher.signature(text)
+        if any(not same_template(text, self._texts[row]) for row in self.index.query(signature)):
+            return False
+        self.index.add(len(self._texts), signature)
+        self._texts.append(text)
+        return True
+
+
+def dedupe(texts: Sequence[str], threshold: float = DUPLICATE_THRESHOLD) -> List[int]:
+    """Indices of the texts to keep (first of each near-duplicate group), in order."""
+    detector = NearDuplicateDetector(threshold)
+    return [i for i, text in enumerate(texts) if detector.add_if_new(text)]
@@ -0,0 +1,194 @@
+"""
+Grading Engine - vectorized auto-grading of multiple-choice submissions
+
+Answer keys and submissions are encoded as integer option indices so a
+whole class (or thousands of form responses) is graded in one pass:
+- AnswerKey: questions x options credit table plus per-question weights
+  (1.0 for the correct option, optional partial credit for others)
+- encode_submissions(): raw answer text -> option index matrix
+  (-1 = unanswered, -2 = not one of the options)
+- grade_submissions(): credit lookup by fancy indexing, per-student points
+  and percentages, per-question option counts
+
+The graded credit is returned as a ResponseMatrix, so it feeds the
+analytics engine directly.
+"""
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from engines.analytics_engine import ResponseMatrix
+
+
+UNANSWERED = -1
+INVALID = -2
+
+_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _normalize(text) -> str:
+    return " ".join(str(text).split()).casefold()
+
+
+class AnswerKey:
+    """Encoded answer key: option vocabularies, credit table and weights."""
+
+    def __init__(
+        self,
+        options: Sequence[Sequence[str]],
+        correct: Sequence[int],
+        weights: Optional[Sequence[float]] = None,
+        partial_credit: Optional[Sequence[Optional[Mapping[int, float]]]] = None,
+        question_ids: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            options: Option texts per question
+            correct: Index of the correct option per question (-1 = no valid
+                key; the question then awards no credit)
+            weights: Points per question (default 1 each)
+            partial_credit: Per question, {option index: credit in 0..1}
+                for options other than the correct one
+            question_ids: Column labels (default Q1..Qn)
+        """
+        n_questions = len(options)
+        if len(correct) != n_questions:
+            raise ValueError("correct must have one entry per question")
+        self.options = [list(opts) for opts in options]
+        self.correct = np.asarray(correct, dtype=np.int64)
+        self.weights = np.ones(n_questions) if weights is None else np.asarray(weights, dtype=np.float64)
+        if self.weights.shape != (n_questions,):
+            raise ValueError("weights must have one entry per question")
+        self.question_ids = question_ids or [f"Q{i + 1}" for i in range(n_questions)]
+
+        width = max((len(opts) for opts in self.options), default=0)
+        self.credit_table = np.zeros((n_questions, max(width, 1)))
+        keyed = np.flatnonzero(self.correct >= 0)
+        self.credit_table[keyed, self.correct[keyed]] = 1.0
+        for q, partial in enumerate(partial_credit or []):
+            for option, credit in (partial or {}).items():
+                if 0 <= option < len(self.options[q]) and option != self.correct[q]:
+                    self.credit_table[q, option] = float(np.clip(credit, 0.0, 1.0))
+
+        # Lookup of normalized option text (and its letter) -> index, per question
+        self._lookup: List[Dict[str, int]] = []
+        for opts in self.options:
+            lookup = {_LETTERS[i]: i for i in range(min(len(opts), len(_LETTERS)))}
+            lookup.update({_LETTERS[i].casefold(): i for i in range(min(len(opts), len(_LETTERS)))})
+            lookup.update({_normalize(text): i for i, text in enumerate(opts)})
+            self._lookup.append(lookup)
+
+    @property
+    def n_questions(self) -> int:
+        return len(self.options)
+
+    @classmethod
+    def from_questions(cls, questions: Sequence, weights: Optional[Sequence[float]] = None) -> "AnswerKey":
+        """
+        Build a key from QuizQuestion models or question dicts.
+
+        Each question may carry optional "points" (weight) and
+        "partial_credit" ({option text: credit}) entries.
+        """
+        options, correct, points, partial = [], [], [], []
+        for q in questions:
+            q = q.model_dump() if hasattr(q, "model_dump") else dict(q)
+            opts = list(q.get("options") or [])
+            lookup = {_normalize(text): i for i, text in enumerate(opts)}
+            options.append(opts)
+            correct.append(_match_option(q.get("correct_answer"), opts, lookup))
+            points.append(q.get("points") or 1.0)
+            partial.append({
+                lookup[_normalize(text)]: credit
+                for text, credit in (q.get("partial_credit") or {}).items()
+                if _normalize(text) in lookup
+            })
+        return cls(options, correct, weights=weights if weights is not None else points, partial_credit=partial)
+
+    def encode(self, question: int, answer) -> int:
+        """Option index of one raw answer (UNANSWERED / INVALID if none)."""
+        if answer is None or (isinstance(answer, str) and not answer.strip()):
+            return UNANSWERED
+        return self._lookup[question].get(_normalize(answer), INVALID)
+
+
+def _match_option(answer, options: Sequence[str], lookup: Dict[str, int]) -> int:
+    """Index of the keyed answer: exact option text, then a bare letter, else -1."""
+    if answer is None:
+        return -1
+    normalized = _normalize(answer)
+    if normalized in lookup:
+        return lookup[normalized]
+    if len(normalized) == 1 and normalized.upper() in _LETTERS[:len(options)]:
+        return _LETTERS.index(normalized.upper())
+    return -1
+
+
+def encode_submissions(key: AnswerKey, answers) -> np.ndarray:
+    """
+    Encode raw answers as a submissions x questions int matrix of option indices.
+
+    Each column's distinct values are encoded once; the per-row work is a
+    dict lookup, so string normalization scales with distinct answers only.
+
+    Args:
+        key: AnswerKey the answers refer to
+        answers: 2-D array-like of answer text (None / "" = unanswered),
+            columns in question order
+
+    Returns:
+        int64 matrix of option indices, UNANSWERED or INVALID
+    """
+    answers = np.asarray(answers, dtype=object)
+    if answers.ndim != 2 or answers.shape[1] != key.n_questions:
+        raise ValueError("answers must be a submissions x questions matrix matching the key")
+    choices = np.empty(answers.shape, dtype=np.int64)
+    for q in range(key.n_questions):
+        column = answers[:, q].tolist()
+        codes = {value: key.encode(q, value) for value in set(column)}
+        choices[:, q] = np.fromiter(map(codes.__getitem__, column), dtype=np.int64, count=len(column))
+    return choices
+
+
+def grade_submissions(key: AnswerKey, choices, student_ids: Optional[List[str]] = None) -> Dict:
+    """
+    Grade an encoded submissions matrix in one vectorized pass.
+
+    Args:
+        key: AnswerKey
+        choices: Submissions x questions option indices (see encode_submissions)
+        student_ids: Optional row labels
+
+    Returns:
+        Dict with "matrix" (ResponseMatrix of credit, NaN = unanswered),
+        "points" and "percent" per submission, and per-question
+        "option_counts" (questions x options), "unanswered" and "invalid"
+    """
+    choices = np.asarray(choices, dtype=np.int64)
+    if choices.ndim != 2 or choices.shape[1] != key.n_questions:
+        raise ValueError("choices must be a submissions x questions matrix matching the key")
+    n_options = key.credit_table.shape[1]
+    answered = choices >= 0
+    # Out-of-range indices (e.g. from a changed form) count as invalid answers
+    valid = answered & (choices < n_options)
+
+    columns = np.broadcast_to(np.arange(key.n_questions), choices.shape)
+    credit = key.credit_table[columns, np.where(valid, choices, 0)]
+    credit = np.where(valid, credit, 0.0)
+    credit[choices == UNANSWERED] = np.nan
+
+    matrix = ResponseMatrix(credit, weights=key.weights, student_ids=student_ids, question_ids=key.question_ids)
+    points = matrix.points().sum(axis=1)
+    total = key.weights.sum()
+
+    flat = (columns * n_options + choices)[valid]
+    option_counts = np.bincount(flat, minlength=key.n_questions * n_options).reshape(key.n_questions, n_options)
+    return {
+        "matrix": matrix,
+        "points": points,
+        "percent": points * 100.0 / total if total > 0 else np.zeros(choices.shape[0]),
+        "max_points": float(total),
+        "option_counts": option_counts,
+        "unanswered": (choices == UNANSWERED).sum(axis=0),
+        "invalid": ((choices == INVALID) | (answered & ~valid)).sum(axis=0)
+    }
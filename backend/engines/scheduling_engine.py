@@ -0,0 +1,314 @@
+"""
+Scheduling Engine - deadline-aware placement of tasks into working time
+
+Places tasks into concrete time blocks on a single timeline:
+- parse_duration() / parse_due(): free-text durations ("1h 30m", "2 hours",
+  "45 min") and due dates (datetime, date or ISO string) to minutes / datetimes
+- WorkingHours: daily working window, breaks and working days
+- IntervalSet: sorted, merged busy intervals (existing calendar events) with
+  O(log n) "next free time" / "next busy start" lookups
+- schedule_tasks(): earliest-deadline-first with priority as tie-breaker,
+  driven by a heap of released tasks; a task that does not fit the current
+  free window continues in the next one (across breaks and days)
+
+Every task is pushed and popped once and each placement only walks forward
+from the cursor, so scheduling n tasks is O(n log n) plus the number of
+blocks produced.
+"""
+import heapq
+import math
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+DEFAULT_DURATION_MINUTES = 60
+
+_ZERO = timedelta(0)
+
+_UNIT_MINUTES = {
+    "h": 60, "hr": 60, "hrs": 60, "hour": 60, "hours": 60,
+    "m": 1, "min": 1, "mins": 1, "minute": 1, "minutes": 1,
+}
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([a-z]*)")
+_CLOCK_RE = re.compile(r"^(\d{1,2}):(\d{2})$")
+
+
+def parse_duration(value, default: int = DEFAULT_DURATION_MINUTES) -> int:
+    """
+    Parse a task duration to whole minutes.
+
+    Accepts numbers (minutes), timedelta, "H:MM" and free text such as
+    "2 hours", "1.5h", "1h 30m", "an hour", "45 min". Unparsable or
+    non-positive values return default.
+    """
+    if value is None or value == "":
+        return default
+    if isinstance(value, timedelta):
+        minutes = value.total_seconds() / 60
+    elif isinstance(value, (int, float)):
+        minutes = float(value)
+    else:
+        minutes = _text_minutes(str(value).strip().lower())
+    if not math.isfinite(minutes) or minutes <= 0:
+        return default
+    return max(1, math.ceil(minutes))
+
+
+@lru_cache(maxsize=4096)
+def _text_minutes(text: str) -> float:
+    # Task lists repeat a handful of duration strings, so parse each once
+    clock = _CLOCK_RE.match(text)
+    if clock:
+        return int(clock.group(1)) * 60 + int(clock.group(2))
+    minutes = 0.0
+    for number, unit in _DURATION_RE.findall(re.sub(r"\ban?\b", "1", text)):
+        if unit and unit not in _UNIT_MINUTES:
+            continue
+        minutes += float(number) * _UNIT_MINUTES.get(unit, 1)
+    return minutes
+
+
+def parse_due(value) -> Optional[datetime]:
+    """
+    Parse a due date to a naive local datetime (None if missing or unparsable).
+
+    A bare date means "by the end of that day".
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            if len(text) == 10:
+                value = date.fromisoformat(text)
+            else:
+                value = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+    if isinstance(value, date):
+        return datetime.combine(value, time(23, 59))
+    return None
+
+
+def _clock(value) -> time:
+    if isinstance(value, time):
+        return value
+    if isinstance(value, int):
+        return time(value)
+    match = _CLOCK_RE.match(str(value).strip())
+    if not match:
+        raise ValueError(f"Invalid time of day: {value!r} (expected HH:MM)")
+    return time(int(match.group(1)), int(match.group(2)))
+
+
+class WorkingHours:
+    """Daily working window minus breaks, on the given weekdays (0 = Monday)."""
+
+    def __init__(
+        self,
+        start="09:00",
+        end="17:00",
+        breaks: Sequence[Tuple] = (("12:00", "13:00"),),
+        workdays: Iterable[int] = (0, 1, 2, 3, 4)
+    ):
+        """
+        Args:
+            start: Start of the working day ("HH:MM", hour int or time)
+            end: End of the working day
+            breaks: (start, end) pairs of daily breaks
+            workdays: Weekday numbers that have working hours
+        """
+        self.start = _clock(start)
+        self.end = _clock(end)
+        self.breaks = sorted((_clock(s), _clock(e)) for s, e in breaks)
+        self.workdays = frozenset(workdays)
+
+        # Working segments of a day as (start, end) times
+        segments, cursor = [], self.start
+        for brk_start, brk_end in self.breaks:
+            if brk_start > cursor:
+                segments.append((cursor, min(brk_start, self.end)))
+            cursor = max(cursor, brk_end)
+        if cursor < self.end:
+            segments.append((cursor, self.end))
+        self._segments = [(s, e) for s, e in segments if s < e]
+        if not self._segments or not self.workdays:
+            raise ValueError("Working hours leave no time to schedule in")
+        self._days: Dict[date, List[Tuple[datetime, datetime]]] = {}
+
+    @classmethod
+    def from_dict(cls, config: Optional[Dict]) -> "WorkingHours":
+        """Build from {"start", "end", "breaks", "workdays"} (all optional)."""
+        config = config or {}
+        return cls(
+            start=config.get("start", "09:00"),
+            end=config.get("end", "17:00"),
+            breaks=[tuple(b) for b in config.get("breaks", (("12:00", "13:00"),))],
+            workdays=config.get("workdays", (0, 1, 2, 3, 4))
+        )
+
+    def segments(self, day: date) -> List[Tuple[datetime, datetime]]:
+        """Working segments of a calendar day (empty on non-working days)."""
+        cached = self._days.get(day)
+        if cached is None:
+            if day.weekday() in self.workdays:
+                cached = [(datetime.combine(day, s), datetime.combine(day, e)) for s, e in self._segments]
+            else:
+                cached = []
+            self._days[day] = cached
+        return cached
+
+    def next_segment(self, moment: datetime) -> Tuple[datetime, datetime]:
+        """The working segment containing moment, or the next one after it (clipped to start at moment)."""
+        day = moment.date()
+        while True:
+            for start, end in self.segments(day):
+                if end > moment:
+                    return max(start, moment), end
+            day += timedelta(days=1)
+            moment = datetime.combine(day, time.min)
+
+
+class IntervalSet:
+    """Disjoint busy intervals kept sorted, with binary-search lookups."""
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime]] = ()):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+        for start, end in sorted((s, e) for s, e in intervals if s < e):
+            if self._ends and start <= self._ends[-1]:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def add(self, start: datetime, end: datetime) -> None:
+        """Insert an interval, merging it with any it overlaps or touches."""
+        if start >= end:
+            return
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def next_free(self, moment: datetime) -> datetime:
+        """moment itself if it is free, else the end of the busy interval covering it."""
+        i = bisect_right(self._starts, moment) - 1
+        if i >= 0 and self._ends[i] > moment:
+            return self._ends[i]
+        return moment
+
+    def next_busy(self, moment: datetime) -> Optional[datetime]:
+        """Start of the first busy interval beginning after moment (None if none)."""
+        i = bisect_right(self._starts, moment)
+        return self._starts[i] if i < len(self._starts) else None
+
+    def intervals(self) -> List[Tuple[datetime, datetime]]:
+        return list(zip(self._starts, self._ends))
+
+
+def _free_window(moment: datetime, hours: WorkingHours, busy: IntervalSet) -> Tuple[datetime, datetime]:
+    """Next window of working time at or after moment that is not busy."""
+    while True:
+        start, end = hours.next_segment(moment)
+        start = busy.next_free(start)
+        if start >= end:
+            moment = end
+            continue
+        next_busy = busy.next_busy(start)
+        if next_busy is not None and next_busy < end:
+            end = next_busy
+        return start, end
+
+
+def schedule_tasks(
+    tasks: Sequence[Dict],
+    start: datetime,
+    hours: Optional[WorkingHours] = None,
+    busy: Iterable[Tuple[datetime, datetime]] = (),
+    buffer_minutes: int = 0,
+    min_block_minutes: int = 15
+) -> List[Dict]:
+    """
+    Place tasks into working time, earliest deadline first.
+
+    Args:
+        tasks: Dicts with "duration_minutes", "priority" (high/medium/low),
+            optional "due" and "not_before" datetimes; other keys are kept
+        start: Earliest time anything may be scheduled
+        hours: Working hours (default Mon-Fri 9-17 with a 12-13 lunch break)
+        busy: (start, end) intervals that are already taken
+        buffer_minutes: Gap left after each task
+        min_block_minutes: Free windows shorter than this are skipped unless
+            they finish the task
+
+    Returns:
+        One dict per task in scheduled order: the input keys plus "start",
+        "end", "blocks" [(start, end)] and "late" (ends after its due time)
+    """
+    hours = hours or WorkingHours()
+    busy = busy if isinstance(busy, IntervalSet) else IntervalSet(busy)
+    buffer = timedelta(minutes=buffer_minutes)
+    min_block = timedelta(minutes=min_block_minutes)
+
+    # Released tasks wait in a heap keyed (deadline, priority, input order);
+    # tasks without a deadline sort after every dated one
+    release = [max(task.get("not_before") or start, start) for task in tasks]
+    releases = sorted(range(len(tasks)), key=release.__getitem__)
+    ready: List[Tuple[datetime, int, int]] = []
+    placed: List[Dict] = []
+    cursor = start
+    next_release = 0
+
+    while next_release < len(releases) or ready:
+        if not ready:
+            cursor = max(cursor, release[releases[next_release]])
+        while next_release < len(releases) and release[releases[next_release]] <= cursor:
+            index = releases[next_release]
+            task = tasks[index]
+            heapq.heappush(ready, (
+                task.get("due") or datetime.max,
+                PRIORITY_RANK.get(task.get("priority"), 1),
+                index
+            ))
+            next_release += 1
+
+        _, _, index = heapq.heappop(ready)
+        task = tasks[index]
+        remaining = timedelta(minutes=task["duration_minutes"])
+        blocks = []
+        moment = cursor
+        while remaining > _ZERO:
+            window_start, window_end = _free_window(moment, hours, busy)
+            window = window_end - window_start
+            if window < remaining and window < min_block:
+                moment = window_end
+                continue
+            block_end = window_start + min(window, remaining)
+            blocks.append((window_start, block_end))
+            remaining -= block_end - window_start
+            moment = block_end
+
+        end = blocks[-1][1]
+        cursor = end + buffer
+        due = task.get("due")
+        placed.append({
+            **task,
+            "start": blocks[0][0],
+            "end": end,
+            "blocks": blocks,
+            "late": due is not None and end > due
+        })
+    return placed
@@ -0,0 +1,93 @@
+"""
+Variant Engine - seeded per-student quiz variants
+
+Every variant shuffles the question order and each question's option
+order; answer keys are remapped with array indexing instead of rebuilding
+each variant:
+- question_order[v, p]: base question shown at position p of variant v
+- option_order[v, q, j]: base option shown at position j of question q
+- answer_keys[v, p]: correct option position for position p of variant v
+
+Variant v depends only on (seed, v), so variants are reproducible and the
+first k are identical whatever the total count. Each variant is stored as
+a quiz of its own (questions in its order), so its responses are graded
+and analyzed like any other form.
+"""
+import hashlib
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from engines.grading_engine import AnswerKey
+
+
+class QuizVariants:
+    """count shuffled variants of a quiz (QuizQuestion models or question dicts)."""
+
+    def __init__(
+        self,
+        questions: Sequence,
+        count: int,
+        seed: int = 0,
+        shuffle_questions: bool = True,
+        shuffle_options: bool = True
+    ):
+        """
+        Args:
+            questions: Base quiz questions
+            count: Number of variants
+            seed: Variant seed (same seed -> same variants)
+            shuffle_questions: Permute question order
+            shuffle_options: Permute option order within each question
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        self.questions = [q.model_dump() if hasattr(q, "model_dump") else dict(q) for q in questions]
+        self.count = count
+        self.seed = seed
+        self.key = AnswerKey.from_questions(self.questions)
+
+        n = len(self.questions)
+        option_counts = np.array([len(q.get("options") or []) for q in self.questions], dtype=np.int64)
+        width = int(option_counts.max()) if n else 0
+        question_rng, option_rng = (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(2))
+
+        # Random sort keys, drawn row by row so variant v never depends on count
+        if shuffle_questions:
+            self.question_order = np.argsort(question_rng.random((count, n)), axis=1, kind="stable")
+        else:
+            self.question_order = np.broadcast_to(np.arange(n), (count, n)).copy()
+        slots = np.arange(width)
+        keys = option_rng.random((count, n, width)) if shuffle_options else np.zeros((count, n, width))
+        # Padding slots (questions with fewer options) sort last, in place
+        padding = slots[None, :] >= option_counts[:, None]
+        keys = np.where(padding[None], 2.0 + slots, keys)
+        self.option_order = np.argsort(keys, axis=2, kind="stable")
+
+        # Correct option position per variant position: invert the option
+        # permutation, look up each base answer, then reorder the questions
+        inverse = np.argsort(self.option_order, axis=2, kind="stable")
+        correct = self.key.correct
+        if width:
+            position = np.take_along_axis(inverse, np.clip(correct, 0, None)[None, :, None], axis=2)[..., 0]
+        else:
+            position = np.zeros((count, n), dtype=np.int64)
+        position = np.where(correct[None, :] >= 0, position, -1)
+        self.answer_keys = np.take_along_axis(position, self.question_order, axis=1)
+
+    def questions_for(self, variant: int) -> List[Dict]:
+        """Question dicts of one variant, in its order and with its option order."""
+        result = []
+        for q in self.question_order[variant]:
+            question = self.questions[q]
+            options = list(question.get("options") or [])
+            result.append({**question, "options": [options[o] for o in self.option_order[variant, q, :len(options)]]})
+        return result
+
+    def assign(self, student_ids: Sequence[str]) -> np.ndarray:
+        """Variant index per student, stable for a given seed and count."""
+        return np.array([
+            int.from_bytes(hashlib.blake2b(f"{self.seed}:{sid}".encode("utf-8"), digest_size=8).digest(), "big")
+            % self.count
+            for sid in student_ids
+        ], dtype=np.int64)
@@ -0,0 +1 @@
+# Fakes package
@@ -0,0 +1,235 @@
+"""
+Fake LLM Server - deterministic local stand-in for Gemini
+
+Produces realistic, size-proportional JSON for the prompts the agents send
+(content extraction and quiz generation) with configurable time-to-first-
+token, tokens per second, error rate and 429 rate. Output is a pure
+function of (seed, prompt), so benchmark runs are reproducible.
+
+Use in-process via services.llm_backends.FakeLLMBackend, or over HTTP:
+
+    python -m fakes.llm_server --port 8766 --ttft-ms 300 --tokens-per-second 80
+    LLM_BACKEND=http LLM_BACKEND_URL=http://127.0.0.1:8766 uvicorn main:app
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class FakeLLMConfig:
+    """Behavior knobs for the fake LLM"""
+    ttft_ms: float = 250.0  # Time to first token
+    tokens_per_second: float = 100.0  # Generation speed after the first token (0 = instant)
+    error_rate: float = 0.0  # Fraction of calls failing with 500
+    rate_limit_rate: float = 0.0  # Fraction of calls failing with 429
+    seed: int = 0
+    chunk_tokens: int = 16  # Tokens per streamed chunk
+
+
+class FakeLLMError(Exception):
+    """Injected failure; status is 429 for rate limits, 500 otherwise."""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+_WORDS = (
+    "energy force field charge mass motion wave particle system structure process "
+    "function reaction bond cell equation rate change law model theory principle"
+).split()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class FakeLLM:
+    """Deterministic prompt -> response generator with latency/failure injection."""
+
+    def __init__(self, config: Optional[FakeLLMConfig] = None):
+        self.config = config or FakeLLMConfig()
+        self._fault_rng = random.Random(self.config.seed)
+
+    # ── Response synthesis ───────────────────────────────────────────────────
+
+    def _rng_for(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.config.seed}:{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def respond(self, prompt: str) -> str:
+        """Return the full response text for a prompt (no delays)."""
+        rng = self._rng_for(prompt)
+        quiz_match = re.search(r"Generate\s+(\d+)\s+multiple-choice", prompt)
+        if quiz_match:
+            return self._quiz_response(prompt, int(quiz_match.group(1)), rng)
+        if '"key_topics"' in prompt:
+            return self._content_response(prompt, rng)
+        words = max(20, estimate_tokens(prompt) // 2)
+        return " ".join(rng.choice(_WORDS) for _ in range(words)) + "."
+
+    def _topics_in(self, prompt: str, rng: random.Random) -> List[str]:
+        match = re.search(r"Key Topics:\s*(.+)", prompt)
+        if match:
+            topics = [t.strip() for t in match.group(1).split(",") if t.strip()]
+            if topics:
+                return topics
+        notes = re.search(r"NOTES:(.*?)(?:Respond with|$)", prompt, re.S)
+        source = notes.group(1) if notes else prompt
+        phrases = re.findall(r"\b([A-Z][a-z]+(?:[ \t]+[A-Z][a-z']+){0,2})\b", source)
+        seen = []
+        for p in phrases:
+            if p not in seen and len(p) > 3 and p not in ("You", "Rules", "Respond", "Analyze", "Generate"):
+                seen.append(p)
+        if len(seen) >= 3:
+            return seen[:7]
+        return [f"{rng.choice(_WORDS).capitalize()} {rng.choice(_WORDS)}" for _ in range(rng.randint(3, 5))]
+
+    def _content_response(self, prompt: str, rng: random.Random) -> str:
+        topics = self._topics_in(prompt, rng)[: rng.randint(3, 7)]
+        summary = (
+            f"This chapter introduces {', '.join(topics[:-1]) or topics[0]} and {topics[-1]}, "
+            f"explaining the underlying {rng.choice(_WORDS)} and its applications."
+        )
+        return json.dumps({"key_topics": topics, "summary": summary}, indent=2)
+
+    def _quiz_response(self, prompt: str, count: int, rng: random.Random) -> str:
+        topics = self._topics_in(prompt, rng)
+        questions = []
+        for i in range(count):
+            topic = topics[i % len(topics)]
+            options = [
+                f"The {rng.choice(_WORDS)} of {topic.lower()} {rng.choice(['increases', 'decreases', 'is constant', 'doubles'])}"
+                for _ in range(4)
+            ]
+            # Keep options unique so answer keys stay unambiguous
+            options = [f"{opt} ({chr(65 + j)})" for j, opt in enumerate(options)]
+            questions.append({
+                "question": f"Which statement best describes {topic} in situation {i + 1}?",
+                "options": options,
+                "correct_answer": options[rng.randrange(4)],
+                "topic": topic,
+            })
+        return json.dumps(questions, indent=2)
+
+    # ── Failure and timing injection ─────────────────────────────────────────
+
+    def maybe_fail(self) -> None:
+        """Raise FakeLLMError according to the configured rates."""
+        roll = self._fault_rng.random()
+        if roll < self.config.rate_limit_rate:
+            raise FakeLLMError(429, "Resource has been exhausted (e.g. check quota).")
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            raise FakeLLMError(500, "An internal error has occurred.")
+
+    def chunks(self, text: str) -> List[str]:
+        """Split text into streaming chunks of ~chunk_tokens tokens."""
+        size = max(1, self.config.chunk_tokens * 4)
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    def chunk_delay(self, chunk: str) -> float:
+        if self.config.tokens_per_second <= 0:
+            return 0.0
+        return estimate_tokens(chunk) / self.config.tokens_per_second
+
+    def generate(self, prompt: str) -> str:
+        """Blocking generation with TTFT and throughput delays."""
+        self.maybe_fail()
+        text = self.respond(prompt)
+        time.sleep(self.config.ttft_ms / 1000.0 + self.chunk_delay(text))
+        return text
+
+
+def create_app(config: Optional[FakeLLMConfig] = None) -> FastAPI:
+    """Create the fake LLM FastAPI app."""
+    llm = FakeLLM(config)
+    app = FastAPI(title="Fake LLM")
+    stats = {"requests": 0, "failures": 0, "output_tokens": 0}
+
+    def _failure(e: FakeLLMError) -> JSONResponse:
+        stats["failures"] += 1
+        status = "RESOURCE_EXHAUSTED" if e.status == 429 else "INTERNAL"
+        return JSONResponse(status_code=e.status, content={"error": {"code": e.status, "message": str(e), "status": status}})
+
+    @app.get("/_fake/stats")
+    def fake_stats():
+        return {**stats, "config": asdict(llm.config)}
+
+    @app.post("/_fake/config")
+    async def fake_config(request: Request):
+        for key, value in (await request.json()).items():
+            if hasattr(llm.config, key):
+                setattr(llm.config, key, value)
+        return asdict(llm.config)
+
+    @app.post("/v1/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        try:
+            llm.maybe_fail()
+        except FakeLLMError as e:
+            return _failure(e)
+        text = llm.respond(body.get("prompt", ""))
+        await asyncio.sleep(llm.config.ttft_ms / 1000.0 + llm.chunk_delay(text))
+        usage = {"prompt_tokens": estimate_tokens(body.get("prompt", "")), "output_tokens": estimate_tokens(text)}
+        stats["output_tokens"] += usage["output_tokens"]
+        return {"text": text, "model": body.get("model"), "usage": usage}
+
+    @app.post("/v1/stream")
+    async def stream(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        try:
+            llm.maybe_fail()
+        except FakeLLMError as e:
+            return _failure(e)
+        text = llm.respond(body.get("prompt", ""))
+        stats["output_tokens"] += estimate_tokens(text)
+
+        async def events():
+            await asyncio.sleep(llm.config.ttft_ms / 1000.0)
+            for chunk in llm.chunks(text):
+                await asyncio.sleep(llm.chunk_delay(chunk))
+                yield f"data: {json.dumps({'text': chunk})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fake LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--ttft-ms", type=float, default=250.0)
+    parser.add_argument("--tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+    config = FakeLLMConfig(
+        ttft_ms=args.ttft_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
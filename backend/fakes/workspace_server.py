@@ -0,0 +1,585 @@
+"""
+Fake Google Workspace Server - local stand-in for load and latency testing
+
+Implements the subset of the Forms, Classroom, Docs, Sheets, Drive and
+Calendar REST APIs that the services call (including Forms and Calendar
+batch requests), with in-memory state and configurable latency, error rate and
+per-minute quota (429 RESOURCE_EXHAUSTED).
+
+Point the services at it with GOOGLE_API_ENDPOINT:
+
+    python -m fakes.workspace_server --port 8765 --latency-ms 80 --error-rate 0.01
+    GOOGLE_API_ENDPOINT=http://127.0.0.1:8765 uvicorn main:app
+
+Runtime knobs can be changed via POST /_fake/config and inspected via
+GET /_fake/stats.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta, timezone
+from email.parser import BytesParser, Parser
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+
+@dataclass
+class FakeWorkspaceConfig:
+    """Behavior knobs for the fake server"""
+    latency_ms: float = 50.0  # Base latency added to every API call
+    jitter_ms: float = 20.0  # Uniform random jitter on top of latency_ms
+    latency_overrides: Dict[str, float] = field(default_factory=dict)  # Per-API base latency
+    error_rate: float = 0.0  # Fraction of calls failing with 503
+    quota_per_minute: int = 0  # Token-bucket quota per API (0 = unlimited)
+    seed: int = 42
+    sheet_rows: int = 200  # Rows in seeded response sheets
+    sheet_questions: int = 10  # Question columns in seeded response sheets
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _error(code: int, status: str, message: str) -> JSONResponse:
+    """Google-style error body (what googleapiclient's HttpError parses)."""
+    return JSONResponse(
+        status_code=code,
+        content={"error": {"code": code, "message": message, "status": status}}
+    )
+
+
+def _api_for_path(path: str) -> Optional[str]:
+    """Map a request path to the API it belongs to."""
+    if path.startswith("/v1/forms") or path.startswith("/batch/forms"):
+        return "forms"
+    if path.startswith("/v1/courses"):
+        return "classroom"
+    if path.startswith("/v1/documents"):
+        return "docs"
+    if path.startswith("/v4/spreadsheets"):
+        return "sheets"
+    if path.startswith("/calendar/v3") or path.startswith("/batch/calendar"):
+        return "calendar"
+    if path.startswith("/drive/v3"):
+        return "drive"
+    return None
+
+
+class _QuotaBucket:
+    """Per-minute token bucket, refilled continuously."""
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class FakeWorkspaceState:
+    """In-memory documents, forms, sheets, courses and calendars."""
+
+    def __init__(self, config: FakeWorkspaceConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.forms: Dict[str, Dict] = {}
+        self.form_responses: Dict[str, List[Dict]] = {}
+        self.courses: Dict[str, Dict] = {}
+        self.course_work: Dict[str, List[Dict]] = {}
+        self.course_materials: Dict[str, List[Dict]] = {}
+        self.documents: Dict[str, Dict] = {}
+        self.spreadsheets: Dict[str, Dict] = {}
+        self.events: Dict[str, List[Dict]] = {}
+        self.counter = 0
+        self._seed()
+
+    def next_id(self, prefix: str) -> str:
+        with self.lock:
+            self.counter += 1
+            return f"{prefix}_{self.counter:06d}"
+
+    def _seed(self) -> None:
+        for cid, name in [("course_1", "Physics 101"), ("course_2", "Mathematics 201"), ("course_3", "Chemistry 101")]:
+            self.courses[cid] = {"id": cid, "name": name, "courseState": "ACTIVE"}
+            self.course_work[cid] = []
+            self.course_materials[cid] = [
+                {
+                    "id": f"{cid}_mat_{i}",
+                    "title": f"{name} - Unit {i + 1} notes",
+                    "description": (
+                        f"Unit {i + 1} of {name} covers fundamental principles, worked examples "
+                        "and practical applications of the core concepts."
+                    ),
+                }
+                for i in range(3)
+            ]
+        self.documents["doc_1"] = self._make_document("doc_1", "Chapter 5: Advanced Topics", 12)
+        self.spreadsheets["sheet_1"] = self._make_spreadsheet(
+            "sheet_1", self.config.sheet_rows, self.config.sheet_questions
+        )
+        self.events["primary"] = []
+
+    def _make_document(self, document_id: str, title: str, paragraphs: int) -> Dict:
+        content = []
+        for i in range(paragraphs):
+            text = (
+                f"Section {i + 1}. This section explains core principle {i + 1}, "
+                "its derivation and how it is applied to real-world problems.\n"
+            )
+            content.append({"paragraph": {"elements": [{"textRun": {"content": text}}]}})
+        return {"documentId": document_id, "title": title, "body": {"content": content}, "revisionId": "rev_1"}
+
+    def _make_spreadsheet(self, spreadsheet_id: str, rows: int, questions: int) -> Dict:
+        header = ["Timestamp", "Email Address", "Score"] + [f"Q{i + 1}" for i in range(questions)]
+        sheet = {
+            "spreadsheetId": spreadsheet_id,
+            "properties": {"title": "Quiz Responses"},
+            "sheets": [{"properties": {"title": "Form Responses 1", "gridProperties": {"rowCount": rows + 1}}}],
+            "values": {"Form Responses 1": [header]},
+            "version": 1,
+            "modifiedTime": _now_iso(),
+        }
+        self._append_sheet_rows(sheet, rows)
+        return sheet
+
+    def _append_sheet_rows(self, sheet: Dict, rows: int) -> None:
+        values = sheet["values"]["Form Responses 1"]
+        questions = len(values[0]) - 3
+        start = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc)
+        for r in range(len(values) - 1, len(values) - 1 + rows):
+            answers = [self.rng.choice("ABCD") for _ in range(questions)]
+            correct = sum(1 for a in answers if a == "A")
+            values.append(
+                [(start + timedelta(minutes=r)).strftime("%m/%d/%Y %H:%M:%S"),
+                 f"student{r + 1}@school.example",
+                 f"{correct} / {questions}"] + answers
+            )
+
+    def generate_sheet_rows(self, spreadsheet_id: str, count: int) -> int:
+        """Append synthetic response rows, as Forms does on new submissions."""
+        sheet = self.spreadsheets.get(spreadsheet_id)
+        if sheet is None:
+            return 0
+        with self.lock:
+            self._append_sheet_rows(sheet, count)
+            sheet["version"] += 1
+            sheet["modifiedTime"] = _now_iso()
+        return count
+
+    def create_form(self, body: Dict) -> Dict:
+        form_id = self.next_id("form")
+        form = {
+            "formId": form_id,
+            "info": body.get("info", {}),
+            "items": [],
+            "revisionId": "rev_0",
+            "responderUri": f"https://docs.google.com/forms/d/{form_id}/viewform",
+        }
+        self.forms[form_id] = form
+        self.form_responses[form_id] = []
+        return form
+
+    def update_form(self, form_id: str, body: Dict) -> Optional[Dict]:
+        """Apply a forms.batchUpdate body; None if the form does not exist."""
+        form = self.forms.get(form_id)
+        if form is None:
+            return None
+        replies = []
+        for req in body.get("requests", []):
+            if "createItem" in req:
+                item = dict(req["createItem"]["item"])
+                item["itemId"] = self.next_id("item")
+                if "questionItem" in item:
+                    item["questionItem"]["question"]["questionId"] = self.next_id("q")
+                index = req["createItem"].get("location", {}).get("index", len(form["items"]))
+                form["items"].insert(index, item)
+                replies.append({"createItem": {"itemId": item["itemId"]}})
+            else:
+                replies.append({})
+        form["revisionId"] = self.next_id("rev")
+        return {"replies": replies, "writeControl": {"requiredRevisionId": form["revisionId"]}}
+
+    def insert_event(self, calendar_id: str, event: Dict) -> Dict:
+        event.update({
+            "id": self.next_id("evt"),
+            "status": "confirmed",
+            "htmlLink": f"https://calendar.google.com/event?eid={self.counter}",
+        })
+        with self.lock:
+            self.events.setdefault(calendar_id, []).append(event)
+        return event
+
+    def free_busy(self, body: Dict) -> Dict:
+        time_min, time_max = _parse_rfc3339(body.get("timeMin")), _parse_rfc3339(body.get("timeMax"))
+        calendars = {}
+        for item in body.get("items", []):
+            cal_id = item.get("id", "primary")
+            busy = []
+            for e in self.events.get(cal_id, []):
+                if "dateTime" not in e.get("start", {}):
+                    continue
+                start, end = _parse_rfc3339(e["start"]["dateTime"]), _parse_rfc3339(e["end"]["dateTime"])
+                if end > time_min and start < time_max:
+                    busy.append((start, end))
+            calendars[cal_id] = {"busy": [
+                {"start": _format_rfc3339(start), "end": _format_rfc3339(end)} for start, end in sorted(busy)
+            ]}
+        return {"kind": "calendar#freeBusy", "timeMin": body.get("timeMin"), "timeMax": body.get("timeMax"),
+                "calendars": calendars}
+
+    def generate_form_responses(self, form_id: str, count: int) -> int:
+        """Synthesize submissions against a form's choice questions."""
+        form = self.forms.get(form_id)
+        if form is None:
+            return 0
+        questions = [
+            (item["questionItem"]["question"]["questionId"],
+             [o["value"] for o in item["questionItem"]["question"].get("choiceQuestion", {}).get("options", [])])
+            for item in form.get("items", [])
+            if "questionItem" in item
+        ]
+        new = []
+        for _ in range(count):
+            answers = {
+                qid: {"questionId": qid, "textAnswers": {"answers": [{"value": self.rng.choice(opts)}]}}
+                for qid, opts in questions if opts
+            }
+            ts = _now_iso()
+            new.append({
+                "formId": form_id,
+                "responseId": self.next_id("resp"),
+                "createTime": ts,
+                "lastSubmittedTime": ts,
+                "respondentEmail": f"student{self.rng.randint(1, 10000)}@school.example",
+                "answers": answers,
+            })
+        revision = self.next_id("rev")
+        with self.lock:
+            self.form_responses.setdefault(form_id, []).extend(new)
+            form["revisionId"] = revision
+        return len(new)
+
+
+def _parse_rfc3339(value: Optional[str]) -> datetime:
+    parsed = datetime.fromisoformat((value or "1970-01-01T00:00:00Z").replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _format_rfc3339(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _parse_batch(content_type: str, body: bytes):
+    """Yield (content_id, method, path, json_body) for each part of a multipart/mixed batch."""
+    message = BytesParser().parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    for part in message.get_payload():
+        raw = part.get_payload()
+        request_line, _, rest = raw.partition("\n")
+        method, target, _ = request_line.strip().split(" ", 2)
+        inner = Parser().parsestr(rest)
+        payload = inner.get_payload()
+        yield part["Content-ID"] or "", method, target.split("?", 1)[0], json.loads(payload) if payload.strip() else None
+
+
+def _not_found(method: str, path: str):
+    return 404, {"error": {"code": 404, "message": f"Not found: {method} {path}", "status": "NOT_FOUND"}}
+
+
+def _dispatch_forms(state: "FakeWorkspaceState", method: str, path: str, body: Optional[Dict]):
+    """Route one batched Forms call; returns (status, payload)."""
+    if method == "POST" and path == "/v1/forms":
+        return 200, state.create_form(body or {})
+    match = re.fullmatch(r"/v1/forms/([^/:]+):batchUpdate", path)
+    if method == "POST" and match:
+        result = state.update_form(match.group(1), body or {})
+        if result is not None:
+            return 200, result
+    return _not_found(method, path)
+
+
+def _dispatch_calendar(state: "FakeWorkspaceState", method: str, path: str, body: Optional[Dict]):
+    """Route one batched Calendar call; returns (status, payload)."""
+    match = re.fullmatch(r"/calendar/v3/calendars/([^/]+)/events", path)
+    if method == "POST" and match:
+        return 200, state.insert_event(match.group(1), body or {})
+    if method == "POST" and path == "/calendar/v3/freeBusy":
+        return 200, state.free_busy(body or {})
+    return _not_found(method, path)
+
+
+def _parse_a1_rows(a1_range: str):
+    """Parse "Sheet!A2:Z101" -> (sheet, first_row, last_row), rows 1-based."""
+    sheet, _, cells = a1_range.rpartition("!")
+    sheet = sheet.strip("'") if sheet else None
+    rows = [int(n) for n in re.findall(r"[A-Za-z]*(\d+)", cells)]
+    if not rows:
+        return sheet or cells.strip("'"), 1, None
+    return sheet, rows[0], rows[1] if len(rows) > 1 else rows[0]
+
+
+def create_app(config: Optional[FakeWorkspaceConfig] = None) -> FastAPI:
+    """Create the fake Workspace FastAPI app."""
+    config = config or FakeWorkspaceConfig()
+    state = FakeWorkspaceState(config)
+    app = FastAPI(title="Fake Google Workspace")
+    app.state.workspace = state
+    buckets: Dict[str, _QuotaBucket] = {}
+    stats = {"requests": 0, "errors_injected": 0, "quota_rejections": 0, "by_api": {}}
+
+    @app.middleware("http")
+    async def inject_behavior(request: Request, call_next):
+        api = _api_for_path(request.url.path)
+        if api is None:
+            return await call_next(request)
+
+        stats["requests"] += 1
+        stats["by_api"][api] = stats["by_api"].get(api, 0) + 1
+
+        base = config.latency_overrides.get(api, config.latency_ms)
+        delay = base + state.rng.uniform(0, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+
+        if config.quota_per_minute > 0:
+            bucket = buckets.get(api)
+            if bucket is None or bucket.capacity != config.quota_per_minute:
+                bucket = buckets[api] = _QuotaBucket(config.quota_per_minute)
+            if not bucket.take():
+                stats["quota_rejections"] += 1
+                return _error(429, "RESOURCE_EXHAUSTED", f"Quota exceeded for quota metric '{api} requests per minute'.")
+
+        if config.error_rate > 0 and state.rng.random() < config.error_rate:
+            stats["errors_injected"] += 1
+            return _error(503, "UNAVAILABLE", "The service is currently unavailable.")
+
+        return await call_next(request)
+
+    # ── Control plane ────────────────────────────────────────────────────────
+
+    @app.get("/_fake/stats")
+    def fake_stats():
+        return {**stats, "config": asdict(config)}
+
+    @app.post("/_fake/config")
+    async def fake_config(request: Request):
+        updates = await request.json()
+        for key, value in updates.items():
+            if hasattr(config, key):
+                setattr(config, key, value)
+        return asdict(config)
+
+    @app.post("/_fake/forms/{form_id}/responses:generate")
+    def fake_generate_responses(form_id: str, count: int = 10):
+        return {"generated": state.generate_form_responses(form_id, count)}
+
+    @app.post("/_fake/spreadsheets/{spreadsheet_id}/rows:generate")
+    def fake_generate_rows(spreadsheet_id: str, count: int = 10):
+        return {"generated": state.generate_sheet_rows(spreadsheet_id, count)}
+
+    @app.get("/tokeninfo")
+    def tokeninfo(access_token: str = ""):
+        if not access_token or access_token.startswith("invalid"):
+            return _error(400, "INVALID_ARGUMENT", "Invalid Value")
+        return {
+            "azp": "fake-client", "aud": "fake-client", "expires_in": "3599",
+            "scope": " ".join([
+                "https://www.googleapis.com/auth/forms.body",
+                "https://www.googleapis.com/auth/spreadsheets.readonly",
+                "https://www.googleapis.com/auth/calendar",
+            ]),
+        }
+
+    # ── Forms ────────────────────────────────────────────────────────────────
+
+    @app.post("/v1/forms")
+    async def forms_create(request: Request):
+        return state.create_form(await request.json())
+
+    @app.post("/v1/forms/{form_id}:batchUpdate")
+    async def forms_batch_update(form_id: str, request: Request):
+        result = state.update_form(form_id, await request.json())
+        return result if result is not None else _error(404, "NOT_FOUND", f"Form {form_id} not found")
+
+    @app.get("/v1/forms/{form_id}")
+    def forms_get(form_id: str):
+        form = state.forms.get(form_id)
+        return form if form is not None else _error(404, "NOT_FOUND", f"Form {form_id} not found")
+
+    @app.get("/v1/forms/{form_id}/responses")
+    def forms_responses_list(form_id: str, pageSize: int = 5000, pageToken: str = "", filter: str = ""):
+        if form_id not in state.forms:
+            return _error(404, "NOT_FOUND", f"Form {form_id} not found")
+        responses = state.form_responses.get(form_id, [])
+        match = re.match(r"\s*timestamp\s*(>=|>)\s*(\S+)", filter or "")
+        if match:
+            op, ts = match.groups()
+            responses = [
+                r for r in responses
+                if (r["lastSubmittedTime"] > ts if op == ">" else r["lastSubmittedTime"] >= ts)
+            ]
+        offset = int(pageToken) if pageToken else 0
+        page_size = max(1, min(pageSize, 5000))
+        page = responses[offset:offset + page_size]
+        result: Dict = {"responses": page} if page else {}
+        if offset + page_size < len(responses):
+            result["nextPageToken"] = str(offset + page_size)
+        return result
+
+    # ── Classroom ────────────────────────────────────────────────────────────
+
+    @app.get("/v1/courses")
+    def courses_list(pageSize: int = 0):
+        return {"courses": list(state.courses.values())}
+
+    @app.post("/v1/courses/{course_id}/courseWork")
+    async def course_work_create(course_id: str, request: Request):
+        if course_id not in state.courses:
+            return _error(404, "NOT_FOUND", f"Course {course_id} not found")
+        work = await request.json()
+        work.update({
+            "id": state.next_id("cw"),
+            "courseId": course_id,
+            "creationTime": _now_iso(),
+            "alternateLink": f"https://classroom.google.com/c/{course_id}/a/{state.counter}",
+        })
+        state.course_work[course_id].append(work)
+        return work
+
+    @app.get("/v1/courses/{course_id}/courseWorkMaterials")
+    def course_materials_list(course_id: str):
+        if course_id not in state.courses:
+            return _error(404, "NOT_FOUND", f"Course {course_id} not found")
+        return {"courseWorkMaterial": state.course_materials.get(course_id, [])}
+
+    # ── Docs ─────────────────────────────────────────────────────────────────
+
+    @app.get("/v1/documents/{document_id}")
+    def documents_get(document_id: str):
+        doc = state.documents.get(document_id)
+        if doc is None:
+            doc = state.documents[document_id] = state._make_document(document_id, document_id, 12)
+        return doc
+
+    # ── Sheets ───────────────────────────────────────────────────────────────
+
+    @app.get("/v4/spreadsheets/{spreadsheet_id}")
+    def spreadsheets_get(spreadsheet_id: str):
+        sheet = state.spreadsheets.get(spreadsheet_id)
+        if sheet is None:
+            return _error(404, "NOT_FOUND", f"Spreadsheet {spreadsheet_id} not found")
+        return {k: v for k, v in sheet.items() if k not in ("values", "version", "modifiedTime")}
+
+    @app.get("/v4/spreadsheets/{spreadsheet_id}/values/{a1_range:path}")
+    def values_get(spreadsheet_id: str, a1_range: str):
+        sheet = state.spreadsheets.get(spreadsheet_id)
+        if sheet is None:
+            return _error(404, "NOT_FOUND", f"Spreadsheet {spreadsheet_id} not found")
+        sheet_name, first, last = _parse_a1_rows(a1_range)
+        rows = sheet["values"].get(sheet_name or "Form Responses 1")
+        if rows is None:
+            return _error(400, "INVALID_ARGUMENT", f"Unable to parse range: {a1_range}")
+        selected = rows[first - 1:last] if last is not None else rows[first - 1:]
+        result = {"range": a1_range, "majorDimension": "ROWS"}
+        if selected:
+            result["values"] = selected
+        return result
+
+    # ── Drive ────────────────────────────────────────────────────────────────
+
+    @app.get("/drive/v3/files/{file_id}")
+    def files_get(file_id: str):
+        sheet = state.spreadsheets.get(file_id)
+        if sheet is None:
+            return _error(404, "NOT_FOUND", f"File not found: {file_id}")
+        return {
+            "kind": "drive#file",
+            "id": file_id,
+            "name": sheet["properties"]["title"],
+            "mimeType": "application/vnd.google-apps.spreadsheet",
+            "version": str(sheet["version"]),
+            "modifiedTime": sheet["modifiedTime"],
+        }
+
+    # ── Calendar ─────────────────────────────────────────────────────────────
+
+    @app.post("/calendar/v3/calendars/{calendar_id}/events")
+    async def events_insert(calendar_id: str, request: Request):
+        return state.insert_event(calendar_id, await request.json())
+
+    @app.post("/calendar/v3/freeBusy")
+    async def freebusy_query(request: Request):
+        return state.free_busy(await request.json())
+
+    async def run_batch(request: Request, dispatch) -> Response:
+        """multipart/mixed batch, each call failing independently like the real API."""
+        boundary = f"batch_{state.next_id('b')}"
+        parts = []
+        for content_id, method, path, body in _parse_batch(request.headers.get("content-type", ""), await request.body()):
+            if config.error_rate > 0 and state.rng.random() < config.error_rate:
+                stats["errors_injected"] += 1
+                status, payload = 503, {"error": {"code": 503, "message": "The service is currently unavailable.",
+                                                  "status": "UNAVAILABLE"}}
+            else:
+                status, payload = dispatch(state, method, path, body)
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id.strip('<>')}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n\r\n{json.dumps(payload)}\r\n"
+            )
+        return Response(
+            content="".join(parts) + f"--{boundary}--\r\n",
+            media_type=f"multipart/mixed; boundary={boundary}"
+        )
+
+    @app.post("/batch/calendar/v3")
+    async def calendar_batch(request: Request):
+        return await run_batch(request, _dispatch_calendar)
+
+    @app.post("/batch/forms/v1")
+    async def forms_batch(request: Request):
+        return await run_batch(request, _dispatch_forms)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fake Google Workspace server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-per-minute", type=int, default=0)
+    parser.add_argument("--sheet-rows", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    import uvicorn
+    config = FakeWorkspaceConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        quota_per_minute=args.quota_per_minute,
+        sheet_rows=args.sheet_rows,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
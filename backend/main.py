@@ -14,25 +14,44 @@ Agents NEVER call Google APIs directly - only this orchestrator does.
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from schemas.models import OrchestrateRequest, OrchestrateResponse, IntentOutput
+from schemas.models import (
+    ClassPlanRequest, OrchestrateRequest, OrchestrateResponse, IntentOutput, QuizGradeRequest, QuizVariantsRequest
+)
 from agents.intent_agent import parse_intent
 from agents.quiz_agent import generate_quiz
 from agents.content_agent import extract_content
 from agents.classroom_agent import assign_to_classroom
-from agents.learning_agent import generate_learning_plan
-from agents.analytics_agent import analyze_quiz_results
+from agents.learning_agent import generate_class_plans, generate_learning_plan
+from agents.analytics_agent import (
+    analyze_quiz_batches, analytics_delta, compare_cohorts, grade_quiz, score_trends, student_topic_mastery,
+    summarize_aggregate
+)
 from agents.workflow_agent import optimize_schedule
+from engines.analytics_engine import QuizAggregate
+from engines.grading_engine import AnswerKey
+from engines.variant_engine import QuizVariants
 from services.gemini_service import GeminiService
 from services.classroom_service import ClassroomService
-from services.forms_service import FormsService
+from services.forms_service import FormsService, SCOPES as FORMS_SCOPES
 from services.docs_service import DocsService
 from services.sheets_service import SheetsService
 from services.calendar_service import CalendarService
+from services.forms_ingestion import FormsIngestion
+from storage.aggregate_store import AggregateStore
+from storage.curriculum_store import CurriculumStore
+from storage.question_bank import QuestionBank
+from storage.quiz_store import QuizStore
+from storage.results_store import ResultsStore
+from utils.cache import RevisionCache
+from utils.events import EventHub
+from utils.metrics import metrics
+from utils.offload import OffloadRejected, offload
 import os
 import json
 import asyncio
 import time
 import re
+from datetime import datetime, timedelta
 
 # Ensure environment variables from .env are loaded before service initialization
 try:
@@ -69,6 +88,57 @@ forms_service = FormsService()
 docs_service = DocsService()
 sheets_service = SheetsService()
 calendar_service = CalendarService()
+quiz_store = QuizStore()
+question_bank = QuestionBank()
+aggregate_store = AggregateStore()
+results_store = ResultsStore()
+curriculum_store = CurriculumStore()
+analytics_hub = EventHub()
+# Analytics per quiz, valid until the source sheet's revision changes
+analytics_cache = RevisionCache(maxsize=256)
+
+
+def publish_analytics(quiz_id: str, quiz: dict, analytics: dict) -> None:
+    """Push updated analytics to /analytics/stream subscribers of the quiz and of its class."""
+    # New responses were folded in, so any cached result for the quiz is stale
+    analytics_cache.invalidate(quiz_id)
+    analytics_hub.publish(f"quiz:{quiz_id}", quiz_id, analytics)
+    if quiz.get("class_name"):
+        analytics_hub.publish(f"class:{quiz['class_name']}", quiz_id, analytics)
+
+
+forms_ingestion = FormsIngestion(forms_service, quiz_store, aggregate_store, results_store, on_update=publish_analytics)
+
+# Poll every stored quiz's form for new responses in the background (0 = only on request)
+FORMS_POLL_SECONDS = float(os.getenv("FORMS_POLL_SECONDS", "0"))
+
+
+@app.on_event("startup")
+async def start_offload_pools():
+    # Warm the workers off the loop so the first heavy requests do not pay for it
+    await asyncio.to_thread(offload.start)
+
+
+@app.on_event("shutdown")
+def stop_offload_pools():
+    offload.shutdown()
+
+
+@app.on_event("startup")
+async def start_forms_polling():
+    if FORMS_POLL_SECONDS <= 0:
+        return
+
+    async def poll_loop():
+        while True:
+            await asyncio.sleep(FORMS_POLL_SECONDS)
+            try:
+                form_ids = [q for q in quiz_store.quiz_ids() if q != "mock_form_id"]
+                await asyncio.to_thread(forms_ingestion.poll_forms, form_ids)
+            except Exception as e:
+                print(f"Warning: Forms polling failed: {e}")
+
+    asyncio.create_task(poll_loop())
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -112,7 +182,7 @@ def google_auth_callback(code: str = None, error: str = None):
             }
             flow = Flow.from_client_config(
                 client_config, 
-                scopes=["https://www.googleapis.com/auth/forms.body"],
+                scopes=FORMS_SCOPES,
                 redirect_uri=redirect_uri
             )
         else:
@@ -129,6 +199,7 @@ def google_auth_callback(code: str = None, error: str = None):
         # Reload forms service
         global forms_service
         forms_service = FormsService()
+        forms_ingestion.forms_service = forms_service
         
         return {
             "success": True, 
@@ -143,10 +214,18 @@ def google_auth_callback(code: str = None, error: str = None):
 @app.get("/auth/status")
 def auth_status():
     """Check current authorization status."""
+    if not forms_service._is_ready:
+        message = "Not authorized. Visit /auth/google to start."
+    elif forms_service.missing_scopes:
+        message = "Forms ready to create, but response ingestion needs re-authorization. Visit /auth/google."
+    else:
+        message = "Forms ready to create!"
     return {
         "forms_ready": forms_service._is_ready,
-        "auth_url": forms_service.get_authorization_url() if not forms_service._is_ready else None,
-        "message": "Forms ready to create!" if forms_service._is_ready else "Not authorized. Visit /auth/google to start."
+        "missing_scopes": forms_service.missing_scopes,
+        "auth_url": forms_service.get_authorization_url()
+        if not forms_service._is_ready or forms_service.missing_scopes else None,
+        "message": message
     }
 
 
@@ -177,6 +256,28 @@ def extract_subject_chapter(prompt: str) -> tuple:
     return subject, chapter
 
 
+def save_quiz(form_result: dict, title: str, subject: str, chapter: str, quiz_output, content_output) -> None:
+    """Persist the quiz and its question -> topic mapping for later analytics."""
+    form_id = form_result.get("form_id")
+    if not form_id or form_id == "mock_form_id":
+        return
+    try:
+        quiz_store.save_quiz(
+            form_id,
+            title,
+            [q.model_dump() for q in quiz_output.questions],
+            key_topics=content_output.key_topics,
+            subject=subject,
+            chapter=chapter,
+            class_name=f"{subject} Class"  # Same class the quiz is assigned to
+        )
+        # A new answer key changes grading, so drop analytics computed with the old one
+        analytics_cache.invalidate(form_id)
+    except Exception as e:
+        # Persistence must never break quiz creation
+        print(f"Warning: could not save quiz {form_id}: {e}")
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Streaming endpoint for real-time agent updates (Server-Sent Events)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -204,6 +305,7 @@ async def orchestrate_stream(request: OrchestrateRequest):
             
             intent = parse_intent(request.prompt)
             intent_time = round(time.time() - start_time, 2)
+            metrics.observe("stage.intent", time.time() - start_time)
             
             yield sse("agent_complete", {
                 "agent": "intent",
@@ -228,12 +330,13 @@ async def orchestrate_stream(request: OrchestrateRequest):
                 # Get notes content (from prompt or external source)
                 notes = request.prompt
                 if intent.source == "google_classroom":
-                    notes = classroom_service.get_course_materials("course_1")
+                    notes = await asyncio.to_thread(classroom_service.get_course_materials, "course_1")
                 elif intent.source == "google_docs":
-                    notes = docs_service.get_document_content("doc_1")
+                    notes = await asyncio.to_thread(docs_service.get_document_content, "doc_1")
                 
-                content_output = extract_content(subject, chapter, notes, gemini_service)
+                content_output = await offload.run(extract_content, subject, chapter, notes, gemini_service)
                 content_time = round(time.time() - content_start, 2)
+                metrics.observe("stage.content", time.time() - content_start)
                 
                 yield sse("agent_complete", {
                     "agent": "content",
@@ -261,8 +364,12 @@ Original Request: {request.prompt}
 """
                 
                 num_questions = intent.num_questions or 5
-                quiz_output = generate_quiz(enriched_content, num_questions, gemini_service)
+                quiz_output = await offload.run(
+                    generate_quiz, enriched_content, num_questions, gemini_service, content_output.key_topics,
+                    bank=question_bank, subject=subject, chapter=chapter, class_name=f"{subject} Class"
+                )
                 quiz_time = round(time.time() - quiz_start, 2)
+                metrics.observe("stage.quiz", time.time() - quiz_start)
                 
                 yield sse("agent_complete", {
                     "agent": "quiz",
@@ -277,8 +384,10 @@ Original Request: {request.prompt}
                 forms_start = time.time()
                 
                 form_title = f"{subject} {chapter} Quiz"
-                form_result = forms_service.create_quiz_form(form_title, quiz_output.questions)
+                form_result = await asyncio.to_thread(forms_service.create_quiz_form, form_title, quiz_output.questions)
                 forms_time = round(time.time() - forms_start, 2)
+                metrics.observe("stage.forms", time.time() - forms_start)
+                save_quiz(form_result, form_title, subject, chapter, quiz_output, content_output)
                 
                 yield sse("agent_complete", {
                     "agent": "forms",
@@ -299,6 +408,7 @@ Original Request: {request.prompt}
                     class_name=f"{subject} Class"
                 )
                 classroom_time = round(time.time() - classroom_start, 2)
+                metrics.observe("stage.classroom", time.time() - classroom_start)
                 
                 yield sse("agent_complete", {
                     "agent": "classroom",
@@ -342,6 +452,196 @@ Original Request: {request.prompt}
     )
 
 
+@app.get("/metrics")
+def get_metrics(reset: bool = False):
+    """Per-stage timers and counters (used by benchmarks/)."""
+    snapshot = metrics.snapshot()
+    if gemini_service.router is not None:
+        # EWMA latency / error rate the model router is working from
+        snapshot["llm_models"] = gemini_service.router.stats()
+    if reset:
+        metrics.reset()
+    return snapshot
+
+
+@app.post("/analytics/ingest")
+def ingest_form_responses(form_id: str = None):
+    """Pull new Forms responses into the results store and running aggregates."""
+    form_ids = [form_id] if form_id else quiz_store.quiz_ids()
+    return {"forms": forms_ingestion.poll_forms(form_ids)}
+
+
+# Minimum seconds between pushes per stream; bursts in between are coalesced
+ANALYTICS_STREAM_INTERVAL = float(os.getenv("ANALYTICS_STREAM_INTERVAL", "1.0"))
+ANALYTICS_STREAM_KEEPALIVE = 15.0
+
+
+@app.get("/analytics/stream")
+async def analytics_stream(quiz_id: str = None, class_name: str = None, interval: float = ANALYTICS_STREAM_INTERVAL):
+    """
+    Live analytics for one quiz or every quiz of a class via SSE.
+
+    Sends a "snapshot" event per quiz with its current analytics, then
+    "delta" events (changed statistics, per-question difficulty, topic
+    mastery, weak topics) whenever ingestion updates the quiz. Updates
+    arriving within `interval` seconds are coalesced into one event per quiz.
+    """
+    if not quiz_id and not class_name:
+        raise HTTPException(status_code=400, detail="quiz_id or class_name is required")
+    topic = f"quiz:{quiz_id}" if quiz_id else f"class:{class_name}"
+    quiz_ids = [quiz_id] if quiz_id else quiz_store.quiz_ids(class_name)
+    interval = max(0.1, interval)
+
+    def sse(event: str, data: dict):
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    async def event_generator():
+        # Subscribe before reading the baseline so no update falls in between
+        with analytics_hub.subscribe(topic) as subscription:
+            last = {}
+            for qid in quiz_ids:
+                aggregate = aggregate_store.load(qid)
+                if aggregate is None:
+                    continue
+                last[qid] = summarize_aggregate(aggregate, quiz_store.question_topics(qid))
+                yield sse("snapshot", {"quiz_id": qid, "analytics": last[qid]})
+
+            sent_at = 0.0
+            while True:
+                if not await subscription.wait(ANALYTICS_STREAM_KEEPALIVE):
+                    yield ": keepalive\n\n"
+                    continue
+                await asyncio.sleep(max(0.0, sent_at + interval - time.monotonic()))
+                for qid, analytics in subscription.drain().items():
+                    delta = analytics_delta(last.get(qid), analytics)
+                    last[qid] = analytics
+                    if delta:
+                        yield sse("delta", {"quiz_id": qid, "delta": delta})
+                sent_at = time.monotonic()
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
+    )
+
+
+@app.get("/analytics/trends")
+async def get_score_trends(
+    subject: str = None,
+    chapter: str = None,
+    class_name: str = None,
+    start: str = None,
+    end: str = None,
+    period: str = "month"
+):
+    """Score trend per class and period from stored quiz history."""
+    try:
+        return await offload.run(
+            score_trends, results_store, subject, chapter,
+            class_names=[class_name] if class_name else None,
+            start=start, end=end, period=period
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/analytics/cohorts")
+async def get_cohort_comparison(
+    subject: str = None,
+    chapter: str = None,
+    start: str = None,
+    end: str = None
+):
+    """Side-by-side class statistics and topic mastery from stored quiz history."""
+    question_topics = quiz_store.question_topics_many(quiz_store.quiz_ids())
+    try:
+        return await offload.run(
+            compare_cohorts, results_store, subject, chapter,
+            start=start, end=end, question_topics=question_topics
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OffloadRejected as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@app.post("/learning/class_plans")
+async def class_learning_plans(request: ClassPlanRequest):
+    """Personalized learning plans for every student of a class from their quiz history."""
+    question_topics = quiz_store.question_topics_many(quiz_store.quiz_ids())
+    try:
+        with metrics.timed("stage.class_plans"):
+            mastery = await offload.run(
+                student_topic_mastery, results_store, question_topics,
+                class_names=[request.class_name] if request.class_name else None
+            )
+            plans = await offload.run(
+                generate_class_plans, request.syllabus, mastery,
+                gemini_service=gemini_service, store=curriculum_store
+            )
+    except OffloadRejected as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"class_name": request.class_name, **plans}
+
+
+# Upper bound on forms created per variants request
+MAX_QUIZ_VARIANTS = 500
+
+
+@app.post("/quizzes/{quiz_id}/variants")
+async def create_quiz_variants(quiz_id: str, request: QuizVariantsRequest):
+    """Shuffled per-student variants of a stored quiz, each emitted as its own form."""
+    quiz = quiz_store.get_quiz(quiz_id)
+    if quiz is None:
+        raise HTTPException(status_code=404, detail=f"Unknown quiz {quiz_id}")
+    if not 1 <= request.count <= MAX_QUIZ_VARIANTS:
+        raise HTTPException(status_code=400, detail=f"count must be between 1 and {MAX_QUIZ_VARIANTS}")
+
+    variants = QuizVariants(quiz["questions"], request.count, seed=request.seed)
+    with metrics.timed("stage.quiz_variants"):
+        forms = await asyncio.to_thread(forms_service.create_quiz_variants, quiz["title"], variants)
+    for form in forms:
+        if form["status"] == "created":
+            # Stored like any quiz so analytics map each variant's questions to topics
+            quiz_store.save_quiz(
+                form["form_id"],
+                f"{quiz['title']} (Variant {form['variant'] + 1})",
+                variants.questions_for(form["variant"]),
+                key_topics=quiz["key_topics"],
+                subject=quiz["subject"],
+                chapter=quiz["chapter"],
+                class_name=quiz["class_name"]
+            )
+
+    result = {"quiz_id": quiz_id, "seed": request.seed, "variants": forms}
+    if request.student_ids:
+        assigned = variants.assign(request.student_ids)
+        result["assignments"] = {
+            student: {"variant": int(v), "form_url": forms[v]["form_url"]}
+            for student, v in zip(request.student_ids, assigned)
+        }
+    return result
+
+
+@app.post("/quizzes/{quiz_id}/grade")
+async def grade_quiz_answers(quiz_id: str, request: QuizGradeRequest):
+    """Grade submitted answers locally against a stored quiz's answer key."""
+    quiz = quiz_store.get_quiz(quiz_id)
+    if quiz is None:
+        raise HTTPException(status_code=404, detail=f"Unknown quiz {quiz_id}")
+    if request.student_ids is not None and len(request.student_ids) != len(request.answers):
+        raise HTTPException(status_code=400, detail="student_ids must have one entry per submission")
+    try:
+        with metrics.timed("stage.grade"):
+            graded = await offload.run(grade_quiz, quiz["questions"], request.answers, request.student_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OffloadRejected as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"quiz_id": quiz_id, **graded}
+
+
 @app.get("/")
 def root():
     """Health check endpoint"""
@@ -366,7 +666,8 @@ async def orchestrate(request: OrchestrateRequest):
     """
     try:
         # Step 1: Parse intent
-        intent = parse_intent(request.prompt)
+        with metrics.timed("stage.intent"):
+            intent = parse_intent(request.prompt)
         
         # Step 2: Route based on intent type
         if intent.intent_type == "quiz_creation":
@@ -390,6 +691,9 @@ async def orchestrate(request: OrchestrateRequest):
     except HTTPException:
         # Re-raise HTTPExceptions as-is (they're already formatted)
         raise
+    except OffloadRejected:
+        # Worker pools are saturated; shed load instead of queueing without bound
+        raise HTTPException(status_code=503, detail="Server is busy. Please try again shortly.")
     except Exception as e:
         # Filter out sensitive information like Request IDs from error messages
         error_msg = str(e)
@@ -425,15 +729,16 @@ async def handle_quiz_creation(request: OrchestrateRequest, intent: IntentOutput
     content = ""
     if intent.source == "google_classroom":
         course_id = "course_1"
-        content = classroom_service.get_course_materials(course_id)
+        content = await asyncio.to_thread(classroom_service.get_course_materials, course_id)
     elif intent.source == "google_docs":
         doc_id = "doc_1"
-        content = docs_service.get_document_content(doc_id)
+        content = await asyncio.to_thread(docs_service.get_document_content, doc_id)
     else:
         content = request.prompt
     
     # Step 2: Content Agent - Extract key topics
-    content_output = extract_content(subject, chapter, content, gemini_service)
+    with metrics.timed("stage.content"):
+        content_output = await offload.run(extract_content, subject, chapter, content, gemini_service)
     
     # Step 3: Quiz Agent - Generate quiz with enriched content
     enriched_content = f"""
@@ -445,19 +750,26 @@ Summary: {content_output.summary}
 Original Request: {request.prompt}
 """
     num_questions = intent.num_questions or 5
-    quiz_output = generate_quiz(enriched_content, num_questions, gemini_service)
+    with metrics.timed("stage.quiz"):
+        quiz_output = await offload.run(
+            generate_quiz, enriched_content, num_questions, gemini_service, content_output.key_topics,
+            bank=question_bank, subject=subject, chapter=chapter, class_name=f"{subject} Class"
+        )
     
     # Step 4: Forms Agent - Create Google Form
     form_title = f"{subject} {chapter} Quiz"
-    form_result = forms_service.create_quiz_form(form_title, quiz_output.questions)
+    with metrics.timed("stage.forms"):
+        form_result = await asyncio.to_thread(forms_service.create_quiz_form, form_title, quiz_output.questions)
+    save_quiz(form_result, form_title, subject, chapter, quiz_output, content_output)
     
     # Step 5: Classroom Agent - Assign to Classroom (Demo Mode)
-    delivery = assign_to_classroom(
-        quiz_title=form_title,
-        questions=[q.model_dump() for q in quiz_output.questions],
-        form_url=form_result.get("form_url"),
-        class_name=f"{subject} Class"
-    )
+    with metrics.timed("stage.classroom"):
+        delivery = assign_to_classroom(
+            quiz_title=form_title,
+            questions=[q.model_dump() for q in quiz_output.questions],
+            form_url=form_result.get("form_url"),
+            class_name=f"{subject} Class"
+        )
     
     # Return comprehensive response
     return OrchestrateResponse(
@@ -479,7 +791,10 @@ async def handle_learning_plan(request: OrchestrateRequest, intent: IntentOutput
     # Extract syllabus from source (simplified for MVP)
     syllabus = request.prompt  # Would fetch from source in real implementation
     
-    plan = generate_learning_plan(syllabus)
+    with metrics.timed("stage.learning_plan"):
+        plan = await offload.run(
+            generate_learning_plan, syllabus, gemini_service=gemini_service, store=curriculum_store
+        )
     
     return OrchestrateResponse(
         success=True,
@@ -493,9 +808,44 @@ async def handle_analytics(request: OrchestrateRequest, intent: IntentOutput):
     """Handle analytics on quiz results"""
     # Fetch results from Sheets
     spreadsheet_id = "sheet_1"  # Would extract from prompt
-    results = sheets_service.get_quiz_results(spreadsheet_id)
-    
-    analytics = analyze_quiz_results(results)
+    # Fold only the rows added since the last request into the stored running aggregate,
+    # archiving them in the results store for later trend queries
+    with metrics.timed("stage.analytics"):
+        # A Drive metadata call tells whether anything changed since the cached result
+        revision = await asyncio.to_thread(sheets_service.get_revision, spreadsheet_id)
+        analytics = analytics_cache.get(spreadsheet_id, revision) if revision is not None else None
+        if analytics is not None:
+            metrics.incr("analytics.cache.hit")
+            return OrchestrateResponse(
+                success=True,
+                message="Analytics generated successfully",
+                data=analytics,
+                intent=intent
+            )
+        metrics.incr("analytics.cache.miss")
+
+        aggregate = aggregate_store.load(spreadsheet_id) or QuizAggregate()
+        seen = aggregate.scores.count
+        quiz = quiz_store.get_quiz(spreadsheet_id) or {}
+        questions = quiz.get("questions") or []
+        start_row = aggregate.watermark or 2
+        batches = sheets_service.iter_result_batches(spreadsheet_id, start_row=start_row)
+        # Grade locally against the stored answer key when we generated this quiz
+        analytics = await offload.run(
+            analyze_quiz_batches,
+            results_store.archive(
+                batches, spreadsheet_id, start=start_row,
+                subject=quiz.get("subject"), chapter=quiz.get("chapter"), class_name=quiz.get("class_name")
+            ),
+            aggregate,
+            answer_key=AnswerKey.from_questions(questions) if questions else None,
+            question_topics=[q.get("topic") for q in questions] if questions else None
+        )
+        aggregate_store.save(spreadsheet_id, aggregate)
+        if aggregate.scores.count != seen and "error" not in analytics:
+            publish_analytics(spreadsheet_id, quiz, analytics)
+        if revision is not None and "error" not in analytics:
+            analytics_cache.put(spreadsheet_id, revision, analytics)
     
     return OrchestrateResponse(
         success=True,
@@ -505,6 +855,10 @@ async def handle_analytics(request: OrchestrateRequest, intent: IntentOutput):
     )
 
 
+# Days ahead whose calendar busy time is considered when scheduling (about a term)
+SCHEDULING_WINDOW_DAYS = int(os.getenv("SCHEDULING_WINDOW_DAYS", "120"))
+
+
 async def handle_scheduling(request: OrchestrateRequest, intent: IntentOutput):
     """Handle schedule optimization"""
     # Extract tasks and deadlines from prompt (simplified for MVP)
@@ -518,19 +872,32 @@ async def handle_scheduling(request: OrchestrateRequest, intent: IntentOutput):
         {"task_name": "Task 2", "due_date": None}
     ]
     
-    schedule = optimize_schedule(tasks, deadlines)
+    # Schedule around the teacher's existing events (one batched free/busy lookup, cached)
+    start = datetime.now().replace(second=0, microsecond=0)
+    with metrics.timed("stage.calendar_busy"):
+        busy = await asyncio.to_thread(
+            calendar_service.get_busy, start, start + timedelta(days=SCHEDULING_WINDOW_DAYS)
+        )
+
+    with metrics.timed("stage.scheduling"):
+        schedule = await offload.run(
+            optimize_schedule, tasks, deadlines,
+            start=start, busy=[{"start": s, "end": e} for s, e in busy]
+        )
     
     # Create calendar events if target is calendar
     if intent.target == "google_calendar":
-        events = calendar_service.create_schedule([
-            {
-                "title": task["task"],
-                "start_time": None,  # Would calculate from schedule
-                "end_time": None,
-                "description": f"Priority: {task['priority']}"
-            }
-            for task in schedule["schedule"]
-        ])
+        with metrics.timed("stage.calendar"):
+            events = await asyncio.to_thread(calendar_service.create_schedule, [
+                {
+                    "title": task["task"] if len(task["blocks"]) == 1 else f"{task['task']} ({i}/{len(task['blocks'])})",
+                    "start_time": block["start"],
+                    "end_time": block["end"],
+                    "description": f"Priority: {task['priority']}"
+                }
+                for task in schedule["schedule"]
+                for i, block in enumerate(task["blocks"], 1)
+            ])
         schedule["calendar_events"] = events
     
     return OrchestrateResponse(
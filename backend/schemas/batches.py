@@ -0,0 +1,52 @@
+"""
+Columnar batches of quiz results
+
+Readers (e.g. SheetsService.iter_result_batches) yield bounded ResultBatch
+objects so analytics can consume arbitrarily large response sheets with
+constant memory.
+"""
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class ResultBatch:
+    """A bounded slice of quiz responses stored column by column"""
+    students: List[str]
+    timestamps: List[str]
+    points: np.ndarray  # float64, earned points per row (NaN if unparsable)
+    max_points: np.ndarray  # float64, maximum points per row
+    answers: np.ndarray  # object, rows x questions raw answers ("" if blank)
+    question_columns: List[str] = field(default_factory=list)
+    start_row: int = 2  # Sheet row number of the first row in this batch
+    credit: Optional[np.ndarray] = None  # rows x questions graded credit, if graded by the reader
+    cursor: Any = None  # Reader position after this batch (next sheet row, Forms watermark, ...)
+
+    def __len__(self) -> int:
+        return len(self.students)
+
+    @property
+    def scores(self) -> np.ndarray:
+        """Percentage score per row (NaN where the score could not be parsed)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.max_points > 0, self.points * 100.0 / self.max_points, np.nan)
+
+    def valid(self) -> np.ndarray:
+        """Boolean mask of rows with a usable score."""
+        return ~np.isnan(self.scores)
+
+    def to_results(self) -> List[dict]:
+        """Row-oriented result dicts (the shape get_quiz_results returns)."""
+        scores = self.scores
+        return [
+            {
+                "student": self.students[i],
+                "score": round(float(scores[i]), 2),
+                "total": 100,
+                "points": float(self.points[i]),
+                "max_points": float(self.max_points[i])
+            }
+            for i in np.flatnonzero(~np.isnan(scores))
+        ]
@@ -1,7 +1,7 @@
 """
 Data models and schemas for EduSphere AI
 """
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict
 from pydantic import BaseModel
 
 
@@ -19,6 +19,9 @@ class QuizQuestion(BaseModel):
     question: str
     options: List[str]  # Should have 4 options (A, B, C, D)
     correct_answer: str  # One of the options
+    topic: Optional[str] = None  # Key topic (from ContentOutput.key_topics) this question tests
+    points: Optional[float] = None  # Grading weight (default 1)
+    partial_credit: Optional[Dict[str, float]] = None  # Option text -> credit (0..1) for near-miss options
 
 
 class QuizOutput(BaseModel):
@@ -38,3 +41,22 @@ class OrchestrateResponse(BaseModel):
     message: str
     data: Optional[dict] = None  # Agent-specific response data
     intent: Optional[IntentOutput] = None
+
+
+class ClassPlanRequest(BaseModel):
+    """Request to /learning/class_plans"""
+    syllabus: str
+    class_name: Optional[str] = None
+
+
+class QuizVariantsRequest(BaseModel):
+    """Request to /quizzes/{quiz_id}/variants"""
+    count: int
+    seed: int = 0
+    student_ids: Optional[List[str]] = None  # Students to assign a variant each
+
+
+class QuizGradeRequest(BaseModel):
+    """Request to /quizzes/{quiz_id}/grade"""
+    answers: List[List[Optional[str]]]  # Submissions x questions, option text or letter (null = unanswered)
+    student_ids: Optional[List[str]] = None
@@ -1,41 +1,64 @@
 """
-Google Calendar Service - MOCK VERSION
+Google Calendar Service
 
 This service handles Google Calendar API interactions.
-For MVP: Returns mocked calendar events.
-For Production: Replace with real Google Calendar API calls.
+Without credentials (and no GOOGLE_API_ENDPOINT override): returns mocked calendar events.
+With credentials: creates events through the Calendar REST API.
+
+Both directions are batched so scheduling a whole term costs a few round
+trips: get_busy() splits the window into fixed, aligned chunks, sends the
+uncached chunks' freeBusy queries in one batch request and keeps each
+chunk in a TTL cache; insert_events() sends events in batches of
+BATCH_SIZE and retries only the requests that failed with a retryable
+status, with exponential backoff.
 """
-from typing import List, Dict
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 
+from services.google_api import BATCH_SIZE, build_google_service, execute_batch, has_api_access
+from utils.cache import TTLCache
+from utils.metrics import metrics
+
+
+# freeBusy range per query; chunks are aligned so later windows reuse them
+FREEBUSY_CHUNK_DAYS = 28
+BUSY_TTL = float(os.getenv("CALENDAR_BUSY_TTL", "300"))
+
+_EPOCH = datetime(1970, 1, 1)
+
 
 class CalendarService:
     """Service for Google Calendar API interactions"""
-    
+
     def __init__(self, credentials: Dict = None):
         """
         Initialize Calendar service.
-        
+
         Args:
             credentials: OAuth2 credentials (for real API)
         """
         self.credentials = credentials
-        self.mock_mode = True  # MVP: Always mock
-    
+        self.mock_mode = not has_api_access(credentials)
+        self._busy_cache = TTLCache(maxsize=4096, default_ttl=BUSY_TTL)
+
     def create_schedule(self, events: List[Dict]) -> List[Dict]:
         """
         Create calendar events for a schedule.
-        
+
         Args:
             events: List of event dictionaries with:
                 - title: Event title
                 - start_time: Start datetime
                 - end_time: End datetime
                 - description: Event description
-                
+
         Returns:
             List of created event information
         """
+        if not self.mock_mode:
+            return self.insert_events(events)
+
         # MOCK: Return event info
         created_events = []
         for i, event in enumerate(events):
@@ -46,10 +69,172 @@ class CalendarService:
                 "end_time": event.get("end_time"),
                 "status": "created"
             })
-        
+
         return created_events
-        
-        # REAL API would:
-        # 1. Use Google Calendar API to create events
-        # 2. Set appropriate times and descriptions
-        # 3. Return event IDs and details
+
+    def get_busy(
+        self,
+        start: datetime,
+        end: datetime,
+        calendar_ids: Sequence[str] = ("primary",)
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Busy intervals of the calendars between start and end.
+
+        Args:
+            start: Window start (naive = local time)
+            end: Window end
+            calendar_ids: Calendars whose busy time is combined
+
+        Returns:
+            Sorted (start, end) naive local datetimes, clipped to the window
+            (empty in mock mode; chunks whose lookup failed count as free)
+        """
+        if self.mock_mode or end <= start:
+            return []
+        calendars = tuple(sorted(calendar_ids))
+        chunks = _aligned_chunks(_naive(start), _naive(end))
+
+        busy, missing = [], []
+        for chunk in chunks:
+            cached = self._busy_cache.get((calendars, chunk[0]))
+            if cached is None:
+                missing.append(chunk)
+            else:
+                busy.extend(cached)
+        metrics.incr("calendar.busy_chunks.cached", len(chunks) - len(missing))
+        if missing:
+            try:
+                fetched = self._query_free_busy(missing, calendars)
+            except Exception as e:
+                # Schedule around what is known rather than failing the request
+                print(f"Calendar free/busy lookup failed: {e}")
+                metrics.incr("calendar.busy_errors")
+                fetched = {}
+            for chunk, intervals in fetched.items():
+                self._busy_cache.set((calendars, chunk[0]), intervals)
+                busy.extend(intervals)
+
+        window_start, window_end = _naive(start), _naive(end)
+        return sorted(
+            (max(s, window_start), min(e, window_end))
+            for s, e in busy
+            if e > window_start and s < window_end
+        )
+
+    def insert_events(self, events: List[Dict], calendar_id: str = "primary") -> List[Dict]:
+        """
+        Insert events with batched requests (events without times are skipped).
+
+        Args:
+            events: Event dicts as accepted by create_schedule()
+            calendar_id: Target calendar
+
+        Returns:
+            One result per event, in input order, with status "created",
+            "unscheduled" or "failed"
+        """
+        service = build_google_service("calendar", "v3", self.credentials)
+        results: List[Optional[Dict]] = [None] * len(events)
+        bodies = {}
+        for i, event in enumerate(events):
+            start, end = event.get("start_time"), event.get("end_time")
+            if not start or not end:
+                results[i] = _event_result(event, None, "unscheduled")
+                continue
+            bodies[str(i)] = {
+                "summary": event.get("title", "Event"),
+                "description": event.get("description", ""),
+                "start": {"dateTime": _to_rfc3339(start)},
+                "end": {"dateTime": _to_rfc3339(end)}
+            }
+
+        ids = list(bodies)
+        for offset in range(0, len(ids), BATCH_SIZE):
+            chunk = ids[offset:offset + BATCH_SIZE]
+            responses = execute_batch(
+                service, "calendar", "v3",
+                {rid: service.events().insert(calendarId=calendar_id, body=bodies[rid]) for rid in chunk}
+            )
+            for rid in chunk:
+                response, error = responses[rid]
+                event = events[int(rid)]
+                if error is None:
+                    results[int(rid)] = _event_result(event, response.get("id"), "created")
+                else:
+                    results[int(rid)] = {**_event_result(event, None, "failed"), "error": str(error)}
+        if ids:
+            # New events change the calendar's busy time
+            self._busy_cache.clear()
+        metrics.incr("calendar.events_inserted", sum(1 for r in results if r["status"] == "created"))
+        return results
+
+    def _query_free_busy(
+        self,
+        chunks: List[Tuple[datetime, datetime]],
+        calendars: Tuple[str, ...]
+    ) -> Dict[Tuple[datetime, datetime], List[Tuple[datetime, datetime]]]:
+        """Run one freeBusy query per chunk, all in one batch request."""
+        service = build_google_service("calendar", "v3", self.credentials)
+        requests = {
+            str(i): service.freebusy().query(body={
+                "timeMin": _to_rfc3339(chunk_start),
+                "timeMax": _to_rfc3339(chunk_end),
+                "items": [{"id": cal} for cal in calendars]
+            })
+            for i, (chunk_start, chunk_end) in enumerate(chunks)
+        }
+        responses = execute_batch(service, "calendar", "v3", requests)
+
+        result = {}
+        for rid, (response, error) in responses.items():
+            if error is not None:
+                raise error
+            intervals = []
+            for calendar in response.get("calendars", {}).values():
+                intervals.extend(
+                    (_parse_time(b["start"]), _parse_time(b["end"]))
+                    for b in calendar.get("busy", [])
+                )
+            result[chunks[int(rid)]] = intervals
+        return result
+
+
+def _event_result(event: Dict, event_id: Optional[str], status: str) -> Dict:
+    return {
+        "event_id": event_id,
+        "title": event.get("title", "Event"),
+        "start_time": event.get("start_time"),
+        "end_time": event.get("end_time"),
+        "status": status
+    }
+
+
+def _aligned_chunks(start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+    """Fixed FREEBUSY_CHUNK_DAYS chunks (aligned to the epoch) covering [start, end)."""
+    size = timedelta(days=FREEBUSY_CHUNK_DAYS)
+    chunk_start = _EPOCH + ((start - _EPOCH) // size) * size
+    chunks = []
+    while chunk_start < end:
+        chunks.append((chunk_start, chunk_start + size))
+        chunk_start += size
+    return chunks
+
+
+def _naive(value: datetime) -> datetime:
+    """Aware datetimes -> naive local time; naive ones are already local."""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+
+def _parse_time(value: str) -> datetime:
+    return _naive(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def _to_rfc3339(value) -> str:
+    """Accept datetime or ISO string (naive = local time); return an RFC3339 string."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    return (value if value.tzinfo else value.astimezone()).isoformat()
@@ -0,0 +1,216 @@
+"""
+Record/replay cassettes for LLM and Google API traffic
+
+In record mode, every GeminiService backend call and every Google API HTTP
+exchange is written to a cassette together with its original latency. In
+replay mode those responses are served from the cassette (no network, no
+credentials), sleeping for the recorded time so workloads reproduce their
+production timing profile.
+
+Cassette format: gzip-compressed JSON lines, one exchange per line:
+
+    {"k": "<request hash>", "t": <seconds>, "r": <response payload>}
+
+Keys are a SHA-256 of the canonical request (kind, method, URL minus
+credentials, body). Batch (multipart/mixed) bodies are keyed without their
+random boundary, Content-ID prefixes and per-part Host/Authorization
+headers, so batched calls replay too. Repeated requests with the same
+key are replayed in recorded order, cycling when exhausted.
+
+Environment:
+    CASSETTE_MODE   "record" | "replay" (unset = off)
+    CASSETTE_PATH   cassette file (default cassettes/session.jsonl.gz)
+    CASSETTE_SPEED  replay time factor (1.0 = original timing, 0 = no delay)
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+from utils.metrics import metrics
+
+
+DEFAULT_CASSETTE_PATH = os.path.join("cassettes", "session.jsonl.gz")
+
+# Query parameters that carry credentials and must not affect the key
+_SECRET_PARAMS = {"key", "access_token", "oauth_token"}
+# googleapiclient batch parts carry "Content-ID: <random-base + request-id>"
+_CONTENT_ID_RE = re.compile(r"^(content-id:\s*<)[^>]*?\+\s*", re.IGNORECASE | re.MULTILINE)
+# Per-part headers that vary with the endpoint or token, not the request
+_PART_HEADER_RE = re.compile(r"^(host|authorization):[^\n]*\n", re.IGNORECASE | re.MULTILINE)
+
+
+class CassetteMiss(Exception):
+    """Replay mode found no recording for a request."""
+
+
+def _canonical_multipart(body: str) -> str:
+    """A multipart (batch) body without its random boundary, Content-ID bases and per-part Host/Authorization."""
+    first_line = body.lstrip("\r\n").split("\n", 1)[0].strip()
+    if not first_line.startswith("--") or len(first_line) < 3:
+        return body
+    body = _CONTENT_ID_RE.sub(r"\1", body.replace(first_line[2:], "boundary"))
+    return _PART_HEADER_RE.sub("", body)
+
+
+def request_key(kind: str, method: str, target: str, body: Any = None) -> str:
+    """Hash of the canonical form of a request."""
+    if kind == "http":
+        parts = urllib.parse.urlsplit(target)
+        query = sorted(
+            (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+            if k not in _SECRET_PARAMS
+        )
+        target = f"{parts.path}?{urllib.parse.urlencode(query)}"
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            body = _canonical_multipart(body)
+    canonical = json.dumps([kind, method.upper(), target, body], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+class Cassette:
+    """A recorded set of request/response exchanges."""
+
+    def __init__(self, path: str, mode: str, speed: float = 1.0):
+        """
+        Open a cassette.
+
+        Args:
+            path: Cassette file path
+            mode: "record" (append new exchanges) or "replay"
+            speed: Replay time factor (0 disables sleeping)
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict]] = {}
+        self._cursor: Dict[str, int] = {}
+        if mode == "replay":
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["k"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+    def record(self, key: str, elapsed: float, response: Any) -> None:
+        """Append one exchange (gzip members are appended, so the file stays valid)."""
+        line = json.dumps({"k": key, "t": round(elapsed, 6), "r": response}, separators=(",", ":"))
+        with self._lock:
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line + "\n")
+        metrics.incr("cassette.recorded")
+
+    def lookup(self, key: str) -> Dict:
+        """Return the next recorded exchange for key (cycling) or raise CassetteMiss."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                metrics.incr("cassette.misses")
+                raise CassetteMiss(f"No cassette entry for request {key}")
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+        metrics.incr("cassette.hits")
+        return entries[index % len(entries)]
+
+    def wait(self, seconds: float) -> None:
+        """Sleep for a recorded duration, scaled by speed."""
+        if self.speed > 0 and seconds > 0:
+            time.sleep(seconds * self.speed)
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the process-wide cassette configured by CASSETTE_MODE, if any."""
+    global _cassette
+    mode = (os.getenv("CASSETTE_MODE") or "").lower()
+    if mode not in ("record", "replay"):
+        return None
+    with _cassette_lock:
+        if _cassette is None or _cassette.mode != mode:
+            _cassette = Cassette(
+                os.getenv("CASSETTE_PATH") or DEFAULT_CASSETTE_PATH,
+                mode,
+                float(os.getenv("CASSETTE_SPEED", "1.0")),
+            )
+        return _cassette
+
+
+def is_replaying() -> bool:
+    """True when Google/LLM traffic is served from a cassette."""
+    cassette = get_cassette()
+    return cassette is not None and cassette.mode == "replay"
+
+
+class CassetteHttp:
+    """
+    httplib2.Http-compatible wrapper that records or replays exchanges.
+
+    Passed as `http` to googleapiclient's build(); in replay mode no inner
+    transport is needed.
+    """
+
+    def __init__(self, cassette: Cassette, inner: Any = None):
+        self.cassette = cassette
+        self.inner = inner
+        # googleapiclient reads these attributes from its http object
+        self.timeout = getattr(inner, "timeout", None)
+        self.credentials = getattr(inner, "credentials", None)
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        import httplib2
+
+        key = request_key("http", method, uri, body)
+        if self.cassette.mode == "replay":
+            entry = self.cassette.lookup(key)
+            self.cassette.wait(entry["t"])
+            r = entry["r"]
+            content = base64.b64decode(r["b64"]) if "b64" in r else r["body"].encode("utf-8")
+            return httplib2.Response({"status": str(r["status"]), **r["headers"]}), content
+
+        start = time.perf_counter()
+        resp, content = self.inner.request(
+            uri, method=method, body=body, headers=headers,
+            redirections=redirections, connection_type=connection_type
+        )
+        elapsed = time.perf_counter() - start
+        payload: Dict[str, Any] = {
+            "status": resp.status,
+            "headers": {k: v for k, v in resp.items() if k.lower() in ("content-type",)},
+        }
+        try:
+            payload["body"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            payload["b64"] = base64.b64encode(content).decode("ascii")
+        self.cassette.record(key, elapsed, payload)
+        return resp, content
+
+    def close(self):
+        if self.inner is not None and hasattr(self.inner, "close"):
+            self.inner.close()
@@ -1,12 +1,14 @@
 """
-Google Classroom Service - MOCK VERSION
+Google Classroom Service
 
 This service handles Google Classroom API interactions.
-For MVP: Returns mocked data.
-For Production: Replace with real Google Classroom API calls.
+Without credentials (and no GOOGLE_API_ENDPOINT override): returns mocked data.
+With credentials: calls the Classroom REST API.
 """
 from typing import List, Dict, Optional
 
+from services.google_api import build_google_service, has_api_access
+
 
 class ClassroomService:
     """Service for Google Classroom API interactions"""
@@ -19,7 +21,10 @@ class ClassroomService:
             credentials: OAuth2 credentials (for real API)
         """
         self.credentials = credentials
-        self.mock_mode = True  # MVP: Always mock
+        self.mock_mode = not has_api_access(credentials)
+    
+    def _service(self):
+        return build_google_service("classroom", "v1", self.credentials)
     
     def get_course_materials(self, course_id: str, topic: Optional[str] = None) -> str:
         """
@@ -32,6 +37,15 @@ class ClassroomService:
         Returns:
             Combined text content from course materials
         """
+        if not self.mock_mode:
+            response = self._service().courses().courseWorkMaterials().list(courseId=course_id).execute()
+            materials = response.get("courseWorkMaterial", [])
+            if topic:
+                materials = [m for m in materials if topic.lower() in m.get("title", "").lower()] or materials
+            return "\n\n".join(
+                f"# {m.get('title', '')}\n\n{m.get('description', '')}" for m in materials
+            )
+        
         # MOCK: Return sample educational content
         if topic:
             return f"""
@@ -90,6 +104,23 @@ These concepts form the foundation for further learning.
         Returns:
             Assignment information
         """
+        if not self.mock_mode:
+            coursework = {
+                "title": title,
+                "materials": [{"link": {"url": form_url}}],
+                "workType": "ASSIGNMENT",
+                "state": "PUBLISHED"
+            }
+            created = self._service().courses().courseWork().create(courseId=course_id, body=coursework).execute()
+            return {
+                "assignment_id": created.get("id"),
+                "course_id": course_id,
+                "form_url": form_url,
+                "title": title,
+                "status": "created",
+                "classroom_url": created.get("alternateLink")
+            }
+        
         # MOCK: Return assignment info
         return {
             "assignment_id": f"mock_assignment_{course_id}",
@@ -101,6 +132,10 @@ These concepts form the foundation for further learning.
     
     def list_courses(self) -> List[Dict]:
         """List available courses"""
+        if not self.mock_mode:
+            response = self._service().courses().list().execute()
+            return [{"id": c["id"], "name": c.get("name", "")} for c in response.get("courses", [])]
+        
         # MOCK: Return sample courses
         return [
             {"id": "course_1", "name": "Physics 101"},
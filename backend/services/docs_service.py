@@ -1,12 +1,14 @@
 """
-Google Docs Service - MOCK VERSION
+Google Docs Service
 
 This service handles Google Docs API interactions.
-For MVP: Returns mocked document content.
-For Production: Replace with real Google Docs API calls.
+Without credentials (and no GOOGLE_API_ENDPOINT override): returns mocked document content.
+With credentials: fetches the document through the Docs REST API.
 """
 from typing import Optional
 
+from services.google_api import build_google_service, has_api_access
+
 
 class DocsService:
     """Service for Google Docs API interactions"""
@@ -19,7 +21,7 @@ class DocsService:
             credentials: OAuth2 credentials (for real API)
         """
         self.credentials = credentials
-        self.mock_mode = True  # MVP: Always mock
+        self.mock_mode = not has_api_access(credentials)
     
     def get_document_content(self, document_id: str) -> str:
         """
@@ -31,6 +33,11 @@ class DocsService:
         Returns:
             Document text content
         """
+        if not self.mock_mode:
+            service = build_google_service("docs", "v1", self.credentials)
+            document = service.documents().get(documentId=document_id).execute()
+            return _extract_text(document)
+        
         # MOCK: Return sample document content
         return """
 # Sample Document Content
@@ -57,8 +64,12 @@ Real-world applications demonstrate these principles in action.
 
 These concepts form the foundation for advanced learning.
 """
-        
-        # REAL API would:
-        # 1. Use Google Docs API to fetch document
-        # 2. Extract text content
-        # 3. Return formatted text
+
+
+def _extract_text(document: dict) -> str:
+    """Concatenate the text runs of a Docs API document body."""
+    parts = []
+    for block in document.get("body", {}).get("content", []):
+        for element in block.get("paragraph", {}).get("elements", []):
+            parts.append(element.get("textRun", {}).get("content", ""))
+    return "".join(parts)
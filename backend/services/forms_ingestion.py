@@ -0,0 +1,245 @@
+"""
+Forms Ingestion - incremental pull of Google Forms responses into analytics
+
+Each poll of a form fetches only responses submitted since the form's
+watermark (last lastSubmittedTime seen, plus the response IDs at exactly
+that time so the inclusive ">=" filter never double counts), follows
+nextPageToken pagination, grades the new responses against the stored
+answer key, appends them to the results store and folds them into the
+form's running aggregate. The watermark lives inside the aggregate, so
+both are persisted together.
+
+Many forms are polled concurrently on a thread pool; every API call takes
+a token from one shared RateLimiter so the pool stays inside the quota.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from agents.analytics_agent import analyze_quiz_batches
+from engines.analytics_engine import QuizAggregate
+from engines.grading_engine import AnswerKey, encode_submissions, grade_submissions
+from schemas.batches import ResultBatch
+from services.forms_service import FormsService, RESPONSE_PAGE_SIZE
+from storage.aggregate_store import AggregateStore
+from storage.quiz_store import QuizStore
+from storage.results_store import ResultsStore
+from utils.metrics import metrics
+from utils.rate_limit import RateLimiter
+
+
+# Forms API read quota per user per minute
+DEFAULT_READS_PER_MINUTE = float(os.getenv("FORMS_READS_PER_MINUTE", "390"))
+DEFAULT_WORKERS = int(os.getenv("FORMS_INGEST_WORKERS", "8"))
+
+
+class FormsIngestion:
+    """Incremental, rate-limited ingestion of form responses."""
+
+    def __init__(
+        self,
+        forms_service: FormsService,
+        quiz_store: QuizStore,
+        aggregate_store: AggregateStore,
+        results_store: ResultsStore,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_workers: int = DEFAULT_WORKERS,
+        page_size: int = RESPONSE_PAGE_SIZE,
+        on_update: Optional[Callable[[str, Dict, Dict], None]] = None
+    ):
+        """
+        Args:
+            forms_service: Forms API access
+            quiz_store: Source of answer keys, topics, subject and chapter
+            aggregate_store: Running aggregates (and watermarks) per form
+            results_store: Columnar response history
+            rate_limiter: Shared limiter for all Forms API calls
+                (default: FORMS_READS_PER_MINUTE)
+            max_workers: Forms polled concurrently
+            page_size: Responses per responses.list page
+            on_update: Called as on_update(form_id, quiz, analytics) after
+                new responses were folded into a form's aggregate
+        """
+        self.forms_service = forms_service
+        self.quiz_store = quiz_store
+        self.aggregate_store = aggregate_store
+        self.results_store = results_store
+        self.rate_limiter = rate_limiter or RateLimiter.per_minute(DEFAULT_READS_PER_MINUTE, burst=10)
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.on_update = on_update
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _form_lock(self, form_id: str) -> threading.Lock:
+        """One poll per form at a time, so a watermark is never read twice."""
+        with self._locks_guard:
+            return self._locks.setdefault(form_id, threading.Lock())
+
+    def poll_form(self, form_id: str) -> Dict:
+        """
+        Ingest the responses a form received since its watermark.
+
+        Returns:
+            {"form_id", "ingested", "total_responses", "watermark"[, "analytics"]}
+        """
+        with self._form_lock(form_id), metrics.timed("ingest.form"):
+            if self.forms_service._is_ready and not self.forms_service.can_read_responses:
+                return {"form_id": form_id, "ingested": 0, "skipped": "Forms token lacks the responses scope; re-authorize at /auth/google"}
+            form = self.forms_service.get_form(form_id, self.rate_limiter)
+            if form is None:
+                return {"form_id": form_id, "ingested": 0, "skipped": "Forms API not authorized"}
+
+            aggregate = self.aggregate_store.load(form_id) or QuizAggregate()
+            watermark = aggregate.watermark if isinstance(aggregate.watermark, dict) else {}
+            cursor = _Watermark(watermark.get("timestamp"), watermark.get("ids", []))
+
+            question_ids = _question_ids(form)
+            quiz = self.quiz_store.get_quiz(form_id) or {}
+            questions = quiz.get("questions") or []
+            key = AnswerKey.from_questions(questions) if questions and len(questions) == len(question_ids) else None
+            max_points = _form_max_points(form)
+
+            ingested = [0]
+
+            def batches():
+                pages = self.forms_service.iter_response_pages(
+                    form_id, since=cursor.timestamp, page_size=self.page_size, rate_limiter=self.rate_limiter
+                )
+                for page in pages:
+                    batch = _to_batch(page, question_ids, key, max_points, cursor)
+                    if batch is not None:
+                        ingested[0] += len(batch)
+                        yield batch
+
+            analytics = analyze_quiz_batches(
+                self.results_store.archive(
+                    batches(), form_id, start=cursor.to_dict(),
+                    subject=quiz.get("subject"), chapter=quiz.get("chapter"), class_name=quiz.get("class_name")
+                ),
+                aggregate,
+                question_topics=[q.get("topic") for q in questions] if key is not None else None
+            )
+            if ingested[0]:
+                self.aggregate_store.save(form_id, aggregate)
+                metrics.incr("ingest.responses", ingested[0])
+                if self.on_update and "error" not in analytics:
+                    self.on_update(form_id, quiz, analytics)
+
+            result = {
+                "form_id": form_id,
+                "ingested": ingested[0],
+                "total_responses": aggregate.scores.count,
+                "watermark": cursor.timestamp
+            }
+            if "error" not in analytics:
+                result["analytics"] = analytics
+            return result
+
+    def poll_forms(self, form_ids: Sequence[str]) -> List[Dict]:
+        """
+        Poll many forms concurrently under the shared rate limit.
+
+        A failing form is reported with an "error" entry and does not stop
+        the others.
+        """
+        def poll(form_id: str) -> Dict:
+            try:
+                return self.poll_form(form_id)
+            except Exception as e:
+                metrics.incr("ingest.errors")
+                return {"form_id": form_id, "ingested": 0, "error": str(e)}
+
+        if not form_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(form_ids))) as pool:
+            return list(pool.map(poll, form_ids))
+
+
+class _Watermark:
+    """Latest lastSubmittedTime seen and the response IDs submitted at exactly that time."""
+
+    def __init__(self, timestamp: Optional[str], ids: Sequence[str]):
+        self.timestamp = timestamp
+        self.ids = set(ids)
+
+    def is_new(self, response: Dict) -> bool:
+        return not (response.get("lastSubmittedTime") == self.timestamp and response.get("responseId") in self.ids)
+
+    def advance(self, response: Dict) -> None:
+        ts = response.get("lastSubmittedTime")
+        if ts is None:
+            return
+        # RFC3339 UTC timestamps from the API compare correctly as strings
+        if self.timestamp is None or ts > self.timestamp:
+            self.timestamp = ts
+            self.ids = {response.get("responseId")}
+        elif ts == self.timestamp:
+            self.ids.add(response.get("responseId"))
+
+    def to_dict(self) -> Dict:
+        return {"timestamp": self.timestamp, "ids": sorted(self.ids)}
+
+
+def _question_ids(form: Dict) -> List[str]:
+    """Question IDs of the form's question items, in form order."""
+    return [
+        item["questionItem"]["question"]["questionId"]
+        for item in form.get("items", [])
+        if "questionItem" in item
+    ]
+
+
+def _form_max_points(form: Dict) -> float:
+    """Total points of a Forms quiz (NaN if the form is not graded by Forms)."""
+    total = sum(
+        item["questionItem"]["question"].get("grading", {}).get("pointValue", 0)
+        for item in form.get("items", [])
+        if "questionItem" in item
+    )
+    return float(total) if total else np.nan
+
+
+def _to_batch(
+    page: List[Dict],
+    question_ids: List[str],
+    key: Optional[AnswerKey],
+    max_points: float,
+    cursor: _Watermark
+) -> Optional[ResultBatch]:
+    """Convert a page of FormResponses into a graded ResultBatch and advance the watermark."""
+    rows = [r for r in page if cursor.is_new(r)]
+    if not rows:
+        return None
+    column = {qid: j for j, qid in enumerate(question_ids)}
+    answers = np.full((len(rows), len(question_ids)), "", dtype=object)
+    for i, response in enumerate(rows):
+        for qid, answer in response.get("answers", {}).items():
+            j = column.get(qid)
+            values = answer.get("textAnswers", {}).get("answers", [])
+            if j is not None and values:
+                answers[i, j] = values[0].get("value", "")
+        cursor.advance(response)
+
+    credit = None
+    if key is not None:
+        graded = grade_submissions(key, encode_submissions(key, answers))
+        points, maximum, credit = graded["points"], np.full(len(rows), graded["max_points"]), graded["matrix"].credit
+    else:
+        # Fall back to the score Forms computed, if the form is a graded quiz
+        points = np.array([r.get("totalScore", np.nan) for r in rows], dtype=np.float64)
+        maximum = np.full(len(rows), max_points)
+
+    return ResultBatch(
+        students=[r.get("respondentEmail") or r.get("responseId", "") for r in rows],
+        timestamps=[r.get("lastSubmittedTime", "") for r in rows],
+        points=points,
+        max_points=maximum,
+        answers=answers,
+        question_columns=[f"Q{j + 1}" for j in range(len(question_ids))],
+        credit=credit,
+        cursor=cursor.to_dict()
+    )
@@ -12,21 +12,43 @@ Behavior:
 """
 
 import os
-from typing import List, Dict, Optional, Any
+from typing import Iterator, List, Dict, Optional, Any
 
+from engines.variant_engine import QuizVariants
+from services.cassette import is_replaying
+from services.google_api import BATCH_SIZE, api_endpoint_override, build_google_service, execute_batch
+from utils.rate_limit import RateLimiter
 
-SCOPES = ["https://www.googleapis.com/auth/forms.body"]
+
+RESPONSES_SCOPE = "https://www.googleapis.com/auth/forms.responses.readonly"
+SCOPES = [
+    "https://www.googleapis.com/auth/forms.body",
+    RESPONSES_SCOPE,
+]
+
+# Forms API maximum page size for responses.list
+RESPONSE_PAGE_SIZE = 5000
+# googleapiclient retries 429 / 5xx with exponential backoff
+NUM_RETRIES = 3
 
 
 class FormsService:
     def __init__(self):
         self.creds = None
+        # Scopes in SCOPES that token.json was not granted (older tokens)
+        self.missing_scopes: List[str] = []
         self._auth_url: Optional[str] = None
         self._is_ready = False
         self._try_load_token()
 
     def _try_load_token(self) -> None:
         """Load token.json if available. Never prompts."""
+        if api_endpoint_override() or is_replaying():
+            # Talking to a local stand-in (e.g. fakes/workspace_server.py) or
+            # replaying a cassette: no token needed
+            self._is_ready = True
+            return
+
         try:
             from google.oauth2.credentials import Credentials
         except Exception:
@@ -37,11 +59,25 @@ class FormsService:
 
         if os.path.exists("token.json"):
             try:
-                self.creds = Credentials.from_authorized_user_file("token.json", SCOPES)
+                # Keep the scopes the token was granted so missing ones show up
+                self.creds = Credentials.from_authorized_user_file("token.json")
                 self._is_ready = True
             except Exception:
                 self.creds = None
                 self._is_ready = False
+                return
+            if self.creds.scopes is not None:
+                self.missing_scopes = [scope for scope in SCOPES if not self.creds.has_scopes([scope])]
+            if self.missing_scopes:
+                print(
+                    f"Warning: token.json was not granted {', '.join(self.missing_scopes)}. "
+                    "Visit /auth/google to re-authorize (response ingestion is disabled until then)."
+                )
+
+    @property
+    def can_read_responses(self) -> bool:
+        """True if responses.list is authorized (or served by a stand-in)."""
+        return self._is_ready and RESPONSES_SCOPE not in self.missing_scopes
 
     def get_authorization_url(self) -> Optional[str]:
         """Return an authorization URL (no prompting), if we can construct one."""
@@ -107,7 +143,7 @@ class FormsService:
         """Create a Google Form if authorized; otherwise return a safe mock response."""
 
         # If not ready, do NOT block. Provide auth URL and return mock.
-        if not self._is_ready or self.creds is None:
+        if not self._is_ready:
             auth_url = self.get_authorization_url()
             return {
                 "form_id": "mock_form_id",
@@ -118,20 +154,7 @@ class FormsService:
             }
 
         # Authorized: attempt real create
-        try:
-            from googleapiclient.discovery import build
-        except Exception:
-            # Google API client not available -> fall back
-            auth_url = self.get_authorization_url()
-            return {
-                "form_id": "mock_form_id",
-                "form_url": "https://docs.google.com/forms/d/mock_form_id/viewform",
-                "auth_required": True,
-                "auth_url": auth_url,
-                "note": "google-api-python-client not available. Install it to create real Forms.",
-            }
-
-        service = build("forms", "v1", credentials=self.creds)
+        service = build_google_service("forms", "v1", self.creds)
 
         # Google Forms API requires info.title structure
         new_form = {
@@ -147,35 +170,7 @@ class FormsService:
         print(f"[FormsService] Adding {len(questions)} questions...")
 
         # Add questions using batchUpdate
-        requests = []
-        for idx, q in enumerate(questions):
-            question_text = q.get("question", "Question")
-            options = q.get("options", [])
-            
-            print(f"[FormsService] Question {idx + 1}: {question_text[:50]}... with {len(options)} options")
-            
-            if not options:
-                print(f"[FormsService] WARNING: Question {idx + 1} has no options!")
-                continue
-                
-            requests.append({
-                "createItem": {
-                    "item": {
-                        "title": question_text,
-                        "questionItem": {
-                            "question": {
-                                "required": True,
-                                "choiceQuestion": {
-                                    "type": "RADIO",
-                                    "options": [{"value": str(opt)} for opt in options],
-                                    "shuffle": False,
-                                },
-                            }
-                        },
-                    },
-                    "location": {"index": idx},
-                }
-            })
+        requests = _question_requests(questions)
         
         if requests:
             print(f"[FormsService] Sending batchUpdate with {len(requests)} requests...")
@@ -197,3 +192,128 @@ class FormsService:
             "auth_required": False,
             "questions_added": len(requests),
         }
+
+    def create_quiz_variants(self, title: str, variants: QuizVariants) -> List[Dict]:
+        """
+        Create one form per quiz variant with batched requests.
+
+        All forms are created in one batch request per BATCH_SIZE variants,
+        then filled with another, instead of two calls per form.
+
+        Returns:
+            One result per variant, in variant order, with "variant",
+            "form_id", "form_url", "questions_added" and "status"
+            ("created", "failed" or "mock")
+        """
+        titles = [f"{title} (Variant {v + 1})" for v in range(variants.count)]
+        if not self._is_ready:
+            return [
+                {"variant": v, "form_id": None, "form_url": None, "questions_added": 0, "status": "mock"}
+                for v in range(variants.count)
+            ]
+
+        service = build_google_service("forms", "v1", self.creds)
+        results: List[Dict] = []
+        for offset in range(0, variants.count, BATCH_SIZE):
+            chunk = range(offset, min(offset + BATCH_SIZE, variants.count))
+            created = execute_batch(service, "forms", "v1", {
+                str(v): service.forms().create(body={"info": {"title": titles[v], "documentTitle": titles[v]}})
+                for v in chunk
+            })
+            requests = {str(v): _question_requests(variants.questions_for(v)) for v in chunk}
+            form_ids = {rid: response["formId"] for rid, (response, error) in created.items() if error is None}
+            filled = execute_batch(service, "forms", "v1", {
+                rid: service.forms().batchUpdate(formId=form_id, body={"requests": requests[rid]})
+                for rid, form_id in form_ids.items()
+            }) if form_ids else {}
+
+            for v in chunk:
+                rid = str(v)
+                form_id = form_ids.get(rid)
+                error = created[rid][1] if form_id is None else filled[rid][1]
+                results.append({
+                    "variant": v,
+                    "form_id": form_id,
+                    "form_url": f"https://docs.google.com/forms/d/{form_id}/viewform" if form_id else None,
+                    "questions_added": len(requests[rid]) if error is None else 0,
+                    "status": "created" if error is None else "failed",
+                    **({"error": str(error)} if error is not None else {}),
+                })
+        print(f"[FormsService] Created {sum(r['status'] == 'created' for r in results)}/{variants.count} variant forms")
+        return results
+
+    def get_form(self, form_id: str, rate_limiter: Optional[RateLimiter] = None) -> Optional[Dict]:
+        """Fetch a form's structure (items, question IDs); None when not authorized."""
+        if not self._is_ready:
+            return None
+        if rate_limiter:
+            rate_limiter.acquire()
+        service = build_google_service("forms", "v1", self.creds)
+        return service.forms().get(formId=form_id).execute(num_retries=NUM_RETRIES)
+
+    def iter_response_pages(
+        self,
+        form_id: str,
+        since: Optional[str] = None,
+        page_size: int = RESPONSE_PAGE_SIZE,
+        rate_limiter: Optional[RateLimiter] = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Yield pages of form responses, following nextPageToken.
+
+        Args:
+            form_id: Form ID
+            since: Only responses submitted at or after this RFC3339 timestamp
+            page_size: Responses per page (max 5000)
+            rate_limiter: Optional shared limiter; one token per API call
+
+        Yields:
+            Lists of raw FormResponse dicts
+        """
+        if not self.can_read_responses:
+            return
+        service = build_google_service("forms", "v1", self.creds)
+        params: Dict[str, Any] = {"formId": form_id, "pageSize": page_size}
+        if since:
+            params["filter"] = f"timestamp >= {since}"
+        while True:
+            if rate_limiter:
+                rate_limiter.acquire()
+            response = service.forms().responses().list(**params).execute(num_retries=NUM_RETRIES)
+            page = response.get("responses", [])
+            if page:
+                yield page
+            token = response.get("nextPageToken")
+            if not token:
+                return
+            params["pageToken"] = token
+
+
+def _question_requests(questions: List[Dict[str, Any]]) -> List[Dict]:
+    """batchUpdate createItem requests for choice questions (questions without options are skipped)."""
+    requests = []
+    for idx, q in enumerate(questions):
+        question_text = q.get("question", "Question")
+        options = q.get("options", [])
+        if not options:
+            print(f"[FormsService] WARNING: Question {idx + 1} has no options!")
+            continue
+        requests.append({
+            "createItem": {
+                "item": {
+                    "title": question_text,
+                    "questionItem": {
+                        "question": {
+                            "required": True,
+                            "choiceQuestion": {
+                                "type": "RADIO",
+                                "options": [{"value": str(opt)} for opt in options],
+                                "shuffle": False,
+                            },
+                        }
+                    },
+                },
+                "location": {"index": len(requests)},
+            }
+        })
+    return requests
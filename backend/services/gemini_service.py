@@ -5,7 +5,13 @@ This service wraps Google Gemini API calls.
 Used by agents for content generation (NOT for Google Workspace API calls).
 """
 import os
-from typing import Optional
+import time
+from typing import List, Optional
+
+from services.llm_backends import LLMBackend, GenAIBackend, backend_from_env, with_cassette
+from services.model_router import ModelRouter
+from services.prompts import QUIZ_QUESTIONS, TOKENS_PER_QUESTION, estimate_tokens, expected_output_tokens
+from utils.metrics import metrics
 
 # Try to load dotenv if available
 try:
@@ -20,21 +26,46 @@ except ImportError:
     genai = None  # Will use mock mode if not installed
 
 
+def _record_tokens(stage: Optional[str], prompt: str, response: Optional[str]) -> None:
+    """Count estimated prompt and response tokens, in total and per stage."""
+    prompt_tokens, response_tokens = estimate_tokens(prompt), estimate_tokens(response or "")
+    for prefix in ("llm", f"llm.{stage}") if stage else ("llm",):
+        metrics.incr(f"{prefix}.prompt_tokens", prompt_tokens)
+        metrics.incr(f"{prefix}.response_tokens", response_tokens)
+
+
 class GeminiService:
     """Service for interacting with Google Gemini API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, backend: Optional[LLMBackend] = None):
         """
         Initialize Gemini service.
         
         For MVP: Can use mock mode if API key not provided
+        
+        Args:
+            api_key: Gemini API key (defaults to GEMINI_API_KEY)
+            backend: Explicit LLM backend (defaults to LLM_BACKEND env selection,
+                then Gemini via google-generativeai)
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         self.model = None
-        self._initialized = False
+        self.backend = backend or backend_from_env()
+        # A custom backend is always used as-is; only Gemini is (re)initialized lazily
+        self._custom_backend = self.backend is not None
+        self._initialized = self._custom_backend
+        self.mock_mode = not self._custom_backend
+        # Per-call model choice (services/model_router.py); LLM_BACKEND backends
+        # only get model names with LLM_ROUTING=on
+        routing = (os.getenv("LLM_ROUTING") or "auto").lower()
+        self.router = ModelRouter.from_env() if routing != "off" else None
+        self._route_custom_backend = routing == "on"
         
         # Try to initialize, but don't fail hard - we can retry later
-        self._try_initialize()
+        if not self._custom_backend:
+            self._try_initialize()
+        else:
+            print(f"LLM backend: {self.backend.name}")
     
     def _try_initialize(self) -> bool:
         """
@@ -48,9 +79,10 @@ class GeminiService:
             return False
         
         try:
-            genai.configure(api_key=self.api_key)
             # Use gemini-2.0-flash (latest model)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
+            gemini = GenAIBackend(self.api_key, "gemini-2.0-flash")
+            self.model = gemini.model
+            self.backend = with_cassette(gemini)
             self.mock_mode = False
             self._initialized = True
             print("Gemini API initialized successfully with gemini-2.0-flash.")
@@ -63,135 +95,115 @@ class GeminiService:
             else:
                 print(f"Warning: Gemini initialization failed: {error_msg}")
             self.mock_mode = True
+            self.backend = None
             self.model = None
             self._initialized = False
             return False
     
-    def generate_content(self, prompt: str) -> str:
+    def _ensure_backend(self) -> bool:
+        """Return True if a backend is ready, trying to (re)initialize Gemini if needed."""
+        if self._initialized and self.backend is not None:
+            return True
+        if self.api_key and genai:
+            return self._try_initialize()
+        return False
+    
+    def _handle_backend_error(self, error: Exception) -> None:
+        """Drop a broken Gemini connection so the next call re-initializes."""
+        error_msg = str(error)
+        if self._custom_backend:
+            return
+        if "Request ID" in error_msg or "connection" in error_msg.lower() or "network" in error_msg.lower():
+            self._initialized = False
+            self.backend = None
+            self.model = None
+    
+    def _route(self, prompt: str, output_tokens: int) -> Optional[str]:
+        """Model for a call, or None for the backend's default model."""
+        if self.router is None or (self._custom_backend and not self._route_custom_backend):
+            return None
+        return self.router.route(estimate_tokens(prompt), output_tokens)
+    
+    def _generate(self, prompt: str, stage: Optional[str], output_tokens: int) -> str:
+        """One routed backend call; latency and errors feed the router."""
+        model = self._route(prompt, output_tokens)
+        start = time.perf_counter()
+        try:
+            text = self.backend.generate(prompt, model)
+        except Exception:
+            if model:
+                self.router.record(model, time.perf_counter() - start, ok=False)
+            raise
+        if model:
+            self.router.record(model, time.perf_counter() - start, ok=True)
+        _record_tokens(stage, prompt, text)
+        return text
+    
+    def generate_content(self, prompt: str, stage: Optional[str] = None) -> str:
         """
         Generic content generation method.
         
         Args:
             prompt: The prompt to send to Gemini
+            stage: Prompt stage name for token metrics and model routing (see services/prompts.py)
             
         Returns:
             Generated text response
         """
         # If not initialized, try to recover
-        if not self._initialized or self.model is None:
-            if self.api_key and genai:
-                if not self._try_initialize():
-                    return ""
-            else:
-                return ""
+        if not self._ensure_backend():
+            return ""
         
         try:
-            response = self.model.generate_content(prompt)
-            if response and hasattr(response, 'text'):
-                return response.text.strip()
-            return ""
+            return self._generate(prompt, stage, expected_output_tokens(stage))
         except Exception as e:
             print(f"Gemini generate_content error: {e}")
-            error_msg = str(e)
-            if "connection" in error_msg.lower() or "network" in error_msg.lower():
-                self._initialized = False
-                self.model = None
+            self._handle_backend_error(e)
             return ""
     
-    def generate_quiz_questions(self, content: str, num_questions: int) -> str:
+    def generate_quiz_questions(
+        self,
+        content: str,
+        num_questions: int,
+        key_topics: Optional[List[str]] = None
+    ) -> Optional[str]:
         """
         Generate quiz questions from educational content.
         
         Args:
             content: Educational text/content
             num_questions: Number of questions to generate
+            key_topics: Optional topics; each question is labelled with the one it tests
             
         Returns:
-            JSON string with quiz questions
+            JSON string with quiz questions, or None if no model answered
+            (no backend, empty reply or API error). There is no mock reply:
+            the caller decides how to fill the quiz, and stand-in questions
+            must never be mistaken for generated ones (e.g. banked).
         """
         # If not initialized or in mock mode, try to initialize (recovery from previous failures)
-        if not self._initialized or self.model is None:
-            if self.api_key and genai:
-                # Retry initialization - connection might be stable now
-                if self._try_initialize():
-                    print("Info: Successfully reconnected to Gemini API.")
-                else:
-                    # Still can't connect, use mock mode
-                    return self._mock_quiz_generation(content, num_questions)
-            else:
-                # No API key or library not available, use mock
-                return self._mock_quiz_generation(content, num_questions)
+        if not self._ensure_backend():
+            # No API key, library not available or still can't connect
+            return None
         
-        prompt = f"""
-Generate {num_questions} multiple-choice quiz questions based on the following content.
-
-Content:
-{content}
-
-Requirements:
-- Each question should have exactly 4 options (A, B, C, D)
-- One correct answer per question
-- Questions should test understanding, not just recall
-- Return ONLY valid JSON array (no markdown, no explanation)
-
-Format:
-[
-  {{
-    "question": "Question text here?",
-    "options": ["Option A", "Option B", "Option C", "Option D"],
-    "correct_answer": "Option A"
-  }}
-]
-
-Generate exactly {num_questions} questions. Return JSON only.
-"""
+        topic_rule = f", exactly as written in: {', '.join(key_topics)}" if key_topics else ""
+        prompt = QUIZ_QUESTIONS.build(num_questions=num_questions, content=content, topic_rule=topic_rule)
         
         try:
-            response = self.model.generate_content(prompt)
-            print(f"Gemini response received: {type(response)}")
-            if response and hasattr(response, 'text'):
-                print(f"Gemini generated {len(response.text)} chars")
-                return response.text.strip()
-            else:
-                # Invalid response format
-                print(f"Warning: Invalid response from Gemini API: {response}")
-                return self._mock_quiz_generation(content, num_questions)
+            text = self._generate(prompt, QUIZ_QUESTIONS.name, num_questions * TOKENS_PER_QUESTION)
+            if text:
+                print(f"Gemini generated {len(text)} chars")
+                return text
+            # Invalid/empty response
+            print("Warning: Empty response from Gemini API")
+            return None
         except Exception as e:
             # Catch all API errors (connection, authentication, rate limit, etc.)
             error_msg = str(e)
             print(f"Gemini API error: {error_msg}")
             
-            # Check if it's a connection error - mark as not initialized so we retry next time
-            if "Request ID" in error_msg or "connection" in error_msg.lower() or "network" in error_msg.lower():
-                print("Warning: Gemini API connection error. Will retry on next request. Using mock mode for now.")
-                self._initialized = False
-                self.model = None
-            else:
-                # Other errors (auth, rate limit, etc.) - log but don't disable permanently
-                print(f"Warning: Gemini API error ({type(e).__name__}). Using mock mode for this request.")
-            
-            # Fallback to mock for this request, but keep trying real API next time
-            return self._mock_quiz_generation(content, num_questions)
-    
-    def _mock_quiz_generation(self, content: str, num_questions: int) -> str:
-        """
-        Mock quiz generation for MVP/testing.
-        Generates simple questions based on content length.
-        """
-        import json
-        
-        # Simple mock: create generic questions
-        questions = []
-        for i in range(num_questions):
-            questions.append({
-                "question": f"Based on the content, which statement is most accurate? (Question {i+1})",
-                "options": [
-                    "Option A is correct",
-                    "Option B is correct",
-                    "Option C is correct",
-                    "Option D is correct"
-                ],
-                "correct_answer": "Option A is correct"
-            })
-        
-        return json.dumps(questions)
+            # Connection errors mark the backend as not initialized so we retry next time;
+            # other errors (auth, rate limit, etc.) don't disable it permanently
+            self._handle_backend_error(e)
+            print(f"Warning: Gemini API error ({type(e).__name__}). No questions generated for this request.")
+            return None
@@ -0,0 +1,181 @@
+"""
+Google API client helpers shared by the Workspace services
+
+Builds googleapiclient service objects from the bundled (static) discovery
+documents. When GOOGLE_API_ENDPOINT is set, every service is pointed at
+that base URL instead of Google - e.g. the fake Workspace server in
+fakes/workspace_server.py - so the real HTTP path can be exercised and
+load-tested offline. When CASSETTE_MODE is set, traffic is recorded to or
+replayed from a cassette (services/cassette.py).
+"""
+import os
+import random
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from services.cassette import CassetteHttp, CassetteMiss, get_cassette, is_replaying
+from utils.metrics import metrics
+
+
+# Batch requests accept at most 50 calls (Calendar's limit; used for every API)
+BATCH_SIZE = 50
+BATCH_RETRIES = 3
+RETRY_BASE_SECONDS = 0.5
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# servicePath of APIs that are not served from their own root URL
+_SERVICE_PATHS = {
+    "calendar": "calendar/v3/",
+    "drive": "drive/v3/",
+}
+
+
+def api_endpoint_override() -> Optional[str]:
+    """Return the GOOGLE_API_ENDPOINT base URL (no trailing slash), if set."""
+    endpoint = os.getenv("GOOGLE_API_ENDPOINT")
+    return endpoint.rstrip("/") if endpoint else None
+
+
+def has_api_access(credentials: Any) -> bool:
+    """True if a service can make real API calls (or replay them from a cassette)."""
+    return credentials is not None or api_endpoint_override() is not None or is_replaying()
+
+
+def to_google_credentials(credentials: Any):
+    """
+    Convert the credentials shapes used in this app to google-auth credentials.
+
+    Accepts google-auth credentials (returned as-is), the dict produced by
+    utils.auth.get_google_credentials, or None. Returns anonymous
+    credentials when talking to an endpoint override without a token.
+    """
+    if isinstance(credentials, dict):
+        from google.oauth2.credentials import Credentials
+        return Credentials(token=credentials.get("token"), scopes=credentials.get("scopes"))
+    if credentials is None and api_endpoint_override():
+        from google.auth.credentials import AnonymousCredentials
+        return AnonymousCredentials()
+    return credentials
+
+
+def build_google_service(api: str, version: str, credentials: Any = None, http: Any = None):
+    """
+    Build a googleapiclient service object.
+
+    Args:
+        api: API name (e.g. "forms", "sheets")
+        version: API version (e.g. "v1")
+        credentials: Credentials in any shape accepted by to_google_credentials
+        http: Optional pre-authorized httplib2-compatible object (overrides credentials)
+
+    Returns:
+        googleapiclient Resource
+    """
+    from googleapiclient.discovery import build
+
+    kwargs = {"static_discovery": True, "cache_discovery": False}
+    endpoint = api_endpoint_override()
+    if endpoint:
+        kwargs["client_options"] = {"api_endpoint": f"{endpoint}/{_SERVICE_PATHS.get(api, '')}"}
+
+    cassette = get_cassette()
+    if cassette is not None:
+        # Record through an authorized transport, or replay without any
+        if cassette.mode == "record" and http is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            http = AuthorizedHttp(to_google_credentials(credentials), http=httplib2.Http())
+        http = CassetteHttp(cassette, inner=http if cassette.mode == "record" else None)
+
+    if http is not None:
+        return build(api, version, http=http, **kwargs)
+    return build(api, version, credentials=to_google_credentials(credentials), **kwargs)
+
+
+def new_batch_request(service: Any, api: str, version: str, callback: Any = None):
+    """
+    Create a BatchHttpRequest for a service built by build_google_service.
+
+    googleapiclient takes the batch URI from the discovery document's root
+    URL, which ignores api_endpoint, so with GOOGLE_API_ENDPOINT set the
+    batch is pointed at the override explicitly.
+
+    Args:
+        service: googleapiclient Resource
+        api: API name (e.g. "calendar")
+        version: API version (e.g. "v3")
+        callback: Called as callback(request_id, response, exception) per request
+    """
+    endpoint = api_endpoint_override()
+    if endpoint:
+        from googleapiclient.http import BatchHttpRequest
+        return BatchHttpRequest(callback=callback, batch_uri=f"{endpoint}/batch/{api}/{version}")
+    return service.new_batch_http_request(callback=callback)
+
+
+def execute_batch(
+    service: Any,
+    api: str,
+    version: str,
+    requests: Dict[str, Any],
+    num_retries: int = BATCH_RETRIES
+) -> Dict[str, Tuple[Optional[Dict], Optional[Exception]]]:
+    """
+    Execute up to BATCH_SIZE requests as one batch, retrying retryable failures.
+
+    Only the calls that failed with a retryable status are sent again, with
+    exponential backoff; a whole-batch failure retries everything pending.
+
+    Args:
+        service: googleapiclient Resource the requests were built from
+        api: API name (also the metrics prefix)
+        version: API version
+        requests: {request_id: HttpRequest}
+        num_retries: Retry rounds after the first attempt
+
+    Returns:
+        {request_id: (response, error)} - error is None on success
+    """
+    from googleapiclient.errors import HttpError
+
+    outcomes: Dict[str, Tuple[Optional[Dict], Optional[Exception]]] = {}
+    pending = dict(requests)
+    for attempt in range(num_retries + 1):
+        if attempt:
+            time.sleep(RETRY_BASE_SECONDS * 2 ** (attempt - 1) * (1 + random.random()))
+            metrics.incr(f"{api}.batch_retries")
+        retry = {}
+
+        def callback(request_id, response, exception):
+            if exception is not None and is_retryable(exception) and attempt < num_retries:
+                retry[request_id] = pending[request_id]
+            outcomes[request_id] = (response, exception)
+
+        batch = new_batch_request(service, api, version, callback=callback)
+        for rid, request in pending.items():
+            batch.add(request, request_id=rid)
+        try:
+            with metrics.timed(f"{api}.batch"):
+                batch.execute()
+        except CassetteMiss as e:
+            # Replay has no recording of this batch; retrying won't find one
+            for rid in pending:
+                outcomes[rid] = (None, e)
+            break
+        except (HttpError, OSError) as e:
+            # The whole batch failed (e.g. 503 or connection reset)
+            if attempt == num_retries or (isinstance(e, HttpError) and not is_retryable(e)):
+                for rid in pending:
+                    outcomes[rid] = (None, e)
+                break
+            retry = pending
+        if not retry:
+            break
+        pending = retry
+    return outcomes
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient failure (429 / 5xx, or no HTTP status at all)?"""
+    status = getattr(getattr(error, "resp", None), "status", None)
+    return status is None or int(status) in RETRYABLE_STATUS
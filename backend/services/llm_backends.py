@@ -0,0 +1,190 @@
+"""
+LLM Backends - pluggable text generation behind GeminiService
+
+GeminiService delegates every model call to an LLMBackend:
+- GenAIBackend: Google Gemini via google-generativeai (production)
+- FakeLLMBackend: in-process deterministic fake (fakes/llm_server.py)
+- HTTPLLMBackend: the fake LLM server (or any compatible server) over HTTP
+- CassetteLLMBackend: records another backend's calls or replays them
+  (services/cassette.py)
+
+The backend is picked with the LLM_BACKEND env var ("gemini", "fake", "http";
+default "gemini") unless one is passed to GeminiService explicitly.
+"""
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from typing import Optional
+
+from services.cassette import CassetteMiss, get_cassette, request_key
+
+
+class LLMError(Exception):
+    """Backend call failed. status is the HTTP-like status code, if known."""
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class RateLimitError(LLMError):
+    """Backend rejected the call with a rate limit / quota error (429)."""
+
+
+class LLMBackend:
+    """Interface for text generation backends."""
+
+    name = "base"
+
+    def generate(self, prompt: str, model: Optional[str] = None) -> str:
+        """Return the full response text for a prompt."""
+        raise NotImplementedError
+
+
+class GenAIBackend(LLMBackend):
+    """Google Gemini through the google-generativeai SDK."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str = "gemini-2.0-flash"):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self._models = {model_name: self.model}
+
+    def _model_for(self, model: Optional[str]):
+        if not model or model == self.model_name:
+            return self.model
+        if model not in self._models:
+            self._models[model] = self._genai.GenerativeModel(model)
+        return self._models[model]
+
+    def generate(self, prompt: str, model: Optional[str] = None) -> str:
+        try:
+            response = self._model_for(model).generate_content(prompt)
+        except Exception as e:
+            raise _wrap_genai_error(e) from e
+        if response and hasattr(response, "text"):
+            return response.text.strip()
+        return ""
+
+
+def _wrap_genai_error(e: Exception) -> LLMError:
+    message = str(e)
+    if "429" in message or "exhausted" in message.lower() or "quota" in message.lower():
+        return RateLimitError(message, status=429)
+    return LLMError(message)
+
+
+class FakeLLMBackend(LLMBackend):
+    """In-process deterministic fake with latency and failure injection."""
+
+    name = "fake"
+
+    def __init__(self, config=None):
+        from fakes.llm_server import FakeLLM, FakeLLMConfig
+        if config is None:
+            config = FakeLLMConfig(
+                ttft_ms=float(os.getenv("FAKE_LLM_TTFT_MS", "250")),
+                tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "100")),
+                error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+                rate_limit_rate=float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0")),
+                seed=int(os.getenv("FAKE_LLM_SEED", "0")),
+            )
+        self.llm = FakeLLM(config)
+
+    def generate(self, prompt: str, model: Optional[str] = None) -> str:
+        from fakes.llm_server import FakeLLMError
+        try:
+            return self.llm.generate(prompt)
+        except FakeLLMError as e:
+            raise (RateLimitError if e.status == 429 else LLMError)(str(e), status=e.status) from e
+
+
+class HTTPLLMBackend(LLMBackend):
+    """Client for the fake LLM server's /v1/generate endpoint."""
+
+    name = "http"
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 120.0):
+        self.base_url = (base_url or os.getenv("LLM_BACKEND_URL") or "http://127.0.0.1:8766").rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path: str, prompt: str, model: Optional[str]):
+        body = json.dumps({"prompt": prompt, "model": model}).encode("utf-8")
+        request = urllib.request.Request(
+            f"{self.base_url}{path}", data=body, headers={"Content-Type": "application/json"}
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            error_cls = RateLimitError if e.code == 429 else LLMError
+            raise error_cls(f"LLM backend HTTP {e.code}", status=e.code) from e
+        except urllib.error.URLError as e:
+            raise LLMError(f"LLM backend connection error: {e.reason}") from e
+
+    def generate(self, prompt: str, model: Optional[str] = None) -> str:
+        with self._post("/v1/generate", prompt, model) as resp:
+            return json.loads(resp.read().decode("utf-8")).get("text", "").strip()
+
+
+class CassetteLLMBackend(LLMBackend):
+    """
+    Records an inner backend's responses, or replays them with original timing.
+
+    Keys leave out the model: the router (services/model_router.py) picks it
+    from live latency and error rates, so a replay can route differently.
+    """
+
+    def __init__(self, cassette, inner: Optional[LLMBackend] = None):
+        self.cassette = cassette
+        self.inner = inner
+        self.name = f"cassette-{cassette.mode}" + (f"({inner.name})" if inner else "")
+
+    def generate(self, prompt: str, model: Optional[str] = None) -> str:
+        key = request_key("llm", "generate", "", prompt)
+        if self.cassette.mode == "replay":
+            entry = self._lookup(key)
+            self.cassette.wait(entry["t"])
+            return entry["r"]["text"]
+
+        start = time.perf_counter()
+        text = self.inner.generate(prompt, model)
+        self.cassette.record(key, time.perf_counter() - start, {"text": text})
+        return text
+
+    def _lookup(self, key: str):
+        try:
+            return self.cassette.lookup(key)
+        except CassetteMiss as e:
+            raise LLMError(str(e)) from e
+
+
+def with_cassette(backend: Optional[LLMBackend]) -> Optional[LLMBackend]:
+    """Wrap backend for recording when CASSETTE_MODE=record."""
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == "record" and backend is not None:
+        return CassetteLLMBackend(cassette, backend)
+    return backend
+
+
+def backend_from_env() -> Optional[LLMBackend]:
+    """
+    Build the backend selected by LLM_BACKEND (or the cassette in replay mode).
+
+    Returns None for "gemini" (the default) so GeminiService keeps its own
+    lazy initialization and mock fallback.
+    """
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        return CassetteLLMBackend(cassette)
+
+    kind = (os.getenv("LLM_BACKEND") or "gemini").lower()
+    if kind == "fake":
+        return with_cassette(FakeLLMBackend())
+    if kind == "http":
+        return with_cassette(HTTPLLMBackend())
+    return None
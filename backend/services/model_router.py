@@ -0,0 +1,154 @@
+"""
+Model Router - picks the Gemini model for each LLM call
+
+Calls are sized by estimated prompt tokens plus expected output tokens
+and routed to the lightest tier whose max_tokens fits them (topic
+extraction to a light model, big quiz generations to a strong one).
+Within a tier the model with the lowest EWMA latency wins; a tier whose
+models are all unhealthy (EWMA error rate above max_error_rate, or EWMA
+latency above the tier's max_latency_seconds) is skipped for the next
+stronger one. An unhealthy model gets traffic again after cooldown_seconds
+so it can recover.
+
+The policy is configurable with LLM_ROUTER_POLICY (JSON, same shape as
+DEFAULT_POLICY). LLM_ROUTING is "auto" (route Gemini calls only, the
+default), "on" (also pass models to LLM_BACKEND backends) or "off".
+
+Metrics: llm.route.<tier> and llm.route.model.<model> per decision,
+llm.route.escalated when a tier is skipped, llm.model.<model> latency and
+llm.model.<model>.errors.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from utils.metrics import metrics
+
+
+DEFAULT_POLICY = {
+    "tiers": [
+        {"name": "light", "models": ["gemini-2.0-flash-lite"], "max_tokens": 2000, "max_latency_seconds": 10},
+        {"name": "standard", "models": ["gemini-2.0-flash"], "max_tokens": 8000, "max_latency_seconds": 30},
+        {"name": "strong", "models": ["gemini-2.5-flash"], "max_tokens": None, "max_latency_seconds": None},
+    ],
+    "max_error_rate": 0.5,
+    "cooldown_seconds": 30,
+    # Weight of the newest sample in the latency and error rate EWMAs
+    "alpha": 0.2,
+}
+
+
+@dataclass
+class Tier:
+    name: str
+    models: List[str]
+    max_tokens: Optional[int] = None
+    max_latency_seconds: Optional[float] = None
+
+
+@dataclass
+class ModelStats:
+    """EWMA latency (successful calls) and error rate of one model."""
+    latency: Optional[float] = None
+    error_rate: float = 0.0
+    calls: int = 0
+    last_call: float = field(default_factory=time.monotonic)
+
+
+class ModelRouter:
+    """Chooses a model per call from its size and the models' observed health."""
+
+    def __init__(self, policy: Optional[Dict] = None):
+        """
+        Args:
+            policy: Routing policy (DEFAULT_POLICY values for missing keys)
+        """
+        policy = {**DEFAULT_POLICY, **(policy or {})}
+        self.tiers = [Tier(**tier) for tier in policy["tiers"]]
+        if not self.tiers or not all(tier.models for tier in self.tiers):
+            raise ValueError("routing policy needs tiers with at least one model each")
+        self.max_error_rate = float(policy["max_error_rate"])
+        self.cooldown_seconds = float(policy["cooldown_seconds"])
+        self.alpha = float(policy["alpha"])
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """Router with the LLM_ROUTER_POLICY policy (JSON), else DEFAULT_POLICY."""
+        raw = os.getenv("LLM_ROUTER_POLICY")
+        return cls(json.loads(raw) if raw else None)
+
+    def _healthy(self, model: str, tier: Tier, now: float) -> bool:
+        stats = self._stats.get(model)
+        if stats is None or now - stats.last_call >= self.cooldown_seconds:
+            return True
+        if stats.error_rate > self.max_error_rate:
+            return False
+        return tier.max_latency_seconds is None or stats.latency is None or stats.latency <= tier.max_latency_seconds
+
+    def _expected_latency(self, model: str) -> float:
+        # Models without samples go first so every model gets measured
+        stats = self._stats.get(model)
+        return stats.latency if stats is not None and stats.latency is not None else 0.0
+
+    def route(self, prompt_tokens: int, output_tokens: int = 0) -> str:
+        """
+        Model for a call.
+
+        Args:
+            prompt_tokens: Estimated prompt tokens
+            output_tokens: Expected response tokens
+
+        Returns:
+            Model name
+        """
+        size = prompt_tokens + output_tokens
+        first = next(
+            (i for i, tier in enumerate(self.tiers) if tier.max_tokens is None or size <= tier.max_tokens),
+            len(self.tiers) - 1
+        )
+        now = time.monotonic()
+        with self._lock:
+            for tier in self.tiers[first:]:
+                healthy = [m for m in tier.models if self._healthy(m, tier, now)]
+                if healthy:
+                    model = min(healthy, key=self._expected_latency)
+                    break
+            else:
+                # Nothing healthy: the sized tier's least failing model
+                tier = self.tiers[first]
+                model = min(tier.models, key=lambda m: self._stats[m].error_rate)
+
+        metrics.incr(f"llm.route.{tier.name}")
+        metrics.incr(f"llm.route.model.{model}")
+        if tier is not self.tiers[first]:
+            metrics.incr("llm.route.escalated")
+        return model
+
+    def record(self, model: str, seconds: float, ok: bool) -> None:
+        """Update a model's EWMAs after a call."""
+        with self._lock:
+            stats = self._stats.setdefault(model, ModelStats())
+            if ok:
+                stats.latency = seconds if stats.latency is None else (
+                    self.alpha * seconds + (1 - self.alpha) * stats.latency
+                )
+            # Starts from 0 so a single failure doesn't take a model out
+            stats.error_rate = self.alpha * (0.0 if ok else 1.0) + (1 - self.alpha) * stats.error_rate
+            stats.calls += 1
+            stats.last_call = time.monotonic()
+        metrics.observe(f"llm.model.{model}", seconds)
+        if not ok:
+            metrics.incr(f"llm.model.{model}.errors")
+
+    def stats(self) -> Dict[str, Dict]:
+        """Current EWMA latency, error rate and call count per model."""
+        with self._lock:
+            return {
+                model: {"latency": s.latency, "error_rate": round(s.error_rate, 4), "calls": s.calls}
+                for model, s in self._stats.items()
+            }
@@ -0,0 +1,253 @@
+"""
+Prompt builder - precompiled prompt templates with token budgets
+
+Each LLM stage has a PromptTemplate: the template is parsed once into
+literal and field segments (so the fixed part's token count is known up
+front), and build() renders it within the stage's token budget by
+condensing the large inputs (notes, syllabus, content) instead of sending
+them whole. Token counts come from estimate_tokens(), a character-based
+approximation that needs no tokenizer.
+
+Budgets can be overridden per stage with PROMPT_BUDGET_<STAGE> (e.g.
+PROMPT_BUDGET_QUIZ_QUESTIONS=8000).
+"""
+import math
+import os
+import re
+from collections import Counter
+from string import Formatter
+from typing import Dict, List, Optional, Sequence
+
+from utils.metrics import metrics
+
+
+# Average characters per token for English text (non-ASCII counts as one token each)
+CHARS_PER_TOKEN = 4.0
+# Output tokens a generated quiz question takes (question, 4 options, answer, topic)
+TOKENS_PER_QUESTION = 90
+QUIZ_OUTPUT_BUDGET = int(os.getenv("QUIZ_OUTPUT_BUDGET", "2048"))
+# Expected response size of prompts without a template
+DEFAULT_OUTPUT_TOKENS = 500
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD_RE = re.compile(r"[A-Za-z0-9']{4,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / CHARS_PER_TOKEN + (len(text) - ascii_chars))
+
+
+def max_questions_per_call() -> int:
+    """Questions one quiz generation call may ask for within QUIZ_OUTPUT_BUDGET."""
+    return max(1, QUIZ_OUTPUT_BUDGET // TOKENS_PER_QUESTION)
+
+
+def expected_output_tokens(stage: Optional[str]) -> int:
+    """Typical response tokens of a stage's prompt (for model routing)."""
+    template = _TEMPLATES.get(stage or "")
+    return template.output_tokens if template is not None else DEFAULT_OUTPUT_TOKENS
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Head of the text within max_tokens, cut at a word boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    head = text[:max(0, int(max_tokens * CHARS_PER_TOKEN))]
+    # Non-ASCII text uses more tokens per character than estimated above
+    while head and estimate_tokens(head) > max_tokens:
+        head = head[:len(head) * 3 // 4]
+    cut = head.rfind(" ")
+    return (head[:cut] if cut > len(head) // 2 else head).rstrip() + " ..."
+
+
+def condense(text: str, max_tokens: int) -> str:
+    """
+    Shorten a text to max_tokens by extractive summarization.
+
+    Sentences (and lines) are scored by how many of the text's frequent
+    words they contain, the best are kept in their original order, and the
+    first sentence (usually a title) is always preferred.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    units = [u.strip() for u in _SENTENCE_RE.split(text) if u and u.strip()]
+    if len(units) < 2:
+        return truncate_tokens(text, max_tokens)
+
+    words = [set(w.casefold() for w in _WORD_RE.findall(u)) for u in units]
+    frequency = Counter(w for unit in words for w in unit)
+    scores = [
+        sum(frequency[w] for w in unit) / math.sqrt(len(unit) + 1) + (math.inf if i == 0 else 0)
+        for i, unit in enumerate(words)
+    ]
+    kept, used = [], 0
+    for i in sorted(range(len(units)), key=lambda i: -scores[i]):
+        cost = estimate_tokens(units[i]) + 1
+        if used + cost <= max_tokens:
+            kept.append(i)
+            used += cost
+    if not kept:
+        return truncate_tokens(units[0], max_tokens)
+    return "\n".join(units[i] for i in sorted(kept))
+
+
+_TEMPLATES: Dict[str, "PromptTemplate"] = {}
+
+
+class PromptTemplate:
+    """A str.format-style template parsed once, rendered within a token budget."""
+
+    def __init__(
+        self,
+        name: str,
+        template: str,
+        budget: int,
+        condensable: Sequence[str] = (),
+        output_tokens: int = DEFAULT_OUTPUT_TOKENS
+    ):
+        """
+        Args:
+            name: Stage name (metrics key and budget env suffix)
+            template: Template text with {field} placeholders ({{ }} for braces)
+            budget: Default prompt token budget
+            condensable: Fields that may be shortened to fit, largest first
+            output_tokens: Typical response tokens
+        """
+        self.name = name
+        self.output_tokens = output_tokens
+        self.budget = int(os.getenv(f"PROMPT_BUDGET_{name.upper()}", budget))
+        self.condensable = tuple(condensable)
+        self._segments = [(literal, field) for literal, field, _, _ in Formatter().parse(template)]
+        self.static_tokens = estimate_tokens("".join(literal for literal, _ in self._segments))
+        _TEMPLATES[name] = self
+
+    @property
+    def fields(self) -> List[str]:
+        return [field for _, field in self._segments if field]
+
+    def render(self, **values) -> str:
+        """Fill the template as-is (no budget)."""
+        return "".join(
+            literal + (str(values[field]) if field else "")
+            for literal, field in self._segments
+        )
+
+    def build(self, budget: Optional[int] = None, **values) -> str:
+        """
+        Render within the token budget, condensing condensable fields as needed.
+
+        Args:
+            budget: Override of the stage budget for this call
+            values: Field values
+        """
+        budget = budget or self.budget
+        values = {k: str(v) for k, v in values.items()}
+        sizes: Dict[str, int] = {field: estimate_tokens(values[field]) for field in set(self.fields)}
+        tokens = self.static_tokens + sum(sizes[field] for field in self.fields)
+
+        if tokens > budget:
+            for field in sorted(self.condensable, key=lambda f: -sizes.get(f, 0)):
+                over = tokens - budget
+                if over <= 0 or field not in sizes:
+                    break
+                occurrences = self.fields.count(field)
+                target = max(0, sizes[field] - math.ceil(over / occurrences))
+                values[field] = condense(values[field], target)
+                shrunk = estimate_tokens(values[field])
+                tokens -= (sizes[field] - shrunk) * occurrences
+                sizes[field] = shrunk
+            metrics.incr(f"prompt.{self.name}.condensed")
+
+        metrics.observe(f"prompt.{self.name}.tokens", tokens)
+        return self.render(**values)
+
+
+# ── Templates ────────────────────────────────────────────────────────────────
+
+QUIZ_QUESTIONS = PromptTemplate("quiz_questions", """
+Generate {num_questions} multiple-choice quiz questions based on the following content.
+
+Content:
+{content}
+
+Requirements:
+- Each question should have exactly 4 options (A, B, C, D)
+- One correct answer per question
+- Questions should test understanding, not just recall
+- Set "topic" to the key topic the question tests{topic_rule}
+- Return ONLY valid JSON array (no markdown, no explanation)
+
+Format:
+[
+  {{
+    "question": "Question text here?",
+    "options": ["Option A", "Option B", "Option C", "Option D"],
+    "correct_answer": "Option A",
+    "topic": "Key topic"
+  }}
+]
+
+Generate exactly {num_questions} questions. Return JSON only.
+""", budget=6000, condensable=("content",), output_tokens=QUIZ_OUTPUT_BUDGET)
+
+CONTENT_ANALYSIS = PromptTemplate("content_analysis", """You are an academic content analyzer for education.
+
+Analyze the following {subject} notes from {chapter} and extract:
+1. The most important key topics (3-7 topics)
+2. A brief academic summary (1-2 sentences)
+
+NOTES:
+{notes}
+
+Respond with ONLY valid JSON in this exact format (no markdown, no explanation):
+{{
+    "key_topics": ["Topic 1", "Topic 2", "Topic 3"],
+    "summary": "Brief academic summary of the chapter content."
+}}
+
+Rules:
+- Extract only the most important concepts
+- Use academic tone
+- Keep summary under 50 words
+- JSON only, no extra text""", budget=4000, condensable=("notes",), output_tokens=150)
+
+CONTENT_SUMMARY = PromptTemplate("content_summary", """Summarize the following {subject} notes from {chapter} in 1-2 sentences
+(under 50 words, academic tone). Respond with the summary text only.
+
+NOTES:
+{notes}""", budget=3000, condensable=("notes",), output_tokens=80)
+
+TOPIC_GRAPH = PromptTemplate("topic_graph", """You are a curriculum designer.
+
+Break the following syllabus into its learning topics (at most {max_topics}) and,
+for each, list which of those topics must be learned first.
+
+SYLLABUS:
+{syllabus}
+
+Respond with ONLY valid JSON in this exact format (no markdown, no explanation):
+{{
+    "topics": [
+        {{"name": "Topic", "difficulty": "beginner|intermediate|advanced",
+          "estimated_hours": 2, "resources": ["Resource"], "prerequisites": ["Other topic name"]}}
+    ]
+}}""", budget=6000, condensable=("syllabus",), output_tokens=2000)
+
+TOPIC_GUIDANCE = PromptTemplate("topic_guidance", """You are a tutor.
+
+For each topic below, write one short study tip for a student learning it for the
+first time and one for a student who only needs to review it.
+
+TOPICS:
+{topics}
+
+Respond with ONLY valid JSON in this exact format (no markdown, no explanation):
+{{
+    "topics": [
+        {{"name": "Topic", "learn": "Tip", "review": "Tip"}}
+    ]
+}}""", budget=2000, output_tokens=1000)
@@ -1,37 +1,97 @@
 """
-Google Sheets Service - MOCK VERSION
+Google Sheets Service
 
 This service handles Google Sheets API interactions.
-For MVP: Returns mocked data.
-For Production: Replace with real Google Sheets API calls.
+Without credentials (and no GOOGLE_API_ENDPOINT override): returns mocked data.
+With credentials: reads the Forms response sheet through the Sheets REST API.
+
+Large response sheets are read with iter_result_batches(), which fetches
+bounded row ranges and yields columnar ResultBatch objects, so memory use
+does not grow with the sheet.
+
+get_revision() returns the spreadsheet's Drive file version, a cheap
+metadata call that changes on every edit (including new form responses),
+so callers can cache anything derived from the sheet until it changes.
 """
-from typing import List, Dict
+import os
+from typing import Iterator, List, Dict, Optional
+
+import numpy as np
+
+from schemas.batches import ResultBatch
+from services.google_api import build_google_service, has_api_access
+from utils.cache import TTLCache
+
+
+DEFAULT_BATCH_ROWS = 1000
+
+# Seconds a looked-up revision is reused, so bursts of refreshes cost one Drive call
+REVISION_TTL = float(os.getenv("SHEETS_REVISION_TTL", "1.0"))
+
+# Columns written by Forms before the per-question answers
+_META_COLUMNS = {"Timestamp", "Email Address", "Score", "Name"}
 
 
 class SheetsService:
     """Service for Google Sheets API interactions"""
-    
+
     def __init__(self, credentials: Dict = None):
         """
         Initialize Sheets service.
-        
+
         Args:
             credentials: OAuth2 credentials (for real API)
         """
         self.credentials = credentials
-        self.mock_mode = True  # MVP: Always mock
-    
+        self.mock_mode = not has_api_access(credentials)
+        self._revisions = TTLCache(maxsize=1024, default_ttl=REVISION_TTL)
+
+    def get_revision(self, spreadsheet_id: str) -> Optional[str]:
+        """
+        Current revision of a spreadsheet, without reading any cells.
+
+        Uses the Drive file "version", which increases on every change to
+        the file (requires a Drive metadata read scope).
+
+        Args:
+            spreadsheet_id: Google Sheets spreadsheet ID
+
+        Returns:
+            Revision string ("mock" in mock mode), or None if it could not be
+            determined - callers should then treat the sheet as changed
+        """
+        if self.mock_mode:
+            return "mock"
+
+        def load():
+            try:
+                file = build_google_service("drive", "v3", self.credentials).files().get(
+                    fileId=spreadsheet_id, fields="version"
+                ).execute()
+            except Exception as e:
+                print(f"[SheetsService] WARNING: revision lookup failed for {spreadsheet_id}: {e}")
+                return None, 0
+            return file.get("version"), None
+
+        return self._revisions.get_or_load(spreadsheet_id, load)
+
     def get_quiz_results(self, spreadsheet_id: str, sheet_name: str = "Form Responses 1") -> List[Dict]:
         """
         Fetch quiz results from Google Sheets.
-        
+
         Args:
             spreadsheet_id: Google Sheets spreadsheet ID
             sheet_name: Sheet name (default: Form Responses)
-            
+
         Returns:
             List of student results
         """
+        if not self.mock_mode:
+            results = []
+            for batch in self.iter_result_batches(spreadsheet_id, sheet_name):
+                results.extend(batch.to_results())
+            return results
+
         # MOCK: Return sample results
         return [
             {"student": "Student 1", "score": 85, "total": 100},
@@ -39,9 +99,114 @@ class SheetsService:
             {"student": "Student 3", "score": 78, "total": 100},
             {"student": "Student 4", "score": 88, "total": 100},
         ]
-        
-        # REAL API would:
-        # 1. Use Google Sheets API to read data
-        # 2. Parse student responses
-        # 3. Calculate scores
-        # 4. Return structured results
+
+    def iter_result_batches(
+        self,
+        spreadsheet_id: str,
+        sheet_name: str = "Form Responses 1",
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        start_row: int = 2
+    ) -> Iterator[ResultBatch]:
+        """
+        Stream quiz results as columnar batches of at most batch_rows rows.
+
+        Args:
+            spreadsheet_id: Google Sheets spreadsheet ID
+            sheet_name: Sheet name (default: Form Responses)
+            batch_rows: Rows fetched per API call
+            start_row: First data row to read (2 = right after the header)
+
+        Yields:
+            ResultBatch per fetched row range
+        """
+        if self.mock_mode:
+            results = self.get_quiz_results(spreadsheet_id, sheet_name)[start_row - 2:]
+            if results:
+                yield _results_to_batch(results, start_row)
+            return
+
+        values = build_google_service("sheets", "v4", self.credentials).spreadsheets().values()
+        header_rows = values.get(spreadsheetId=spreadsheet_id, range=f"'{sheet_name}'!1:1").execute().get("values", [])
+        if not header_rows:
+            return
+        header = header_rows[0]
+        last_column = _column_letter(len(header))
+
+        row = start_row
+        while True:
+            end = row + batch_rows - 1
+            response = values.get(
+                spreadsheetId=spreadsheet_id,
+                range=f"'{sheet_name}'!A{row}:{last_column}{end}"
+            ).execute()
+            rows = response.get("values", [])
+            if rows:
+                yield _parse_rows(header, rows, row)
+            if len(rows) < batch_rows:
+                return
+            row = end + 1
+
+
+def _column_letter(index: int) -> str:
+    """1-based column index -> A1 column letters (1 -> A, 27 -> AA)."""
+    letters = ""
+    while index > 0:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _parse_score(raw: str):
+    """Parse a Forms "points / max" score cell; (nan, nan) if unparsable."""
+    points, _, max_points = raw.partition("/")
+    try:
+        return float(points), float(max_points)
+    except ValueError:
+        return np.nan, np.nan
+
+
+def _parse_rows(header: List[str], rows: List[List[str]], start_row: int) -> ResultBatch:
+    """
+    Convert raw sheet rows into a columnar batch.
+
+    Forms quiz sheets store the score as "points / max" in a "Score" column
+    and one column per question after the metadata columns.
+    """
+    width = len(header)
+    # Sheets omits trailing empty cells, so pad every row to the header width
+    grid = np.array([r + [""] * (width - len(r)) for r in rows], dtype=object)
+    columns = {name: i for i, name in enumerate(header)}
+
+    scores = grid[:, columns["Score"]] if "Score" in columns else np.full(len(rows), "", dtype=object)
+    parsed = np.array([_parse_score(s) for s in scores], dtype=np.float64).reshape(-1, 2)
+
+    student_col = columns.get("Email Address", columns.get("Name"))
+    students = list(grid[:, student_col]) if student_col is not None else [
+        f"Row {start_row + i}" for i in range(len(rows))
+    ]
+    timestamps = list(grid[:, columns["Timestamp"]]) if "Timestamp" in columns else [""] * len(rows)
+    question_idx = [i for i, name in enumerate(header) if name not in _META_COLUMNS]
+
+    return ResultBatch(
+        students=students,
+        timestamps=timestamps,
+        points=parsed[:, 0],
+        max_points=parsed[:, 1],
+        answers=grid[:, question_idx],
+        question_columns=[header[i] for i in question_idx],
+        start_row=start_row,
+        cursor=start_row + len(rows)
+    )
+
+
+def _results_to_batch(results: List[Dict], start_row: int = 2) -> ResultBatch:
+    """Wrap row-oriented results (e.g. mock data) as a single batch."""
+    return ResultBatch(
+        students=[r.get("student", "") for r in results],
+        timestamps=[""] * len(results),
+        points=np.array([r.get("score", 0) for r in results], dtype=np.float64),
+        max_points=np.array([r.get("total", 100) for r in results], dtype=np.float64),
+        answers=np.empty((len(results), 0), dtype=object),
+        start_row=start_row,
+        cursor=start_row + len(results)
+    )
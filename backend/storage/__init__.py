@@ -0,0 +1,16 @@
+"""Storage package - local persistence for quizzes and results"""
+import os
+
+
+def data_path(*parts: str) -> str:
+    """
+    Path under the local data directory (EDUSPHERE_DATA_DIR, default backend/data).
+
+    Parent directories are created on demand.
+    """
+    base = os.getenv("EDUSPHERE_DATA_DIR") or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"
+    )
+    path = os.path.join(base, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
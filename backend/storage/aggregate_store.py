@@ -0,0 +1,81 @@
+"""
+Aggregate Store - persists running per-quiz analytics state
+
+Each quiz (form or response sheet) keeps one QuizAggregate so analytics can
+fold in only the responses that arrived since the last request instead of
+re-reading and recomputing everything.
+"""
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from engines.analytics_engine import QuizAggregate
+from storage import data_path
+
+
+class AggregateStore:
+    """SQLite-backed store of QuizAggregate state keyed by quiz ID."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite file (default data/aggregates.db)
+        """
+        self.db_path = db_path or data_path("aggregates.db")
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS quiz_aggregates (
+                    quiz_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection, commit on success and always close it."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, quiz_id: str) -> Optional[QuizAggregate]:
+        """
+        Return the stored aggregate, or None if missing or invalid.
+
+        Invalid state (unknown version, inconsistent counts, bad JSON) is
+        dropped so the caller rebuilds it with a full recompute.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state FROM quiz_aggregates WHERE quiz_id = ?", (quiz_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return QuizAggregate.from_dict(json.loads(row[0]))
+        except ValueError as e:
+            print(f"[AggregateStore] WARNING: discarding aggregate for {quiz_id}: {e}")
+            self.delete(quiz_id)
+            return None
+
+    def save(self, quiz_id: str, aggregate: QuizAggregate) -> None:
+        """Save (or replace) the aggregate for a quiz."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO quiz_aggregates VALUES (?, ?, ?)",
+                (quiz_id, json.dumps(aggregate.to_dict()), time.time())
+            )
+
+    def delete(self, quiz_id: str) -> None:
+        """Forget a quiz's aggregate (the next request recomputes it)."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM quiz_aggregates WHERE quiz_id = ?", (quiz_id,))
@@ -0,0 +1,75 @@
+"""
+Curriculum Store - persists topic graphs extracted from syllabi
+
+Graphs are keyed by the syllabus content hash, so a syllabus is sent to the
+LLM once; later plan requests for the same text (even from another process
+or after a restart) load the graph instead.
+"""
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from engines.curriculum_engine import TopicGraph
+from storage import data_path
+
+
+class CurriculumStore:
+    """SQLite-backed store of TopicGraph state keyed by syllabus hash."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite file (default data/curriculum.db)
+        """
+        self.db_path = db_path or data_path("curriculum.db")
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS topic_graphs (
+                    syllabus_hash TEXT PRIMARY KEY,
+                    graph TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection, commit on success and always close it."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, syllabus_hash: str) -> Optional[TopicGraph]:
+        """Return the stored graph, or None if missing or from an older format."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT graph FROM topic_graphs WHERE syllabus_hash = ?", (syllabus_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return TopicGraph.from_dict(json.loads(row[0]))
+        except (ValueError, KeyError) as e:
+            print(f"[CurriculumStore] WARNING: discarding topic graph {syllabus_hash[:12]}: {e}")
+            self.delete(syllabus_hash)
+            return None
+
+    def save(self, syllabus_hash: str, graph: TopicGraph) -> None:
+        """Save (or replace) the graph of a syllabus (keyed by curriculum_engine.syllabus_hash)."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO topic_graphs VALUES (?, ?, ?)",
+                (syllabus_hash, json.dumps(graph.to_dict()), time.time())
+            )
+
+    def delete(self, syllabus_hash: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM topic_graphs WHERE syllabus_hash = ?", (syllabus_hash,))
@@ -0,0 +1,281 @@
+"""
+Question Bank - reusable quiz questions indexed by subject, chapter, topic and difficulty
+
+Every generated question is kept here so later quizzes on the same
+subject and chapter are served from the bank first and the LLM is only
+asked for the missing remainder. Per-class usage is recorded so a class
+is not given questions it saw recently.
+
+Each question also stores its MinHash signature and LSH band keys
+(engines/dedup_engine.py), so find_similar() looks up near-duplicates
+with indexed bucket queries instead of comparing against the whole bank.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from engines.dedup_engine import DUPLICATE_THRESHOLD, SIGNATURE_VERSION, MinHasher, band_keys, same_template
+from storage import data_path
+
+
+# A class does not get the same question again within this window
+RECENT_USE_DAYS = 30
+
+
+def _norm(value: Optional[str]) -> str:
+    return " ".join((value or "").split()).casefold()
+
+
+def question_id(subject: Optional[str], chapter: Optional[str], question: str) -> str:
+    """Stable ID of a question text within a subject and chapter."""
+    text = "\x1f".join((_norm(subject), _norm(chapter), _norm(question)))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    """SQLite-backed question bank with per-class usage history."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite file (default data/question_bank.db)
+        """
+        self.db_path = db_path or data_path("question_bank.db")
+        self._lock = threading.Lock()
+        self._hasher = MinHasher()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS questions (
+                    question_id TEXT PRIMARY KEY,
+                    subject TEXT NOT NULL,
+                    chapter TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    difficulty TEXT,
+                    question TEXT NOT NULL,
+                    use_count INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    minhash BLOB
+                )
+                """
+            )
+            # Banks created before near-duplicate detection
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(questions)")}
+            if "minhash" not in columns:
+                conn.execute("ALTER TABLE questions ADD COLUMN minhash BLOB")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_questions_lookup "
+                "ON questions (subject, chapter, topic, difficulty)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS question_usage (
+                    question_id TEXT NOT NULL,
+                    class_name TEXT NOT NULL,
+                    used_at REAL NOT NULL,
+                    PRIMARY KEY (question_id, class_name)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS question_bands (
+                    bucket TEXT NOT NULL,
+                    question_id TEXT NOT NULL,
+                    PRIMARY KEY (bucket, question_id)
+                )
+                """
+            )
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SIGNATURE_VERSION:
+                # Signatures from an older shingling scheme: recompute them all
+                conn.execute("UPDATE questions SET minhash = NULL")
+                conn.execute("DELETE FROM question_bands")
+                conn.execute(f"PRAGMA user_version = {SIGNATURE_VERSION}")
+            missing = conn.execute(
+                "SELECT question_id, question FROM questions WHERE minhash IS NULL"
+            ).fetchall()
+            self._index_rows(conn, [(qid, json.loads(q)["question"]) for qid, q in missing])
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection, commit on success and always close it."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(
+        self,
+        questions: Sequence[Dict],
+        subject: Optional[str],
+        chapter: Optional[str],
+        difficulty: Optional[str] = None
+    ) -> int:
+        """
+        Add questions (QuizQuestion dicts); ones already in the bank are kept as they are.
+
+        Returns:
+            Number of questions that were new
+        """
+        rows = [
+            (question_id(subject, chapter, q["question"]), _norm(subject), _norm(chapter),
+             _norm(q.get("topic")), _norm(difficulty) or None, json.dumps(q), time.time())
+            for q in questions
+        ]
+        with self._lock, self._connect() as conn:
+            known = {
+                row[0] for row in conn.execute(
+                    f"SELECT question_id FROM questions WHERE question_id IN ({','.join('?' for _ in rows)})",
+                    [row[0] for row in rows]
+                )
+            } if rows else set()
+            new_rows = list({row[0]: row for row in rows if row[0] not in known}.values())
+            conn.executemany(
+                "INSERT INTO questions "
+                "(question_id, subject, chapter, topic, difficulty, question, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                new_rows
+            )
+            self._index_rows(conn, [(row[0], json.loads(row[5])["question"]) for row in new_rows])
+            return len(new_rows)
+
+    def _index_rows(self, conn: sqlite3.Connection, rows: Sequence) -> None:
+        """Store signatures and LSH buckets for (question_id, question text) rows."""
+        signatures = self._hasher.signatures(text for _, text in rows)
+        conn.executemany(
+            "UPDATE questions SET minhash = ? WHERE question_id = ?",
+            [(sig.tobytes(), qid) for (qid, _), sig in zip(rows, signatures)]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO question_bands VALUES (?, ?)",
+            [(bucket, qid) for (qid, _), sig in zip(rows, signatures) for bucket in band_keys(sig)]
+        )
+
+    def find_similar(
+        self,
+        texts: Sequence[str],
+        subject: Optional[str],
+        chapter: Optional[str],
+        threshold: float = DUPLICATE_THRESHOLD
+    ) -> List[Optional[Dict]]:
+        """
+        For each text, a banked question (same subject and chapter) that
+        nearly duplicates it, or None. Banked questions that only differ in
+        their numbers (see same_template) do not count.
+        """
+        signatures = self._hasher.signatures(texts)
+        matches: List[Optional[Dict]] = []
+        with self._connect() as conn:
+            for text, signature in zip(texts, signatures):
+                buckets = band_keys(signature)
+                # CROSS JOIN keeps the bucket index lookup as the outer loop
+                rows = conn.execute(
+                    "SELECT DISTINCT q.question, q.minhash FROM question_bands b "
+                    "CROSS JOIN questions q ON q.question_id = b.question_id "
+                    f"WHERE b.bucket IN ({','.join('?' for _ in buckets)}) AND q.subject = ? AND q.chapter = ?",
+                    buckets + [_norm(subject), _norm(chapter)]
+                ).fetchall()
+                if not rows:
+                    matches.append(None)
+                    continue
+                candidates = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.uint64)
+                scores = (candidates.reshape(len(rows), -1) == signature).mean(axis=1)
+                match = None
+                for i in np.argsort(-scores, kind="stable"):
+                    if scores[i] < threshold:
+                        break
+                    question = json.loads(rows[i][0])
+                    if not same_template(text, question["question"]):
+                        match = question
+                        break
+                matches.append(match)
+        return matches
+
+    def select(
+        self,
+        subject: Optional[str],
+        chapter: Optional[str],
+        count: int,
+        topics: Optional[Sequence[str]] = None,
+        difficulty: Optional[str] = None,
+        class_name: Optional[str] = None,
+        recent_days: float = RECENT_USE_DAYS
+    ) -> List[Dict]:
+        """
+        Pick up to count questions for a new quiz.
+
+        Questions the class used within recent_days are skipped; the rest
+        are taken least-used first (random among equals), alternating
+        between topics so the quiz covers them evenly.
+
+        Args:
+            subject: Subject name
+            chapter: Chapter name
+            count: Questions wanted
+            topics: Only these topics (any topic if None)
+            difficulty: Only this difficulty (any if None)
+            class_name: Class the quiz is for
+            recent_days: Reuse window for the class
+
+        Returns:
+            QuizQuestion dicts (fewer than count if the bank runs short)
+        """
+        if count <= 0:
+            return []
+        clauses = ["q.subject = ?", "q.chapter = ?", "u.used_at IS NULL"]
+        params: List = [_norm(class_name), _norm(subject), _norm(chapter)]
+        if topics:
+            wanted = sorted({_norm(t) for t in topics})
+            clauses.append(f"q.topic IN ({','.join('?' for _ in wanted)})")
+            params.extend(wanted)
+        if difficulty:
+            clauses.append("q.difficulty = ?")
+            params.append(_norm(difficulty))
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT q.topic, q.question FROM questions q "
+                "LEFT JOIN question_usage u ON u.question_id = q.question_id "
+                "AND u.class_name = ? AND u.used_at >= ? "
+                f"WHERE {' AND '.join(clauses)} ORDER BY q.use_count, RANDOM()",
+                [params[0], time.time() - recent_days * 86400] + params[1:]
+            ).fetchall()
+
+        # Round-robin over topics, each topic's queue already least-used first
+        by_topic: Dict[str, List[str]] = {}
+        for topic, question in rows:
+            by_topic.setdefault(topic, []).append(question)
+        queues = list(by_topic.values())
+        picked: List[Dict] = []
+        depth = 0
+        while len(picked) < count and any(depth < len(q) for q in queues):
+            for queue in queues:
+                if depth < len(queue) and len(picked) < count:
+                    picked.append(json.loads(queue[depth]))
+            depth += 1
+        return picked
+
+    def mark_used(
+        self,
+        questions: Sequence[Dict],
+        subject: Optional[str],
+        chapter: Optional[str],
+        class_name: Optional[str]
+    ) -> None:
+        """Record that a class was given these questions (counts toward use_count either way)."""
+        ids = [(question_id(subject, chapter, q["question"]),) for q in questions]
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany("UPDATE questions SET use_count = use_count + 1 WHERE question_id = ?", ids)
+            if class_name:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO question_usage VALUES (?, ?, ?)",
+                    [(qid, _norm(class_name), now) for (qid,) in ids]
+                )
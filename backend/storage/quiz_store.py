@@ -0,0 +1,138 @@
+"""
+Quiz Store - persists generated quizzes with their question -> topic mapping
+
+Every quiz created by the orchestrator is saved under its form ID so that
+analytics can later join responses (by question position) to the key
+topics each question was generated for.
+"""
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from storage import data_path
+
+
+class QuizStore:
+    """SQLite-backed store of generated quizzes."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite file (default data/quizzes.db)
+        """
+        self.db_path = db_path or data_path("quizzes.db")
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS quizzes (
+                    quiz_id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    subject TEXT,
+                    chapter TEXT,
+                    key_topics TEXT NOT NULL,
+                    questions TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    class_name TEXT
+                )
+                """
+            )
+            # Stores created before quizzes were linked to a class
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(quizzes)")}
+            if "class_name" not in columns:
+                conn.execute("ALTER TABLE quizzes ADD COLUMN class_name TEXT")
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection, commit on success and always close it."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save_quiz(
+        self,
+        quiz_id: str,
+        title: str,
+        questions: List[Dict],
+        key_topics: Optional[List[str]] = None,
+        subject: Optional[str] = None,
+        chapter: Optional[str] = None,
+        class_name: Optional[str] = None
+    ) -> None:
+        """
+        Save (or replace) a quiz.
+
+        Args:
+            quiz_id: Form ID (or any unique quiz identifier)
+            title: Quiz title
+            questions: Question dicts (question, options, correct_answer, topic)
+            key_topics: Topics extracted by the Content Agent
+            subject: Subject name
+            chapter: Chapter name
+            class_name: Class the quiz was assigned to
+        """
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO quizzes "
+                "(quiz_id, title, subject, chapter, key_topics, questions, created_at, class_name) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (quiz_id, title, subject, chapter, json.dumps(key_topics or []),
+                 json.dumps(questions), time.time(), class_name)
+            )
+
+    def get_quiz(self, quiz_id: str) -> Optional[Dict]:
+        """Return the stored quiz dict, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT quiz_id, title, subject, chapter, key_topics, questions, created_at, class_name "
+                "FROM quizzes WHERE quiz_id = ?",
+                (quiz_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "quiz_id": row[0],
+            "title": row[1],
+            "subject": row[2],
+            "chapter": row[3],
+            "key_topics": json.loads(row[4]),
+            "questions": json.loads(row[5]),
+            "created_at": row[6],
+            "class_name": row[7]
+        }
+
+    def quiz_ids(self, class_name: Optional[str] = None) -> List[str]:
+        """IDs of all stored quizzes (optionally only one class's), newest first."""
+        with self._connect() as conn:
+            if class_name is None:
+                rows = conn.execute("SELECT quiz_id FROM quizzes ORDER BY created_at DESC").fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT quiz_id FROM quizzes WHERE class_name = ? ORDER BY created_at DESC", (class_name,)
+                ).fetchall()
+        return [row[0] for row in rows]
+
+    def question_topics(self, quiz_id: str) -> Optional[List[Optional[str]]]:
+        """Topic of each question, in question order (None if the quiz is unknown)."""
+        quiz = self.get_quiz(quiz_id)
+        if quiz is None:
+            return None
+        return [q.get("topic") for q in quiz["questions"]]
+
+    def question_topics_many(self, quiz_ids: List[str]) -> Dict[str, List[Optional[str]]]:
+        """question_topics() for many quizzes in one query."""
+        if not quiz_ids:
+            return {}
+        placeholders = ",".join("?" for _ in quiz_ids)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT quiz_id, questions FROM quizzes WHERE quiz_id IN ({placeholders})",
+                list(quiz_ids)
+            ).fetchall()
+        return {quiz_id: [q.get("topic") for q in json.loads(questions)] for quiz_id, questions in rows}
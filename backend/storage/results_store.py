@@ -0,0 +1,353 @@
+"""
+Results Store - columnar history of quiz responses for cross-quiz queries
+
+Responses are appended as immutable partitions, one directory of .npy
+column files per appended batch, and read back memory-mapped so trend and
+cohort queries touch only the columns and partitions they need:
+
+    results/<quiz_id>/<partition_id>/scores.npy      float32, percent score
+    results/<quiz_id>/<partition_id>/timestamps.npy  int64, epoch seconds (UTC)
+    results/<quiz_id>/<partition_id>/students.npy    unicode student IDs
+    results/<quiz_id>/<partition_id>/credit.npy      float32 rows x questions (optional)
+
+A SQLite catalog indexes partitions by subject, chapter, class and date
+range, so queries prune partitions before opening any file. Partitions
+appended with a source key (the reader position the rows start at) are
+unique per quiz and key: appending the same key again replaces the old
+partition, so re-reading rows after a failed ingestion does not store them
+twice.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from schemas.batches import ResultBatch
+from storage import data_path
+
+
+# Timestamp formats written by Forms response sheets and the Forms API
+_TIMESTAMP_FORMATS = ("%m/%d/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+
+class ResultPartition:
+    """Catalog entry for one partition; columns are memory-mapped on access."""
+
+    def __init__(self, partition_id: str, quiz_id: str, subject: Optional[str], chapter: Optional[str],
+                 class_name: Optional[str], date_min: int, date_max: int, rows: int, path: str):
+        self.partition_id = partition_id
+        self.quiz_id = quiz_id
+        self.subject = subject
+        self.chapter = chapter
+        self.class_name = class_name
+        self.date_min = date_min
+        self.date_max = date_max
+        self.rows = rows
+        self.path = path
+
+    def has_column(self, name: str) -> bool:
+        return os.path.exists(os.path.join(self.path, f"{name}.npy"))
+
+    def column(self, name: str) -> np.ndarray:
+        """Memory-mapped, read-only column array."""
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+    def date_mask(self, start=None, end=None) -> np.ndarray:
+        """Boolean mask of rows submitted in [start, end)."""
+        ts = self.column("timestamps")
+        mask = np.ones(ts.shape, dtype=bool)
+        if start is not None:
+            mask &= ts >= to_epoch(start)
+        if end is not None:
+            mask &= ts < to_epoch(end)
+        return mask
+
+
+class ResultsStore:
+    """Append-only columnar store of quiz responses with a SQLite partition catalog."""
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Store directory (default data/results)
+        """
+        self.root = root or os.path.dirname(data_path("results", "catalog.db"))
+        os.makedirs(self.root, exist_ok=True)
+        self.db_path = os.path.join(self.root, "catalog.db")
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS partitions (
+                    partition_id TEXT PRIMARY KEY,
+                    quiz_id TEXT NOT NULL,
+                    subject TEXT,
+                    chapter TEXT,
+                    class_name TEXT,
+                    date_min INTEGER NOT NULL,
+                    date_max INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    source_key TEXT
+                )
+                """
+            )
+            # Catalogs created before partitions were keyed by source position
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(partitions)")}
+            if "source_key" not in columns:
+                conn.execute("ALTER TABLE partitions ADD COLUMN source_key TEXT")
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_partitions_source ON partitions (quiz_id, source_key)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_partitions_subject ON partitions (subject, chapter)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_partitions_class ON partitions (class_name)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_partitions_date ON partitions (date_min, date_max)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_partitions_quiz ON partitions (quiz_id)")
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection, commit on success and always close it."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def append(
+        self,
+        quiz_id: str,
+        scores,
+        timestamps,
+        students: Optional[Sequence[str]] = None,
+        credit=None,
+        subject: Optional[str] = None,
+        chapter: Optional[str] = None,
+        class_name: Optional[str] = None,
+        source_key: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Append responses as a new partition.
+
+        Args:
+            quiz_id: Quiz (form or sheet) the responses belong to
+            scores: Percentage score per response
+            timestamps: Submission time per response (epoch seconds, datetime64,
+                or sheet/ISO timestamp strings)
+            students: Optional student ID per response
+            credit: Optional responses x questions credit matrix
+            subject: Subject name
+            chapter: Chapter name
+            class_name: Class / cohort name
+            source_key: Position of the rows in their source (e.g. the
+                reader cursor they start at); replaces the quiz's partition
+                with the same key instead of adding another
+
+        Returns:
+            Partition ID, or None if there was nothing to store
+        """
+        scores = np.asarray(scores, dtype=np.float32)
+        if scores.size == 0:
+            return None
+        seconds = _epoch_seconds(timestamps, scores.size)
+
+        partition_id = uuid.uuid4().hex[:16]
+        final_path = os.path.join(self.root, _safe_name(quiz_id), partition_id)
+        tmp_path = final_path + ".tmp"
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, "scores.npy"), scores)
+        np.save(os.path.join(tmp_path, "timestamps.npy"), seconds)
+        if students is not None:
+            np.save(os.path.join(tmp_path, "students.npy"), np.asarray([str(s) for s in students]))
+        if credit is not None:
+            np.save(os.path.join(tmp_path, "credit.npy"), np.asarray(credit, dtype=np.float32))
+        # Partitions become visible atomically: directory rename, then catalog row
+        os.replace(tmp_path, final_path)
+
+        replaced = []
+        with self._lock, self._connect() as conn:
+            if source_key is not None:
+                replaced = [row[0] for row in conn.execute(
+                    "SELECT partition_id FROM partitions WHERE quiz_id = ? AND source_key = ?", (quiz_id, source_key)
+                )]
+                conn.execute("DELETE FROM partitions WHERE quiz_id = ? AND source_key = ?", (quiz_id, source_key))
+            conn.execute(
+                "INSERT INTO partitions (partition_id, quiz_id, subject, chapter, class_name, date_min, date_max, "
+                "rows, source_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (partition_id, quiz_id, subject, chapter, class_name,
+                 int(seconds.min()), int(seconds.max()), int(scores.size), source_key)
+            )
+        for old_id in replaced:
+            shutil.rmtree(os.path.join(self.root, _safe_name(quiz_id), old_id), ignore_errors=True)
+        return partition_id
+
+    def append_batch(
+        self,
+        quiz_id: str,
+        batch: ResultBatch,
+        credit=None,
+        subject: Optional[str] = None,
+        chapter: Optional[str] = None,
+        class_name: Optional[str] = None,
+        source_key: Optional[str] = None
+    ) -> Optional[str]:
+        """Append the scorable rows of a ResultBatch (see append()); credit defaults to batch.credit."""
+        credit = batch.credit if credit is None else credit
+        valid = batch.valid()
+        if not valid.any():
+            return None
+        return self.append(
+            quiz_id,
+            batch.scores[valid],
+            [t for t, ok in zip(batch.timestamps, valid) if ok],
+            students=[s for s, ok in zip(batch.students, valid) if ok],
+            credit=None if credit is None else np.asarray(credit)[valid],
+            subject=subject,
+            chapter=chapter,
+            class_name=class_name,
+            source_key=source_key
+        )
+
+    def archive(
+        self,
+        batches: Iterable[ResultBatch],
+        quiz_id: str,
+        start=None,
+        **metadata
+    ) -> Iterator[ResultBatch]:
+        """
+        Pass batches through unchanged while appending each one to the store.
+
+        Each batch is keyed by the reader position it starts at (start for
+        the first batch, then the previous batch's cursor), so when a run
+        fails before its watermark is saved, the retry re-reads from the
+        same position and replaces those partitions instead of adding
+        duplicates. Batches without a cursor are appended unkeyed.
+
+        Args:
+            batches: ResultBatch iterable
+            quiz_id: Quiz the responses belong to
+            start: Reader position of the first batch (the stored watermark)
+            metadata: subject / chapter / class_name for append()
+        """
+        position = start
+        for batch in batches:
+            key = None if batch.cursor is None else json.dumps(position, sort_keys=True)
+            self.append_batch(quiz_id, batch, source_key=key, **metadata)
+            position = batch.cursor
+            yield batch
+
+    def partitions(
+        self,
+        subject: Optional[str] = None,
+        chapter: Optional[str] = None,
+        class_names: Optional[Sequence[str]] = None,
+        start=None,
+        end=None,
+        quiz_id: Optional[str] = None
+    ) -> List[ResultPartition]:
+        """
+        Catalog lookup: partitions matching the filters (all optional).
+
+        start/end (date, datetime, ISO string or epoch seconds) prune by the
+        partition's date range; rows are filtered exactly by scan().
+        """
+        clauses, params = [], []
+        for column, value in (("subject", subject), ("chapter", chapter), ("quiz_id", quiz_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if class_names:
+            clauses.append(f"class_name IN ({','.join('?' for _ in class_names)})")
+            params.extend(class_names)
+        if start is not None:
+            clauses.append("date_max >= ?")
+            params.append(to_epoch(start))
+        if end is not None:
+            clauses.append("date_min < ?")
+            params.append(to_epoch(end))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT partition_id, quiz_id, subject, chapter, class_name, date_min, date_max, rows "
+                f"FROM partitions {where} ORDER BY date_min",
+                params
+            ).fetchall()
+        return [
+            ResultPartition(*row, path=os.path.join(self.root, _safe_name(row[1]), row[0]))
+            for row in rows
+        ]
+
+    def scan(self, partitions: Sequence[ResultPartition], start=None, end=None) -> Dict[str, np.ndarray]:
+        """
+        Concatenate score and timestamp columns of partitions, filtered to [start, end).
+
+        Returns:
+            Dict with "scores" (float64), "timestamps" (epoch seconds) and
+            "partition" (index into partitions) per row
+        """
+        scores, timestamps, owner = [], [], []
+        for i, partition in enumerate(partitions):
+            mask = partition.date_mask(start, end)
+            count = int(mask.sum())
+            if count == 0:
+                continue
+            scores.append(np.asarray(partition.column("scores")[mask], dtype=np.float64))
+            timestamps.append(np.asarray(partition.column("timestamps")[mask]))
+            owner.append(np.full(count, i, dtype=np.int64))
+        if not scores:
+            return {"scores": np.zeros(0), "timestamps": np.zeros(0, dtype=np.int64),
+                    "partition": np.zeros(0, dtype=np.int64)}
+        return {"scores": np.concatenate(scores), "timestamps": np.concatenate(timestamps),
+                "partition": np.concatenate(owner)}
+
+
+def _safe_name(value: str) -> str:
+    """Filesystem-safe directory name for a quiz ID."""
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in value) or "_"
+
+
+def to_epoch(value) -> int:
+    """date / datetime / ISO string / number -> epoch seconds (naive values are UTC)."""
+    if isinstance(value, (int, float, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _parse_timestamp(value: str) -> Optional[int]:
+    try:
+        return to_epoch(value)
+    except ValueError:
+        pass
+    for fmt in _TIMESTAMP_FORMATS:
+        try:
+            return to_epoch(datetime.strptime(value, fmt))
+        except ValueError:
+            continue
+    return None
+
+
+def _epoch_seconds(timestamps, size: int) -> np.ndarray:
+    """Normalize a timestamp column to int64 epoch seconds (unparsable -> now)."""
+    array = np.asarray(timestamps)
+    if array.shape != (size,):
+        raise ValueError("timestamps must have one entry per score")
+    if np.issubdtype(array.dtype, np.datetime64):
+        return array.astype("datetime64[s]").astype(np.int64)
+    if np.issubdtype(array.dtype, np.number):
+        return array.astype(np.int64)
+    now = int(datetime.now(timezone.utc).timestamp())
+    parsed = [_parse_timestamp(str(t)) if t else None for t in array]
+    return np.array([now if t is None else t for t in parsed], dtype=np.int64)
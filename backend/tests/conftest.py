@@ -0,0 +1,11 @@
+"""Shared pytest setup: import modules from backend/ and keep data out of the repo."""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Stores default to data_path(); tests never write to backend/data
+os.environ.setdefault("EDUSPHERE_DATA_DIR", tempfile.mkdtemp(prefix="edusphere-tests-"))
@@ -0,0 +1,111 @@
+"""Running aggregates against the full-matrix statistics, and their persistence."""
+import json
+
+import numpy as np
+import pytest
+
+from agents.analytics_agent import analyze_quiz_batches
+from engines.analytics_engine import QuizAggregate, ResponseMatrix, ScoreAccumulator, item_analysis
+from schemas.batches import ResultBatch
+from storage.aggregate_store import AggregateStore
+
+
+def _responses(n_students=400, n_questions=10, seed=0):
+    """Rasch-like 0/1 credit with some unanswered cells."""
+    rng = np.random.default_rng(seed)
+    ability = rng.normal(size=n_students)
+    difficulty = rng.normal(size=n_questions)
+    credit = (rng.random((n_students, n_questions)) < 1 / (1 + np.exp(difficulty - ability[:, None]))).astype(float)
+    credit[rng.random(credit.shape) < 0.05] = np.nan
+    return credit
+
+
+def _aggregate(credit, batch=37):
+    aggregate = QuizAggregate()
+    for i in range(0, credit.shape[0], batch):
+        rows = credit[i:i + batch]
+        aggregate.update(np.nan_to_num(rows).mean(axis=1) * 100, rows)
+    return aggregate
+
+
+def test_item_statistics_match_full_matrix():
+    credit = _responses()
+    full = item_analysis(ResponseMatrix(credit))
+    running = _aggregate(credit).item_statistics()
+
+    assert running["cronbach_alpha"] == pytest.approx(full["cronbach_alpha"], abs=1e-4)
+    for expected, item in zip(full["items"], running["items"]):
+        assert item["difficulty"] == pytest.approx(expected["difficulty"], abs=1e-4)
+        assert item["point_biserial"] == pytest.approx(expected["point_biserial"], abs=1e-4)
+        # Band cut vs. an arbitrary tie order inside the full-matrix groups
+        assert item["discrimination"] == pytest.approx(expected["discrimination"], abs=0.03)
+
+
+def test_aggregate_round_trip_keeps_item_statistics():
+    aggregate = _aggregate(_responses(n_students=120, seed=3))
+    aggregate.watermark = {"row": 121}
+    restored = QuizAggregate.from_dict(json.loads(json.dumps(aggregate.to_dict())))
+
+    assert restored.item_statistics() == aggregate.item_statistics()
+    assert restored.scores.statistics() == aggregate.scores.statistics()
+    assert restored.watermark == {"row": 121}
+
+
+def test_stale_aggregate_version_is_rejected():
+    data = _aggregate(_responses(n_students=10)).to_dict()
+    data["version"] = 1
+    with pytest.raises(ValueError):
+        QuizAggregate.from_dict(data)
+
+
+def test_batch_summary_reports_item_statistics():
+    credit = _responses(n_students=60)
+    n = credit.shape[0]
+    batch = ResultBatch(
+        students=[f"s{i}" for i in range(n)],
+        timestamps=[""] * n,
+        points=np.nan_to_num(credit).sum(axis=1),
+        max_points=np.full(n, float(credit.shape[1])),
+        answers=np.full(credit.shape, "", dtype=object),
+        credit=credit
+    )
+    summary = analyze_quiz_batches([batch])
+
+    assert summary["reliability"]["cronbach_alpha"] == item_analysis(ResponseMatrix(credit))["cronbach_alpha"]
+    assert {"difficulty", "discrimination", "point_biserial"} <= set(summary["item_analysis"][0])
+
+
+def test_score_sketch_keeps_out_of_range_scores():
+    accumulator = ScoreAccumulator()
+    accumulator.update([104.5, 50.0, -2.0, np.nan])
+    restored = ScoreAccumulator.from_dict(json.loads(json.dumps(accumulator.to_dict())))
+
+    assert restored.count == 3
+    assert int(restored.hist.sum()) == 3
+    assert restored.max == 104.5 and restored.min == -2.0
+    assert restored.statistics() == accumulator.statistics()
+    assert sum(restored.statistics()["histogram"]["counts"]) == 3
+
+
+def test_score_accumulator_round_trip_and_merge():
+    rng = np.random.default_rng(7)
+    scores = rng.uniform(0, 100, 1000)
+    accumulator = ScoreAccumulator()
+    for chunk in np.array_split(scores, 7):
+        accumulator.update(chunk)
+    restored = ScoreAccumulator.from_dict(json.loads(json.dumps(accumulator.to_dict())))
+
+    assert restored.mean == pytest.approx(scores.mean())
+    assert restored.std() == pytest.approx(scores.std(ddof=1))
+    assert restored.percentile(50) == pytest.approx(np.percentile(scores, 50), abs=0.2)
+    assert ScoreAccumulator.from_dict(ScoreAccumulator().to_dict()).count == 0
+
+
+def test_aggregate_store_keeps_bonus_scores(tmp_path):
+    store = AggregateStore(str(tmp_path / "aggregates.db"))
+    aggregate = QuizAggregate()
+    aggregate.update([104.5, 80.0])
+    store.save("quiz", aggregate)
+
+    loaded = store.load("quiz")
+    assert loaded is not None and loaded.scores.count == 2
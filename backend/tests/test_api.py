@@ -0,0 +1,70 @@
+"""Orchestrator endpoints through FastAPI's TestClient (mock services, no network)."""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_health(client):
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.json()["status"] == "EduSphere AI Orchestrator is running"
+
+
+def test_auth_status(client):
+    body = client.get("/auth/status").json()
+    assert set(body) == {"forms_ready", "missing_scopes", "auth_url", "message"}
+    assert body["forms_ready"] == main.forms_service._is_ready
+
+
+def test_metrics_reset(client):
+    main.metrics.incr("test.api.counter")
+    assert client.get("/metrics").json()["counters"]["test.api.counter"] == 1
+    client.get("/metrics", params={"reset": True})
+    assert "test.api.counter" not in client.get("/metrics").json()["counters"]
+
+
+def test_orchestrate_quiz(client):
+    response = client.post("/orchestrate", json={"prompt": "Create a 5 question quiz from chapter 2 physics notes"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"], body
+    assert body["data"]["intent"]["intent_type"] == "quiz_creation"
+    assert body["data"]["form_id"] == "mock_form_id"
+
+
+def test_grade_stored_quiz(client):
+    main.quiz_store.save_quiz("test-grade", "Grading", [
+        {"question": "2 + 2?", "options": ["3", "4", "5", "6"], "correct_answer": "4", "topic": "Addition"},
+        {"question": "3 x 3?", "options": ["6", "8", "9", "12"], "correct_answer": "9", "topic": "Multiplication"},
+    ])
+    response = client.post("/quizzes/test-grade/grade", json={
+        "answers": [["4", "9"], ["B", "A"], [None, "9"]],
+        "student_ids": ["ana", "ben", "cal"]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert [s["score"] for s in body["students"]] == [100.0, 50.0, 50.0]
+    assert body["questions"][0]["unanswered"] == 1
+    assert body["analytics"]["statistics"]["total_students"] == 3
+
+
+def test_grade_rejects_mismatched_students(client):
+    main.quiz_store.save_quiz("test-grade-ids", "Grading", [
+        {"question": "2 + 2?", "options": ["3", "4"], "correct_answer": "4"},
+    ])
+    response = client.post("/quizzes/test-grade-ids/grade", json={"answers": [["4"]], "student_ids": ["a", "b"]})
+    assert response.status_code == 400
+    assert client.post("/quizzes/missing/grade", json={"answers": []}).status_code == 404
+
+
+def test_cohorts_without_history(client):
+    response = client.get("/analytics/cohorts", params={"subject": "Nonexistent"})
+    assert response.status_code == 200
+    assert response.json() == {}
@@ -0,0 +1,94 @@
+import asyncio
+import io
+import json
+import threading
+import urllib.error
+
+import pytest
+
+from utils import auth
+
+
+class _Response(io.BytesIO):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def tokeninfo(monkeypatch):
+    """Stub tokeninfo: records calls and answers from a token -> info/status map."""
+    calls = []
+    answers = {}
+
+    def urlopen(url, timeout=None):
+        calls.append((url, threading.current_thread().name))
+        token = url.split("access_token=", 1)[1]
+        answer = answers.get(token, 400)
+        if isinstance(answer, int):
+            raise urllib.error.HTTPError(url, answer, "error", {}, None)
+        return _Response(json.dumps(answer).encode("utf-8"))
+
+    monkeypatch.setattr(auth.urllib.request, "urlopen", urlopen)
+    monkeypatch.delenv("AUTH_DEV_MODE", raising=False)
+    monkeypatch.setattr(auth, "_validator", auth.TokenValidator(tokeninfo_url="http://tokeninfo.test"))
+    return calls, answers
+
+
+def test_valid_token_is_cached(tokeninfo):
+    calls, answers = tokeninfo
+    answers["good"] = {"scope": "a b", "expires_in": "3600", "azp": "client"}
+
+    first = auth.get_google_credentials("good")
+    second = auth.get_google_credentials("good")
+
+    assert first == second == {"token": "good", "scopes": ["a", "b"], "expires_in": 3600}
+    assert len(calls) == 1
+
+
+def test_invalid_token_is_negatively_cached(tokeninfo):
+    calls, _ = tokeninfo
+
+    assert auth.get_google_credentials("bad") is None
+    assert auth.get_google_credentials("bad") is None
+    assert len(calls) == 1
+
+
+def test_server_errors_are_not_cached(tokeninfo):
+    calls, answers = tokeninfo
+    answers["flaky"] = 503
+
+    assert auth.get_google_credentials("flaky") is None
+    answers["flaky"] = {"scope": "a", "expires_in": "3600"}
+    assert auth.get_google_credentials("flaky")["scopes"] == ["a"]
+    assert len(calls) == 2
+
+
+def test_async_validation_runs_tokeninfo_off_the_event_loop(tokeninfo):
+    calls, answers = tokeninfo
+    answers["good"] = {"scope": "a", "expires_in": "3600"}
+
+    async def run():
+        loop_thread = threading.current_thread().name
+        first = await auth.get_google_credentials_async("good")
+        # Second call is answered from the cache without another request
+        second = await auth.get_google_credentials_async("good")
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(run())
+    assert first == second
+    assert len(calls) == 1
+    assert calls[0][1] != loop_thread
+
+
+def test_dev_mode_accepts_any_token_without_validation(tokeninfo, monkeypatch):
+    calls, _ = tokeninfo
+    monkeypatch.setenv("AUTH_DEV_MODE", "1")
+
+    creds = auth.get_google_credentials("fake-dev-token")
+    assert creds["token"] == "fake-dev-token"
+    assert creds["scopes"] == auth.DEV_SCOPES
+    assert asyncio.run(auth.get_google_credentials_async("fake-dev-token")) == creds
+    assert calls == []
@@ -0,0 +1,89 @@
+"""Near-duplicate detection on reworded and distinct question pairs."""
+import pytest
+
+from engines.dedup_engine import MinHasher, NearDuplicateDetector, dedupe, same_template, shingles
+from storage.question_bank import QuestionBank
+
+
+REWORDINGS = [
+    ("What is the role of the mitochondria in a cell?", "What role do mitochondria play in a cell?"),
+    ("Which organelle is known as the powerhouse of the cell?", "Which organelle is called the powerhouse of the cell?"),
+    ("What is Newton's second law of motion?", "What does Newton's second law of motion state?"),
+    ("Which of the following best describes the process of osmosis?", "Which of the following best describes osmosis?"),
+    ("What is the SI unit of electrical resistance?", "What is the unit of electrical resistance in the SI system?"),
+    ("How does increasing temperature affect the rate of a chemical reaction?",
+     "How does an increase in temperature affect the rate of a chemical reaction?"),
+    ("According to Coulomb's law, how does the force between two charges change when the distance between them "
+     "is doubled?", "According to Coulomb's law, what happens to the force between two charges if the distance "
+     "between them doubles?"),
+    ("Which law states that energy cannot be created or destroyed?",
+     "Which law states that energy can neither be created nor destroyed?"),
+    ("What is the function of red blood cells?", "What is the main function of red blood cells?"),
+    ("What does Gauss's law relate the electric flux through a closed surface to?",
+     "Gauss's law relates the electric flux through a closed surface to what quantity?"),
+    ("Which process do plants use to convert light energy into chemical energy?",
+     "What process do plants use to convert light energy into chemical energy?"),
+    ("What are the three states of matter?", "What are the 3 states of matter?"),
+]
+
+DISTINCT = [
+    ("Which of the following best describes osmosis?", "Which of the following best describes diffusion?"),
+    ("Where does photosynthesis take place in a plant cell?", "Where does respiration take place in a plant cell?"),
+    ("What is Newton's first law of motion?", "What is Newton's third law of motion?"),
+    ("How does increasing temperature affect the rate of a chemical reaction?",
+     "How does increasing concentration affect the rate of a chemical reaction?"),
+    ("What does Coulomb's law describe?", "What does Gauss's law describe?"),
+    ("What is the main function of the heart?", "What is the main function of the kidneys?"),
+]
+
+SAME_TEMPLATE = [
+    ("A 2 kg mass accelerates at 3 m/s^2. What net force acts on it?",
+     "A 5 kg mass accelerates at 3 m/s^2. What net force acts on it?"),
+    ("Two charges of 2 uC are 3 m apart. What is the force between them?",
+     "Two charges of 2 uC are 6 m apart. What is the force between them?"),
+    ("What is 12 + 7?", "What is 12 + 9?"),
+]
+
+
+@pytest.mark.parametrize("a, b", REWORDINGS)
+def test_rewordings_are_duplicates(a, b):
+    assert dedupe([a, b]) == [0]
+
+
+@pytest.mark.parametrize("a, b", DISTINCT + SAME_TEMPLATE)
+def test_distinct_questions_are_kept(a, b):
+    assert dedupe([a, b]) == [0, 1]
+
+
+def test_same_template():
+    for a, b in SAME_TEMPLATE:
+        assert same_template(a, b)
+    assert not same_template("What are the three states of matter?", "What are the 3 states of matter?")
+    assert not same_template(*DISTINCT[0])
+
+
+def test_shingles_ignore_question_wording():
+    assert shingles("Which of the following best describes osmosis?") == {"osmosi"}
+    assert shingles("What is it?") == {"what", "is", "it"}
+
+
+def test_detector_keeps_first_of_each_group():
+    texts = [a for a, _ in REWORDINGS] + [b for _, b in REWORDINGS] + [b for _, b in SAME_TEMPLATE]
+    detector = NearDuplicateDetector()
+    kept = [i for i, text in enumerate(texts) if detector.add_if_new(text)]
+    assert kept == list(range(len(REWORDINGS))) + list(range(2 * len(REWORDINGS), len(texts)))
+
+
+def test_bank_matches_rewordings_not_template_variants(tmp_path):
+    bank = QuestionBank(str(tmp_path / "bank.db"))
+    stored = [REWORDINGS[0][0], SAME_TEMPLATE[0][0]]
+    bank.add([{"question": t, "options": ["a", "b"], "correct_answer": "a"} for t in stored], "Biology", "Cells")
+
+    matches = bank.find_similar([REWORDINGS[0][1], SAME_TEMPLATE[0][1], DISTINCT[1][0]], "Biology", "Cells")
+    assert matches[0]["question"] == stored[0]
+    assert matches[1:] == [None, None]
+
+
+def test_signatures_are_deterministic():
+    a, b = MinHasher(), MinHasher()
+    assert (a.signature(REWORDINGS[0][0]) == b.signature(REWORDINGS[0][0])).all()
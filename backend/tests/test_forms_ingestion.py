@@ -0,0 +1,88 @@
+"""Incremental ingestion: the watermark never double counts or drops responses."""
+import pytest
+
+from services.forms_ingestion import FormsIngestion
+from services.forms_service import FormsService
+from storage.aggregate_store import AggregateStore
+from storage.quiz_store import QuizStore
+from storage.results_store import ResultsStore
+from utils.rate_limit import RateLimiter
+
+
+FORM = {"items": [
+    {"questionItem": {"question": {"questionId": "q1"}}},
+    {"questionItem": {"question": {"questionId": "q2"}}},
+]}
+
+
+class StubForms(FormsService):
+    """Serves FORM and a growing response list with the API's inclusive "timestamp >=" filter."""
+
+    def __init__(self):
+        super().__init__()
+        self._is_ready = True
+        self.missing_scopes = []
+        self.responses = []
+        self.requested_since = []
+
+    def get_form(self, form_id, rate_limiter=None):
+        return FORM
+
+    def iter_response_pages(self, form_id, since=None, page_size=2, rate_limiter=None):
+        self.requested_since.append(since)
+        rows = [r for r in self.responses if since is None or r["lastSubmittedTime"] >= since]
+        for i in range(0, len(rows), page_size):
+            yield rows[i:i + page_size]
+
+
+def _response(response_id, ts, a1, a2):
+    return {
+        "responseId": response_id,
+        "lastSubmittedTime": ts,
+        "answers": {
+            "q1": {"textAnswers": {"answers": [{"value": a1}]}},
+            "q2": {"textAnswers": {"answers": [{"value": a2}]}},
+        }
+    }
+
+
+@pytest.fixture
+def ingestion(tmp_path):
+    quizzes = QuizStore(str(tmp_path / "quizzes.db"))
+    quizzes.save_quiz("form", "Quiz", [
+        {"question": "2 + 2?", "options": ["3", "4"], "correct_answer": "4", "topic": "Addition"},
+        {"question": "3 x 3?", "options": ["6", "9"], "correct_answer": "9", "topic": "Multiplication"},
+    ])
+    return FormsIngestion(
+        StubForms(), quizzes, AggregateStore(str(tmp_path / "aggregates.db")),
+        ResultsStore(str(tmp_path / "results")), rate_limiter=RateLimiter.per_minute(6000, burst=100), page_size=2
+    )
+
+
+def test_polls_ingest_each_response_once(ingestion):
+    forms = ingestion.forms_service
+    forms.responses = [
+        _response("r1", "2024-01-01T10:00:00Z", "4", "9"),
+        _response("r2", "2024-01-01T10:05:00Z", "3", "9"),
+        _response("r3", "2024-01-01T10:05:00Z", "4", "6"),
+    ]
+    first = ingestion.poll_form("form")
+    assert first["ingested"] == 3 and first["watermark"] == "2024-01-01T10:05:00Z"
+
+    # A response at exactly the watermark time arrives after the first poll
+    forms.responses += [_response("r4", "2024-01-01T10:05:00Z", "3", "6"), _response("r5", "2024-01-01T11:00:00Z", "4", "9")]
+    second = ingestion.poll_form("form")
+    assert second["ingested"] == 2 and second["total_responses"] == 5
+    assert forms.requested_since == [None, "2024-01-01T10:05:00Z"]
+
+    assert ingestion.poll_form("form")["ingested"] == 0
+    scores = ingestion.results_store.scan(ingestion.results_store.partitions(quiz_id="form"))["scores"]
+    assert sorted(scores.tolist()) == [0.0, 50.0, 50.0, 100.0, 100.0]
+
+
+def test_failed_form_is_reported(ingestion):
+    def broken(form_id, rate_limiter=None):
+        raise RuntimeError("quota exceeded")
+
+    ingestion.forms_service.get_form = broken
+    assert ingestion.poll_forms(["form"]) == [{"form_id": "form", "ingested": 0, "error": "quota exceeded"}]
@@ -0,0 +1,37 @@
+"""Tolerant parsing of LLM JSON replies."""
+import pytest
+
+from utils.json_repair import loads_lenient, salvage_items, strip_trailing_commas
+
+
+def test_fences_prose_and_trailing_commas():
+    text = 'Sure! ```json\n[{"question": "Q1?", "options": ["a", "b",],},]\n``` Hope this helps.'
+    assert loads_lenient(text) == [{"question": "Q1?", "options": ["a", "b"]}]
+
+
+def test_truncated_array_is_closed_at_last_complete_element():
+    text = '[{"question": "Q1?"}, {"question": "Q2?"}, {"question": "Q3'
+    assert loads_lenient(text) == [{"question": "Q1?"}, {"question": "Q2?"}]
+    with pytest.raises(ValueError):
+        loads_lenient(text, truncated=False)
+
+
+def test_no_json_raises():
+    with pytest.raises(ValueError):
+        loads_lenient("I cannot help with that.")
+
+
+def test_salvage_keeps_finished_items():
+    text = '[{"question": "Q1?"}, {"question": "Q2?" "broken"}, {"question": "Q3?"}, {"question": "Q4'
+    assert salvage_items(text) == [{"question": "Q1?"}, {"question": "Q3?"}]
+
+
+def test_salvage_skips_bracketed_prose():
+    text = 'Here are [2] questions: [{"question": "Q1?"}, {"question": "Q2?"}]'
+    assert loads_lenient(text) == [2]
+    assert salvage_items(text) == [{"question": "Q1?"}, {"question": "Q2?"}]
+    assert salvage_items("no array here") == []
+
+
+def test_commas_inside_strings_are_kept():
+    assert strip_trailing_commas('{"a": "x,]", "b": [1, 2,],}') == '{"a": "x,]", "b": [1, 2]}'
@@ -0,0 +1,51 @@
+"""Offload pools: routing by tag and bounded queues."""
+import asyncio
+import threading
+
+import pytest
+
+from agents.content_agent import extract_content
+from agents.learning_agent import generate_class_plans, generate_learning_plan
+from agents.quiz_agent import generate_quiz
+from utils.metrics import metrics
+from utils.offload import IO, OffloadPool, OffloadRejected, cpu_bound, io_bound
+
+
+@io_bound()
+def _wait(event: threading.Event) -> str:
+    event.wait(5)
+    return threading.current_thread().name
+
+
+@cpu_bound("thread")
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+def test_llm_agents_run_on_the_io_pool():
+    for fn in (generate_quiz, extract_content, generate_learning_plan, generate_class_plans):
+        assert fn.__offload__ == IO
+
+
+def test_waiting_io_work_leaves_the_cpu_pool_free():
+    pool = OffloadPool(thread_workers=1, process_workers=1, max_queue=0, io_workers=2)
+    release = threading.Event()
+
+    async def scenario():
+        waiting = [asyncio.ensure_future(pool.run(_wait, release)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(OffloadRejected):
+            await pool.run(_wait, release)
+        # The single CPU thread is still available while both I/O workers wait
+        cpu_thread = await asyncio.wait_for(pool.run(_thread_name), 2)
+        release.set()
+        return cpu_thread, await asyncio.gather(*waiting)
+
+    try:
+        cpu_thread, io_threads = asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+    assert cpu_thread.startswith("offload_")
+    assert all(name.startswith("offload-io") for name in io_threads)
+    assert metrics.snapshot("offload._wait")["counters"]["offload._wait.io"] >= 2
@@ -0,0 +1,100 @@
+"""Quiz generation: bank reuse, duplicate handling and fallbacks."""
+import json
+
+import pytest
+
+from agents.quiz_agent import generate_quiz
+from services.gemini_service import GeminiService
+from services.llm_backends import LLMBackend, LLMError
+from storage.question_bank import QuestionBank
+
+
+class ScriptedBackend(LLMBackend):
+    """Returns the scripted replies in order, then fails like an unreachable model."""
+
+    name = "scripted"
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def generate(self, prompt, model=None):
+        self.calls += 1
+        if not self.replies:
+            raise LLMError("model unavailable", status=503)
+        return self.replies.pop(0)
+
+
+def _question(text, topic="Waves"):
+    return {"question": text, "options": ["a", "b", "c", "d"], "correct_answer": "a", "topic": topic}
+
+
+def _reply(*texts):
+    return json.dumps([_question(t) for t in texts])
+
+
+@pytest.fixture
+def bank(tmp_path):
+    return QuestionBank(str(tmp_path / "bank.db"))
+
+
+def _banked(bank):
+    return [q["question"] for q in bank.select("Physics", "Chapter 1", 100, recent_days=0)]
+
+
+def _quiz(replies, bank, n=3, topics=("Waves",)):
+    service = GeminiService(backend=ScriptedBackend(replies))
+    return generate_quiz("content", n, service, list(topics), bank=bank, subject="Physics", chapter="Chapter 1",
+                         class_name="7A")
+
+
+def test_unavailable_model_is_padded_and_never_banked(bank):
+    service = GeminiService(backend=ScriptedBackend([]))
+    assert service.generate_quiz_questions("content", 3) is None
+
+    quiz = _quiz([], bank)
+    assert [q.question for q in quiz.questions] == ["Sample question 1?", "Sample question 2?", "Sample question 3?"]
+    assert all(q.topic == "Waves" for q in quiz.questions)
+    assert _banked(bank) == []
+
+
+def test_questions_after_bracketed_prose_are_salvaged(bank):
+    texts = ["What is the SI unit of frequency?", "How is the period of a wave related to its frequency?"]
+    quiz = _quiz([f"Here are [2] questions: {_reply(*texts)}"], bank, n=2)
+    assert [q.question for q in quiz.questions] == texts
+
+
+def test_in_quiz_duplicates_are_not_served(bank):
+    repeated = "What happens to the wavelength of a wave when its frequency doubles at constant speed?"
+    quiz = _quiz([_reply(repeated, repeated, repeated)] * 3, bank)
+
+    texts = [q.question for q in quiz.questions]
+    assert len(texts) == 3
+    assert texts.count(repeated) == 1
+    assert texts[1:] == ["Sample question 2?", "Sample question 3?"]
+    assert _banked(bank) == [repeated]
+
+
+def test_bank_clashes_fill_short_quizzes(bank):
+    banked = "Which property of light explains why a straw looks bent in a glass of water?"
+    bank.add([_question(banked, topic="Optics")], "Physics", "Chapter 1")
+    reworded = "Which property of light explains why a straw looks bent in a glass of water??"
+    fresh = "How does the amplitude of a sound wave relate to the loudness we perceive?"
+
+    quiz = _quiz([_reply(fresh, reworded)], bank, n=2)
+    # The banked original is outside the requested topics, so the close rewording is served
+    assert [q.question for q in quiz.questions] == [fresh, reworded]
+    assert sorted(_banked(bank)) == sorted([banked, fresh])
+
+
+def test_banked_questions_come_first(bank):
+    stored = [
+        "What is the SI unit of frequency?",
+        "How is the period of a wave related to its frequency?",
+    ]
+    bank.add([_question(t) for t in stored], "Physics", "Chapter 1")
+    backend_reply = _reply("What determines the speed of a wave on a stretched string?")
+
+    quiz = _quiz([backend_reply], bank, n=3)
+    assert sorted(q.question for q in quiz.questions[:2]) == sorted(stored)
+    assert quiz.questions[2].question == "What determines the speed of a wave on a stretched string?"
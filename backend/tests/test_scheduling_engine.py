@@ -0,0 +1,83 @@
+"""Deadline-first placement of tasks into working time."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from agents.workflow_agent import optimize_schedule
+from engines.scheduling_engine import IntervalSet, WorkingHours, parse_due, parse_duration, schedule_tasks
+
+
+# A Monday
+MONDAY = datetime(2024, 1, 8, 9, 0)
+
+
+def _task(name, minutes, due=None, priority="medium", not_before=None):
+    return {"task": name, "duration_minutes": minutes, "priority": priority, "due": due, "not_before": not_before}
+
+
+@pytest.mark.parametrize("text, minutes", [
+    ("1h 30m", 90), ("2 hours", 120), ("45 min", 45), ("an hour", 60), ("1:15", 75), (30, 30), ("soon", 60), (-5, 60),
+])
+def test_parse_duration(text, minutes):
+    assert parse_duration(text) == minutes
+
+
+def test_parse_due_bare_date_is_end_of_day():
+    assert parse_due("2024-01-08") == datetime(2024, 1, 8, 23, 59)
+    assert parse_due("not a date") is None
+
+
+def test_earliest_deadline_first_with_priority_tie_break():
+    due = MONDAY + timedelta(days=2)
+    placed = schedule_tasks([
+        _task("later", 60, due=due + timedelta(days=1), priority="high"),
+        _task("low", 60, due=due, priority="low"),
+        _task("high", 60, due=due, priority="high"),
+        _task("undated", 60, priority="high"),
+    ], MONDAY)
+    assert [t["task"] for t in placed] == ["high", "low", "later", "undated"]
+    assert [t["start"].hour for t in placed] == [9, 10, 11, 13]
+
+
+def test_tasks_split_around_breaks_busy_slots_and_weekends():
+    friday = MONDAY + timedelta(days=4)
+    busy = [(friday.replace(hour=14), friday.replace(hour=16))]
+    placed = schedule_tasks([_task("essay", 300)], friday.replace(hour=10), busy=busy)
+
+    assert placed[0]["blocks"] == [
+        (friday.replace(hour=10), friday.replace(hour=12)),
+        (friday.replace(hour=13), friday.replace(hour=14)),
+        (friday.replace(hour=16), friday.replace(hour=17)),
+        (MONDAY + timedelta(days=7), MONDAY + timedelta(days=7, hours=1)),
+    ]
+
+
+def test_late_tasks_are_flagged_and_release_times_respected():
+    placed = schedule_tasks([
+        _task("urgent", 120, due=MONDAY + timedelta(hours=1)),
+        _task("afternoon", 30, not_before=MONDAY.replace(hour=15)),
+    ], MONDAY, buffer_minutes=10)
+    assert placed[0]["late"] and placed[0]["end"] == MONDAY.replace(hour=11)
+    assert placed[1]["start"] == MONDAY.replace(hour=15) and not placed[1]["late"]
+
+
+def test_interval_set_merges_overlaps():
+    busy = IntervalSet([(MONDAY, MONDAY + timedelta(hours=1)), (MONDAY + timedelta(minutes=30), MONDAY + timedelta(hours=2))])
+    busy.add(MONDAY + timedelta(hours=2), MONDAY + timedelta(hours=3))
+    assert busy.intervals() == [(MONDAY, MONDAY + timedelta(hours=3))]
+    assert busy.next_free(MONDAY + timedelta(minutes=10)) == MONDAY + timedelta(hours=3)
+
+
+def test_working_hours_without_time_are_rejected():
+    with pytest.raises(ValueError):
+        WorkingHours(workdays=())
+
+
+def test_optimize_schedule_uses_deadlines():
+    result = optimize_schedule(
+        [{"name": "Grade", "duration": "1 hour", "priority": "low"}, {"name": "Plan", "duration": "30 min"}],
+        [{"task_name": "Grade", "due_date": "2024-01-08"}],
+        start=MONDAY.isoformat()
+    )
+    assert [t["task"] for t in result["schedule"]] == ["Grade", "Plan"]
+    assert result["late_tasks"] == 0 and result["schedule"][0]["start"] == MONDAY.isoformat()
@@ -1,43 +1,205 @@
 """
 Authentication utilities for Google OAuth2
 
-For MVP: Simplified authentication handling
-For Production: Full OAuth2 flow implementation
+Access tokens from the frontend are validated against Google's tokeninfo
+endpoint. Results are cached so that only the first request carrying a
+token pays for the round trip:
+- Valid tokens are cached until shortly before they expire
+- Invalid tokens are cached briefly (negative caching)
+- Concurrent requests with the same token share one validation call
+
+Async handlers use validate_async()/get_google_credentials_async(), which
+answer from the cache on the event loop and run tokeninfo calls in a
+worker thread. AUTH_DEV_MODE=1 accepts any token without validation (local
+development with fake tokens).
 """
 from typing import Optional, Dict
+import asyncio
+import hashlib
+import json
+import logging
 import os
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from utils.cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+TOKENINFO_URL = "https://oauth2.googleapis.com/tokeninfo"
+
+# Stop trusting a cached token this many seconds before Google expires it
+EXPIRY_SKEW_SECONDS = 30
+# Re-check valid tokens at least this often so revocations are noticed
+MAX_POSITIVE_TTL_SECONDS = 300
+# How long an invalid token is remembered as invalid
+NEGATIVE_TTL_SECONDS = 60
+
+# Scopes granted to any token in AUTH_DEV_MODE
+DEV_SCOPES = [
+    "https://www.googleapis.com/auth/classroom.readonly",
+    "https://www.googleapis.com/auth/forms",
+    "https://www.googleapis.com/auth/documents.readonly",
+    "https://www.googleapis.com/auth/spreadsheets.readonly",
+    "https://www.googleapis.com/auth/calendar"
+]
+
+_UNSET = object()
+
+
+def dev_mode() -> bool:
+    """True if AUTH_DEV_MODE accepts tokens without validation."""
+    return os.getenv("AUTH_DEV_MODE", "").lower() in ("1", "true", "yes")
+
+
+class TokenValidator:
+    """Validates OAuth2 access tokens with a TTL cache in front of tokeninfo."""
+
+    def __init__(
+        self,
+        tokeninfo_url: Optional[str] = None,
+        timeout: float = 5.0,
+        max_positive_ttl: float = MAX_POSITIVE_TTL_SECONDS,
+        negative_ttl: float = NEGATIVE_TTL_SECONDS,
+        maxsize: int = 10000
+    ):
+        """
+        Initialize validator.
+
+        Args:
+            tokeninfo_url: Override for the tokeninfo endpoint
+                (defaults to GOOGLE_TOKENINFO_URL env var, then Google's)
+            timeout: HTTP timeout in seconds for tokeninfo calls
+            max_positive_ttl: Upper bound on how long a valid token is cached
+            negative_ttl: How long an invalid token is cached
+            maxsize: Maximum number of cached tokens
+        """
+        self.tokeninfo_url = tokeninfo_url or os.getenv("GOOGLE_TOKENINFO_URL") or TOKENINFO_URL
+        self.timeout = timeout
+        self.max_positive_ttl = max_positive_ttl
+        self.negative_ttl = negative_ttl
+        self._cache = TTLCache(maxsize=maxsize, default_ttl=negative_ttl)
+
+    def validate(self, token: str) -> Optional[Dict]:
+        """
+        Validate a token, using the cache when warm.
+
+        Args:
+            token: OAuth2 access token
+
+        Returns:
+            Token info dict (scopes, expires_in, ...) or None if invalid
+        """
+        key = _token_key(token)
+        return self._cache.get_or_load(key, lambda: self._fetch_tokeninfo(token))
+
+    async def validate_async(self, token: str) -> Optional[Dict]:
+        """validate() for async handlers: cache hits stay on the loop, misses run in a thread."""
+        cached = self._cache.get(_token_key(token), _UNSET)
+        if cached is not _UNSET:
+            return cached
+        return await asyncio.to_thread(self.validate, token)
+
+    def invalidate(self, token: str) -> None:
+        """Forget a token (e.g. after a 401 from a Google API)."""
+        self._cache.invalidate(_token_key(token))
+
+    def _fetch_tokeninfo(self, token: str):
+        """Call tokeninfo. Returns (info_or_None, ttl) for the cache."""
+        url = f"{self.tokeninfo_url}?{urllib.parse.urlencode({'access_token': token})}"
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as resp:
+                info = json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            if 400 <= e.code < 500:
+                # Google rejected the token: remember that for a while
+                return None, self.negative_ttl
+            logger.warning("Token validation error: HTTP %s", e.code)
+            return None, 0
+        except Exception as e:
+            # Network problem: do not cache, the next request retries
+            logger.warning("Token validation error: %s", e)
+            return None, 0
+
+        try:
+            expires_in = float(info.get("expires_in", 0))
+        except (TypeError, ValueError):
+            expires_in = 0
+        ttl = min(expires_in - EXPIRY_SKEW_SECONDS, self.max_positive_ttl)
+        if ttl <= 0:
+            return None, self.negative_ttl
+
+        return {
+            "scopes": info.get("scope", "").split(),
+            "expires_in": int(expires_in),
+            "email": info.get("email"),
+            "client_id": info.get("azp") or info.get("aud")
+        }, ttl
+
+
+def _token_key(token: str) -> str:
+    # Key by digest so raw tokens are not kept around as dict keys
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+_validator: Optional[TokenValidator] = None
+
+
+def get_token_validator() -> TokenValidator:
+    """Return the process-wide TokenValidator."""
+    global _validator
+    if _validator is None:
+        _validator = TokenValidator()
+    return _validator
 
 
 def get_google_credentials(token: Optional[str] = None) -> Optional[Dict]:
     """
     Get Google OAuth2 credentials.
-    
-    For MVP: Returns mock credentials structure
-    For Production: Validates and returns real OAuth2 credentials
-    
+
+    Validates the token with Google (cached, see TokenValidator) and
+    returns a credentials structure with the granted scopes. Blocks on a
+    cache miss; async handlers use get_google_credentials_async().
+
     Args:
         token: OAuth2 access token from frontend
-        
+
     Returns:
         Credentials dictionary (or None if invalid)
     """
+    if token and not dev_mode():
+        return _credentials(token, get_token_validator().validate(token))
+    return _unvalidated_credentials(token)
+
+
+async def get_google_credentials_async(token: Optional[str] = None) -> Optional[Dict]:
+    """get_google_credentials() without blocking the event loop."""
+    if token and not dev_mode():
+        return _credentials(token, await get_token_validator().validate_async(token))
+    return _unvalidated_credentials(token)
+
+
+def _credentials(token: str, info: Optional[Dict]) -> Optional[Dict]:
+    if info is None:
+        return None
+    return {
+        "token": token,
+        "scopes": info["scopes"],
+        "expires_in": info["expires_in"]
+    }
+
+
+def _unvalidated_credentials(token: Optional[str]) -> Optional[Dict]:
+    """Dev-mode credentials for any token, else the GOOGLE_TEST_TOKEN ones."""
     if token:
-        # MVP: Accept any token (mock mode)
-        # Production: Validate token with Google OAuth2
-        return {
-            "token": token,
-            "scopes": [
-                "https://www.googleapis.com/auth/classroom.readonly",
-                "https://www.googleapis.com/auth/forms",
-                "https://www.googleapis.com/auth/documents.readonly",
-                "https://www.googleapis.com/auth/spreadsheets.readonly",
-                "https://www.googleapis.com/auth/calendar"
-            ]
-        }
-    
+        logger.debug("AUTH_DEV_MODE: accepting token without validation")
+        return {"token": token, "scopes": list(DEV_SCOPES)}
+
     # For testing without frontend
     test_token = os.getenv("GOOGLE_TEST_TOKEN")
     if test_token:
         return {"token": test_token}
-    
+
     return None
@@ -0,0 +1,199 @@
+"""
+Caching utilities shared by services and agents
+
+Provides a small thread-safe TTL cache with per-entry expiry, LRU bounding
+and single-flight loading (concurrent misses on the same key share one load),
+and a revision cache whose entries stay valid until their source changes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+_MISSING = object()
+
+
+class _InFlight:
+    """A load in progress that other callers can wait on."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """Thread-safe cache where every entry carries its own expiry time."""
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        default_ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            maxsize: Maximum number of entries (least recently used are evicted)
+            default_ttl: TTL in seconds used when set() is called without one
+            clock: Monotonic clock (injectable for testing)
+        """
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _InFlight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired."""
+        with self._lock:
+            value = self._get_locked(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value for ttl seconds (non-positive TTLs are not stored)."""
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Tuple[Any, Optional[float]]]
+    ) -> Any:
+        """
+        Return the cached value, loading it once if missing.
+
+        Concurrent callers that miss on the same key wait for a single
+        loader call instead of each running their own (single-flight).
+
+        Args:
+            key: Cache key
+            loader: Callable returning (value, ttl). A ttl of 0 or less
+                returns the value without caching it.
+
+        Returns:
+            Cached or freshly loaded value. Loader exceptions propagate to
+            every waiting caller and nothing is cached.
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not _MISSING:
+                return value
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._inflight[key] = flight
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value, ttl = loader()
+            flight.value = value
+            with self._lock:
+                self._set_locked(key, value, ttl)
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _get_locked(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _set_locked(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._data[key] = (self._clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class RevisionCache:
+    """
+    Thread-safe LRU cache of values derived from a versioned source.
+
+    Each entry remembers the revision (spreadsheet version, ingestion
+    watermark, ...) it was computed from; a lookup with any other revision
+    is a miss, so entries never need a TTL.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """
+        Args:
+            maxsize: Maximum number of entries (least recently used are evicted)
+        """
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[Hashable, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, revision: Hashable, default: Any = None) -> Any:
+        """Return the value cached for key if it was computed from this revision."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != revision:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, revision: Hashable, value: Any) -> None:
+        """Store value as computed from revision (replacing any older entry)."""
+        with self._lock:
+            self._data[key] = (revision, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,99 @@
+"""
+In-process publish/subscribe with per-subscriber coalescing
+
+Publishers (ingestion threads, request handlers) call EventHub.publish()
+from any thread. Each subscriber is bound to an asyncio loop and keeps only
+the latest payload per key until it drains, so a burst of updates to the
+same quiz collapses into one pending item instead of a growing queue.
+"""
+import asyncio
+import threading
+from typing import Any, Dict, Hashable, List, Set
+
+
+class Subscription:
+    """Latest-value-per-key mailbox for one subscriber."""
+
+    def __init__(self, hub: "EventHub", topics: List[str], loop: asyncio.AbstractEventLoop):
+        self.hub = hub
+        self.topics = topics
+        self.loop = loop
+        self.pending: Dict[Hashable, Any] = {}
+        self.ready = asyncio.Event()
+        self.dropped = 0  # Payloads superseded before they were drained
+
+    def _offer(self, key: Hashable, payload: Any) -> None:
+        # Runs on the subscriber's loop
+        if key in self.pending:
+            self.dropped += 1
+        self.pending[key] = payload
+        self.ready.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until something is pending; False on timeout."""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def drain(self) -> Dict[Hashable, Any]:
+        """Take everything pending (latest payload per key)."""
+        items, self.pending = self.pending, {}
+        self.ready.clear()
+        return items
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventHub:
+    """Topic-based fan-out to asyncio subscribers; publish() is thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, *topics: str) -> Subscription:
+        """Subscribe the running event loop to one or more topics."""
+        subscription = Subscription(self, list(topics), asyncio.get_running_loop())
+        with self._lock:
+            for topic in topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def publish(self, topic: str, key: Hashable, payload: Any) -> int:
+        """
+        Offer a payload to every subscriber of a topic.
+
+        Returns:
+            Number of subscribers notified
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, key, payload)
+            except RuntimeError:
+                # Subscriber's loop already closed
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+    def subscriber_count(self, topic: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(topic, ()))
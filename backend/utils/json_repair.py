@@ -0,0 +1,153 @@
+"""
+Tolerant JSON parsing for LLM output
+
+Models wrap JSON in code fences and prose, leave trailing commas, and get
+cut off mid-array when they hit the output limit. Instead of discarding
+the whole reply:
+- loads_lenient(): the first JSON value in the text, with fences, prose
+  and trailing commas tolerated and (optionally) a truncated value closed
+  at its last complete element
+- salvage_items(): every complete element of the first JSON array, so a
+  truncated list of questions keeps all the questions that were finished
+"""
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+
+_FENCE_RE = re.compile(r"```[A-Za-z]*")
+# Truncation repair tries this many cut points, latest first
+MAX_REPAIR_ATTEMPTS = 20
+
+_decoder = json.JSONDecoder()
+
+
+def _closers(stack: List[str]) -> str:
+    return "".join("}" if c == "{" else "]" for c in reversed(stack))
+
+
+def _walk(text: str, start: int) -> Tuple[Optional[int], List[Tuple[int, str]], List[Tuple[int, int]]]:
+    """
+    Walk the JSON value starting at text[start] ("[" or "{") outside strings.
+
+    Returns:
+        (end of the value or None if truncated, cut points as (index,
+        closing brackets needed there) after each complete element, spans
+        of complete object/array elements of the outer container)
+    """
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = []
+    items: List[Tuple[int, int]] = []
+    item_start = None
+    in_string = escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "[{":
+            if len(stack) == 1:
+                item_start = i
+            stack.append(ch)
+        elif ch in "]}":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                return i + 1, cuts, items
+            cuts.append((i + 1, _closers(stack)))
+            if len(stack) == 1 and item_start is not None:
+                items.append((item_start, i + 1))
+                item_start = None
+        elif ch == ",":
+            cuts.append((i, _closers(stack)))
+    return None, cuts, items
+
+
+def strip_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing bracket (outside strings)."""
+    out: List[str] = []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "]}":
+            # Drop the comma (and the whitespace after it) left before this bracket
+            j = len(out)
+            while j and out[j - 1].isspace():
+                j -= 1
+            if j and out[j - 1] == ",":
+                del out[j - 1:]
+        out.append(ch)
+    return "".join(out)
+
+
+def _value_start(text: str, brackets: str = "[{") -> int:
+    positions = [p for p in (text.find(b) for b in brackets) if p >= 0]
+    return min(positions) if positions else -1
+
+
+def loads_lenient(text: str, truncated: bool = True) -> Any:
+    """
+    Parse the first JSON object or array in an LLM reply.
+
+    Args:
+        text: Raw model output
+        truncated: Close a value cut off mid-way at its last complete
+            element (the last element may then be partial)
+
+    Raises:
+        ValueError: No JSON value could be recovered
+    """
+    text = _FENCE_RE.sub("", text or "")
+    start = _value_start(text)
+    if start < 0:
+        raise ValueError("no JSON value in response")
+    try:
+        # raw_decode ignores prose after the value
+        return _decoder.raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        pass
+
+    end, cuts, _ = _walk(text, start)
+    candidates = [text[start:end]] if end is not None else []
+    if truncated and end is None:
+        candidates += [text[start:cut] + closers for cut, closers in reversed(cuts[-MAX_REPAIR_ATTEMPTS:])]
+    for candidate in candidates:
+        try:
+            return json.loads(strip_trailing_commas(candidate))
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("unrecoverable JSON in response")
+
+
+def salvage_items(text: str) -> List[Any]:
+    """Every complete object/array element of the first JSON array in the text (parseable ones only)."""
+    text = _FENCE_RE.sub("", text or "")
+    start = text.find("[")
+    while start >= 0:
+        # A "[" in leading prose has no elements; move on to the next one
+        _, _, spans = _walk(text, start)
+        items = []
+        for begin, end in spans:
+            try:
+                items.append(json.loads(strip_trailing_commas(text[begin:end])))
+            except json.JSONDecodeError:
+                continue
+        if items:
+            return items
+        start = text.find("[", start + 1)
+    return []
@@ -0,0 +1,113 @@
+"""
+In-process metrics for the orchestrator
+
+A small thread-safe registry of counters and timers. Timers keep a bounded
+reservoir of samples so percentiles stay cheap regardless of traffic.
+Exposed over HTTP by the /metrics endpoint and read by the benchmarks.
+"""
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+RESERVOIR_SIZE = 10000
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 for empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(values: List[float]) -> Dict:
+    """count/mean/p50/p95/p99/max summary of a list of samples."""
+    ordered = sorted(values)
+    count = len(ordered)
+    return {
+        "count": count,
+        "mean": round(sum(ordered) / count, 6) if count else 0.0,
+        "p50": round(percentile(ordered, 50), 6),
+        "p95": round(percentile(ordered, 95), 6),
+        "p99": round(percentile(ordered, 99), 6),
+        "max": round(ordered[-1], 6) if count else 0.0
+    }
+
+
+class _Timer:
+    """Reservoir-sampled duration series."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples: List[float] = []
+
+    def add(self, value: float, rng: random.Random) -> None:
+        self.count += 1
+        self.total += value
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(value)
+        else:
+            slot = rng.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.samples[slot] = value
+
+
+class MetricsRegistry:
+    """Thread-safe counters and timers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._timers: Dict[str, _Timer] = {}
+        self._rng = random.Random(0)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Add value to a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record one duration (or any sample) for a timer."""
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = _Timer()
+            timer.add(seconds, self._rng)
+
+    @contextmanager
+    def timed(self, name: str):
+        """Context manager recording the wall time of its body under name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self, prefix: Optional[str] = None) -> Dict:
+        """Return counters and timer summaries (optionally filtered by name prefix)."""
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {name: (t.count, t.total, list(t.samples)) for name, t in self._timers.items()}
+        if prefix:
+            counters = {k: v for k, v in counters.items() if k.startswith(prefix)}
+            timers = {k: v for k, v in timers.items() if k.startswith(prefix)}
+        timer_summaries = {}
+        for name, (count, total, samples) in timers.items():
+            summary = summarize(samples)
+            summary["count"] = count
+            summary["mean"] = round(total / count, 6) if count else 0.0
+            timer_summaries[name] = summary
+        return {"counters": counters, "timers": timer_summaries}
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+metrics = MetricsRegistry()
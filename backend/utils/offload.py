@@ -0,0 +1,190 @@
+"""
+Offloading of blocking agent work off the asyncio event loop
+
+Agent functions declare where they should run with @cpu_bound / @io_bound:
+- "process": pure-Python work that holds the GIL (scheduling, dedup); runs
+  on a warm process pool, so arguments and results must be picklable
+- "thread": NumPy work that releases the GIL, or work that needs shared
+  in-process state (stores, services); runs on a thread pool
+- "io": work that mostly waits on LLM or API calls; runs on its own, wider
+  thread pool so slow model calls never hold the CPU pools' workers
+
+Request handlers call `await offload.run(fn, *args)`. Each pool admits at
+most max_workers + max_queue tasks; beyond that run() raises
+OffloadRejected instead of queueing without bound. Queue wait and run time
+are recorded per function in utils.metrics under "offload.<name>.*".
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.metrics import metrics
+
+
+THREAD = "thread"
+PROCESS = "process"
+IO = "io"
+
+DEFAULT_THREAD_WORKERS = int(os.getenv("OFFLOAD_THREAD_WORKERS", "4"))
+DEFAULT_PROCESS_WORKERS = int(os.getenv("OFFLOAD_PROCESS_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+DEFAULT_IO_WORKERS = int(os.getenv("OFFLOAD_IO_WORKERS", "16"))
+DEFAULT_MAX_QUEUE = int(os.getenv("OFFLOAD_MAX_QUEUE", "64"))
+
+# Registered function name -> pool kind
+registry: Dict[str, str] = {}
+
+
+class OffloadRejected(RuntimeError):
+    """Raised when a pool's bounded queue is full."""
+
+
+def cpu_bound(kind: str = PROCESS) -> Callable:
+    """
+    Mark a function as CPU-heavy and choose the pool it runs on.
+
+    The function itself is returned unchanged (only tagged), so it stays
+    picklable by reference for the process pool and callable inline.
+
+    Args:
+        kind: "process" or "thread"
+    """
+    if kind not in (THREAD, PROCESS):
+        raise ValueError(f"Unknown offload kind: {kind}")
+    return _tag(kind)
+
+
+def io_bound() -> Callable:
+    """Mark a function as I/O-bound (LLM / API calls); it runs on the I/O pool."""
+    return _tag(IO)
+
+
+def _tag(kind: str) -> Callable:
+    def decorate(fn: Callable) -> Callable:
+        fn.__offload__ = kind
+        registry[f"{fn.__module__}.{fn.__qualname__}"] = kind
+        return fn
+    return decorate
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    """Run fn in the worker and return (result, start time, run seconds)."""
+    started = time.time()
+    begin = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, started, time.perf_counter() - begin
+
+
+def _warm() -> int:
+    """No-op task that forces a worker to start (and import this module)."""
+    return os.getpid()
+
+
+class _Pool:
+    """One executor plus the semaphore bounding its in-flight tasks."""
+
+    def __init__(self, kind: str, factory: Callable[[], Executor], workers: int, max_queue: int):
+        self.kind = kind
+        self.workers = workers
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+            return self._executor
+
+    def acquire(self) -> bool:
+        return self._slots.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+class OffloadPool:
+    """Thread and process pools shared by all request handlers."""
+
+    def __init__(
+        self,
+        thread_workers: int = DEFAULT_THREAD_WORKERS,
+        process_workers: int = DEFAULT_PROCESS_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        io_workers: int = DEFAULT_IO_WORKERS
+    ):
+        """
+        Args:
+            thread_workers: Threads for GIL-releasing / shared-state work
+            process_workers: Processes for pure-Python CPU work
+            max_queue: Tasks allowed to wait per pool beyond its workers
+            io_workers: Threads for work that waits on LLM / API calls
+        """
+        self._pools = {
+            THREAD: _Pool(
+                THREAD,
+                lambda: ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="offload"),
+                thread_workers, max_queue
+            ),
+            PROCESS: _Pool(PROCESS, lambda: ProcessPoolExecutor(max_workers=process_workers), process_workers, max_queue),
+            IO: _Pool(
+                IO,
+                lambda: ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="offload-io"),
+                io_workers, max_queue
+            ),
+        }
+
+    def start(self) -> None:
+        """Spin up every worker now so the first requests do not pay for it."""
+        for pool in self._pools.values():
+            for future in [pool.executor.submit(_warm) for _ in range(pool.workers)]:
+                future.result()
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown()
+
+    async def run(self, fn: Callable, *args, kind: Optional[str] = None, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on its pool and await the result.
+
+        Args:
+            fn: Function to run (its @cpu_bound / @io_bound kind is used unless overridden)
+            kind: "process", "thread" or "io" (default: fn's registration, else thread)
+
+        Raises:
+            OffloadRejected: The pool already has max_workers + max_queue tasks
+        """
+        kind = kind or getattr(fn, "__offload__", THREAD)
+        pool = self._pools[kind]
+        name = f"offload.{getattr(fn, '__name__', 'task')}"
+        if not pool.acquire():
+            metrics.incr(f"{name}.rejected")
+            raise OffloadRejected(f"{kind} pool is saturated")
+
+        submitted = time.time()
+        try:
+            future = pool.executor.submit(_timed_call, fn, args, kwargs)
+            result, started, elapsed = await asyncio.wrap_future(future)
+        except Exception:
+            metrics.incr(f"{name}.errors")
+            raise
+        finally:
+            pool.release()
+        metrics.observe(f"{name}.queue_wait", max(0.0, started - submitted))
+        metrics.observe(f"{name}.run", elapsed)
+        metrics.incr(f"{name}.{kind}")
+        return result
+
+
+offload = OffloadPool()